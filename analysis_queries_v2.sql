@@ -4,22 +4,23 @@
 -- =====================================================
 
 -- 1. TÄGLICHE VERKAUFS-SCHÄTZUNG (korrigiert)
--- Wie viele Sets wurden heute wahrscheinlich verkauft?
+-- Wie viele Sets wurden heute wahrscheinlich verkauft? (Rollup sales_daily, nur high/medium)
 SELECT 
-    date(detected_at) as date,
-    COUNT(*) as suspected_sales,
-    ROUND(AVG(price), 2) as avg_sale_price,
-    MIN(price) as cheapest_sale,
-    MAX(price) as highest_sale
-FROM suspected_sales
-WHERE confidence IN ('high', 'medium')
-GROUP BY date(detected_at)
-ORDER BY date DESC;
+    day as date,
+    units as suspected_units,
+    ROUND(revenue / units, 2) as avg_sale_price,
+    median_price,
+    min_price as cheapest_sale,
+    max_price as highest_sale,
+    ROUND(turnover * 100, 1) as turnover_pct
+FROM sales_daily
+WHERE product_id = 1
+ORDER BY day DESC;
 
 -- 2. PREIS-TREND ÜBER ZEIT (korrigiert)
 -- Entwicklung des Floor Prices
 SELECT 
-    date(scraped_at) as date,
+    date(scraped_ts, 'unixepoch') as date,
     COUNT(*) as scrapes_that_day,
     MIN(floor_price) as daily_floor_low,
     MAX(floor_price) as daily_floor_high,
@@ -27,66 +28,54 @@ SELECT
     ROUND(AVG(total_listings), 0) as avg_german_listings
 FROM scrapes
 WHERE product_id = 1
-GROUP BY date(scraped_at)
+GROUP BY date
 ORDER BY date DESC;
 
--- 3. KORREKTE VERKAUFS-ANALYSE (vergleicht aufeinanderfolgende Scrapes)
+-- 3. KORREKTE VERKAUFS-ANALYSE (vergleicht aufeinanderfolgende Full-Scrapes)
+-- Quick-Scrapes übernehmen nur den Floor des letzten Full-Scrapes → ausgelassen
 WITH ordered_scrapes AS (
     SELECT 
         id,
-        scraped_at,
+        scraped_ts,
         floor_price,
         total_listings,
-        LAG(id) OVER (ORDER BY scraped_at) as prev_id,
-        LAG(floor_price) OVER (ORDER BY scraped_at) as prev_floor
+        LAG(id) OVER w as prev_id,
+        LAG(floor_price) OVER w as prev_floor,
+        LAG(total_listings) OVER w as prev_listings
     FROM scrapes
-    WHERE product_id = 1
-),
-sales_analysis AS (
-    SELECT 
-        s.id,
-        s.scraped_at,
-        s.floor_price,
-        s.prev_floor,
-        s.floor_price - s.prev_floor as floor_delta,
-        s.total_listings,
-        -- Vergleiche Seller-Listen
-        (SELECT COUNT(*) FROM listings l WHERE l.scrape_id = s.id) as curr_count,
-        (SELECT COUNT(*) FROM listings l WHERE l.scrape_id = s.prev_id) as prev_count
-    FROM ordered_scrapes s
+    WHERE product_id = 1 AND mode = 'full'
+    WINDOW w AS (ORDER BY scraped_ts)
 )
 SELECT 
-    scraped_at,
+    datetime(scraped_ts, 'unixepoch') as scraped_at,
     ROUND(floor_price, 2) as floor,
     ROUND(prev_floor, 2) as prev_floor,
-    ROUND(floor_delta, 2) as delta,
+    ROUND(floor_price - prev_floor, 2) as delta,
     total_listings,
+    total_listings - prev_listings as listings_delta,
     CASE 
-        WHEN floor_delta < -5 THEN '📉 DROP'
-        WHEN floor_delta > 5 THEN '📈 RISE'
+        WHEN floor_price - prev_floor < -5 THEN '📉 DROP'
+        WHEN floor_price - prev_floor > 5 THEN '📈 RISE'
         ELSE '➡️ STABLE'
     END as trend
-FROM sales_analysis
+FROM ordered_scrapes
 WHERE prev_id IS NOT NULL
-ORDER BY scraped_at DESC;
+ORDER BY scraped_ts DESC;
 
 -- 4. Q1 VERKÄUFER (aktuell) - Floor-Nähe = Verkaufswahrscheinlich
-WITH current_scrape AS (
-    SELECT MAX(id) as id, MIN(price) as floor FROM listings WHERE scrape_id = (SELECT MAX(id) FROM scrapes WHERE product_id = 1)
-),
-price_range AS (
+-- Floor/Ceiling kommen aus scrapes + scrape_stats (vorberechnet beim Scrape)
+WITH price_range AS (
     SELECT 
-        cs.id as scrape_id,
-        cs.floor,
-        MAX(l.price) as ceiling,
-        (MAX(l.price) - cs.floor) as spread
-    FROM listings l
-    CROSS JOIN current_scrape cs
-    WHERE l.scrape_id = cs.id
-    GROUP BY cs.id, cs.floor
+        s.id as scrape_id,
+        s.floor_price as floor,
+        st.max_price as ceiling,
+        (st.max_price - s.floor_price) as spread
+    FROM scrapes s
+    JOIN scrape_stats st ON st.scrape_id = s.id
+    WHERE s.id = (SELECT MAX(id) FROM scrapes WHERE product_id = 1 AND mode = 'full')
 )
 SELECT 
-    l.seller,
+    se.name as seller,
     l.price,
     l.quantity,
     l.seller_rating,
@@ -97,41 +86,45 @@ SELECT
     END as sale_probability
 FROM listings l
 JOIN price_range pr ON l.scrape_id = pr.scrape_id
-WHERE l.scrape_id = (SELECT MAX(id) FROM scrapes WHERE product_id = 1)
+JOIN sellers se ON se.id = l.seller_id
 ORDER BY l.price ASC
 LIMIT 10;
 
 -- 5. FEHLENDE SELLER (Verkaufsverdacht)
-WITH current_sellers AS (
-    SELECT DISTINCT seller FROM listings 
-    WHERE scrape_id = (SELECT MAX(id) FROM scrapes WHERE product_id = 1)
-),
-previous_sellers AS (
-    SELECT DISTINCT seller FROM listings 
-    WHERE scrape_id = (SELECT MAX(id) FROM scrapes WHERE product_id = 1 AND id < (SELECT MAX(id) FROM scrapes WHERE product_id = 1))
+-- Die zwei letzten Full-Scrapes einmal bestimmen statt verschachtelter MAX(id)-Subqueries
+WITH last_two AS (
+    SELECT id, ROW_NUMBER() OVER (ORDER BY id DESC) as rn
+    FROM (SELECT id FROM scrapes WHERE product_id = 1 AND mode = 'full' ORDER BY id DESC LIMIT 2)
 )
 SELECT 
-    s.seller,
-    (SELECT price FROM listings WHERE seller = s.seller AND scrape_id = (SELECT MAX(id) FROM scrapes WHERE product_id = 1 AND id < (SELECT MAX(id) FROM scrapes WHERE product_id = 1))) as last_price,
-    (SELECT quantity FROM listings WHERE seller = s.seller AND scrape_id = (SELECT MAX(id) FROM scrapes WHERE product_id = 1 AND id < (SELECT MAX(id) FROM scrapes WHERE product_id = 1))) as last_quantity,
+    se.name as seller,
+    p.price as last_price,
+    p.quantity as last_quantity,
     '🔴 VERKAUFSVERDACHT' as status
-FROM previous_sellers s
-WHERE s.seller NOT IN (SELECT seller FROM current_sellers);
+FROM last_two prev
+JOIN listings p ON p.scrape_id = prev.id
+JOIN sellers se ON se.id = p.seller_id
+WHERE prev.rn = 2
+  AND NOT EXISTS (
+      SELECT 1 FROM last_two cur
+      JOIN listings c ON c.scrape_id = cur.id
+      WHERE cur.rn = 1 AND c.seller_id = p.seller_id
+  );
 
 -- 6. MARKT-BEWEGUNG (letzte 24h)
 WITH latest AS (
     SELECT * FROM scrapes 
     WHERE product_id = 1 
-    ORDER BY scraped_at DESC LIMIT 1
+    ORDER BY scraped_ts DESC LIMIT 1
 ),
 previous AS (
     SELECT * FROM scrapes 
     WHERE product_id = 1 
-    ORDER BY scraped_at DESC LIMIT 1 OFFSET 1
+    ORDER BY scraped_ts DESC LIMIT 1 OFFSET 1
 )
 SELECT 
-    l.scraped_at as current_time,
-    p.scraped_at as previous_time,
+    datetime(l.scraped_ts, 'unixepoch') as current_time,
+    datetime(p.scraped_ts, 'unixepoch') as previous_time,
     ROUND(l.floor_price, 2) as current_floor,
     ROUND(p.floor_price, 2) as previous_floor,
     ROUND(l.floor_price - p.floor_price, 2) as floor_delta,
@@ -140,7 +133,7 @@ FROM latest l, previous p;
 
 -- 7. WOCHENTLICHE ZUSAMMENFASSUNG
 SELECT 
-    strftime('%Y-W%W', scraped_at) as week,
+    strftime('%Y-W%W', scraped_ts, 'unixepoch') as week,
     COUNT(*) as scrape_count,
     MIN(ROUND(floor_price, 2)) as week_low,
     MAX(ROUND(floor_price, 2)) as week_high,
@@ -153,16 +146,25 @@ GROUP BY week
 ORDER BY week DESC;
 
 -- 8. SELLER-VERHALTEN (Top 10 nach Aktivität)
+-- Gruppiert über die Integer-seller_id, Name kommt einmalig aus sellers
+-- listings_all = Haupt-DB + ausgelagerte Monate (archive.py), sonst deckt "ever" nur die
+-- letzten 90 Tage ab. Die View ist TEMP: `python3 archive.py shell analysis_queries_v2.sql`
+-- bzw. in Python vorher archive.ensure_listings_all(conn). Gepackte Monate vorher `unpack`.
+-- scrape_id IN (Scrapes des Produkts): ohne Archive läuft das über idx_listings_scrape
+-- statt über alle Listings per idx_listings_seller_id (check_query_plans.py); mit Archiven
+-- liest SQLite die UNION-ALL-View einmal komplett (nur konstante Bedingungen wandern in die
+-- einzelnen Tabellen) — für eine Ad-hoc-Auswertung über die ganze Historie vertretbar.
 SELECT 
-    seller,
-    COUNT(DISTINCT scrape_id) as times_seen,
-    MIN(price) as lowest_price_ever,
-    MAX(price) as highest_price_ever,
-    ROUND(AVG(price), 2) as avg_price,
-    MAX(scraped_at) as last_seen
-FROM listings l
-JOIN scrapes s ON l.scrape_id = s.id
-WHERE s.product_id = 1
-GROUP BY seller
+    se.name as seller,
+    COUNT(DISTINCT l.scrape_id) as times_seen,
+    MIN(l.price) as lowest_price_ever,
+    MAX(l.price) as highest_price_ever,
+    ROUND(AVG(l.price), 2) as avg_price,
+    datetime(MAX(s.scraped_ts), 'unixepoch') as last_seen
+FROM listings_all l
+JOIN scrapes s ON s.id = l.scrape_id
+JOIN sellers se ON se.id = l.seller_id
+WHERE l.scrape_id IN (SELECT id FROM scrapes WHERE product_id = 1)
+GROUP BY l.seller_id
 ORDER BY times_seen DESC, last_seen DESC
 LIMIT 10;
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+archive.py — Hot/Cold-Split: alte Listings in Monats-Archive auslagern.
+
+Listings von Scrapes, die älter als ARCHIVE_AFTER_DAYS sind, wandern nach
+`archive/listings-YYYY-MM.db` (Monat des Scrapes) und werden aus der Haupt-DB
+gelöscht. scrapes und alle Rollups (scrape_stats, price_distribution, …) bleiben
+in der Haupt-DB — Reports merken nichts davon. Monate, die älter als
+PACK_AFTER_MONTHS sind, werden gepackt (`listings-YYYY-MM.db.xz`, read-only);
+`unpack` legt eine schreibgeschützte .db daneben, `pack` entfernt sie wieder.
+
+Auswertungen über die ganze Listing-Historie (Rollup-Backfill, Blocklist-Recompute,
+Lifetimes-Rebuild) holen sich per listings_source(conn) die TEMP VIEW `listings_all`
+(UNION ALL über main.listings + alle ungepackten Archive, per ATTACH). Gepackte
+Monate sind darin nicht enthalten — vorher `unpack`. Ad-hoc-SQL, das `listings_all`
+fest referenziert (analysis_queries_v2.sql), läuft über `archive.py shell`.
+
+Usage:
+    python3 archive.py run [--days 90]        # auslagern + alte Monate packen
+    python3 archive.py list
+    python3 archive.py pack 2026-05
+    python3 archive.py unpack 2026-05
+    python3 archive.py shell analysis_queries_v2.sql   # SQL mit listings_all (auch per stdin)
+"""
+
+import argparse
+import lzma
+import os
+import shutil
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from db import connect, connect_readonly
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+ARCHIVE_DIR = Path(os.getenv('CARDMARKET_ARCHIVE_DIR', Path(__file__).parent / 'archive'))
+
+ARCHIVE_AFTER_DAYS = 90
+PACK_AFTER_MONTHS = 6
+
+# Spalten explizit — in migrierten DBs steht seller_id (per ALTER TABLE) am Ende
+LISTING_COLUMNS = ('id', 'scrape_id', 'seller_id', 'seller_rating', 'seller_type', 'price',
+                   'quantity', 'location', 'language', 'condition_notes')
+
+ARCHIVE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS {schema}.listings (
+    id INTEGER PRIMARY KEY,
+    scrape_id INTEGER,
+    seller_id INTEGER,
+    seller_rating INTEGER,
+    seller_type TEXT,
+    price REAL NOT NULL,
+    quantity INTEGER,
+    location TEXT,
+    language TEXT,
+    condition_notes TEXT
+);
+CREATE INDEX IF NOT EXISTS {schema}.idx_listings_scrape ON listings(scrape_id);
+CREATE INDEX IF NOT EXISTS {schema}.idx_listings_seller_id ON listings(seller_id);
+'''
+
+
+def get_db():
+    return connect(DB_PATH)
+
+
+def archive_path(month):
+    return ARCHIVE_DIR / f'listings-{month}.db'
+
+
+def packed_path(month):
+    return ARCHIVE_DIR / f'listings-{month}.db.xz'
+
+
+def _alias(month):
+    return 'arc_' + month.replace('-', '_')
+
+
+def months():
+    """{month: (unpacked_path|None, packed_path|None)} aller Archiv-Monate."""
+    found = {}
+    if ARCHIVE_DIR.exists():
+        for path in ARCHIVE_DIR.glob('listings-*.db*'):
+            month = path.name[len('listings-'):].split('.', 1)[0]
+            db, xz = found.get(month, (None, None))
+            found[month] = (path, xz) if path.suffix == '.db' else (db, path)
+    return dict(sorted(found.items()))
+
+
+def _month_bounds(month):
+    """[start, end) des Monats in Unix-Sekunden (UTC, wie scrapes.scraped_ts)."""
+    start = datetime.strptime(month, '%Y-%m').replace(tzinfo=timezone.utc)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def listings_source(conn):
+    """
+    Hängt alle ungepackten Archive an und legt TEMP VIEW listings_all an.
+    Returns den Tabellennamen für Queries über die ganze Historie ('listings' ohne Archive).
+    Muss außerhalb einer offenen Transaktion aufgerufen werden (ATTACH).
+    """
+    unpacked = [(month, db) for month, (db, _) in months().items() if db is not None]
+    if not unpacked:
+        return 'listings'
+    attached = {row[1] for row in conn.execute('PRAGMA database_list')}
+    cols = ', '.join(LISTING_COLUMNS)
+    selects = [f'SELECT {cols} FROM main.listings']
+    for month, db in unpacked:
+        alias = _alias(month)
+        if alias not in attached:
+            try:
+                conn.execute(f'ATTACH DATABASE ? AS {alias}', (str(db),))
+            except sqlite3.OperationalError as e:
+                raise RuntimeError(f"{e} — ältere Monate mit 'archive.py pack <YYYY-MM>' packen") from e
+        selects.append(f'SELECT {cols} FROM {alias}.listings')
+    conn.execute('DROP VIEW IF EXISTS temp.listings_all')
+    conn.execute('CREATE TEMP VIEW listings_all AS ' + ' UNION ALL '.join(selects))
+    return 'listings_all'
+
+
+def ensure_listings_all(conn):
+    """listings_source(), aber die View listings_all gibt es danach immer — auch ohne Archive."""
+    if listings_source(conn) == 'listings':
+        conn.execute('DROP VIEW IF EXISTS temp.listings_all')
+        conn.execute(f"CREATE TEMP VIEW listings_all AS SELECT {', '.join(LISTING_COLUMNS)} FROM main.listings")
+
+
+def archive_month(conn, month, cutoff):
+    """Verschiebt die Listings aller Scrapes des Monats vor cutoff ins Monats-Archiv. Returns Anzahl."""
+    db, xz = months().get(month, (None, None))
+    if xz is not None:
+        print(f"   ⚠️  {month} ist gepackt, Listings bleiben in der Haupt-DB (erst 'unpack' + 'pack' neu bauen)")
+        return 0
+    start, end = _month_bounds(month)
+    ARCHIVE_DIR.mkdir(exist_ok=True)
+    conn.execute('ATTACH DATABASE ? AS arc', (str(archive_path(month)),))
+    try:
+        conn.executescript(ARCHIVE_SCHEMA.format(schema='arc'))
+        cols = ', '.join(LISTING_COLUMNS)
+        scrapes = 'SELECT id FROM scrapes WHERE scraped_ts >= ? AND scraped_ts < ? AND scraped_ts < ?'
+        cursor = conn.cursor()
+        # Zwei Transaktionen: im WAL-Modus ist ein Commit über mehrere Dateien nicht atomar.
+        # Erst das Archiv festschreiben, dann löschen — bricht der Lauf dazwischen ab,
+        # stehen die Listings doppelt da und der nächste Lauf (INSERT OR IGNORE) räumt auf.
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO arc.listings ({cols})
+            SELECT {cols} FROM main.listings WHERE scrape_id IN ({scrapes})
+        ''', (start, end, cutoff))
+        conn.commit()
+        cursor.execute(f'DELETE FROM main.listings WHERE scrape_id IN ({scrapes})', (start, end, cutoff))
+        moved = cursor.rowcount
+        conn.commit()
+    finally:
+        conn.execute('DETACH DATABASE arc')
+    return moved
+
+
+def pack(month):
+    """Archiv-Monat kompaktieren, xz-komprimieren, read-only ablegen. Returns True wenn gepackt."""
+    db, xz = months().get(month, (None, None))
+    if db is None:
+        return False
+    if xz is None:
+        conn = sqlite3.connect(db)
+        try:
+            conn.execute('VACUUM')
+        finally:
+            conn.close()
+        tmp = packed_path(month).with_name(packed_path(month).name + '.tmp')
+        with open(db, 'rb') as src, lzma.open(tmp, 'wb', preset=9) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        tmp.replace(packed_path(month))
+        packed_path(month).chmod(0o444)
+    db.unlink()  # bei 'unpack'-Kopien liegt das .xz schon da
+    return True
+
+
+def unpack(month):
+    """Gepackten Monat als schreibgeschützte .db daneben legen (für listings_all)."""
+    db, xz = months().get(month, (None, None))
+    if db is not None:
+        return db
+    if xz is None:
+        return None
+    tmp = archive_path(month).with_name(archive_path(month).name + '.tmp')
+    with lzma.open(xz, 'rb') as src, open(tmp, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    tmp.chmod(0o444)
+    tmp.replace(archive_path(month))
+    return archive_path(month)
+
+
+def run(conn, days=ARCHIVE_AFTER_DAYS, pack_after_months=PACK_AFTER_MONTHS):
+    cursor = conn.cursor()
+    cursor.execute("SELECT CAST(strftime('%s', 'now', ?) AS INTEGER)", (f'-{days} days',))
+    cutoff = cursor.fetchone()[0]
+    cursor.execute('''
+        SELECT strftime('%Y-%m', s.scraped_ts, 'unixepoch') AS month FROM scrapes s
+        WHERE s.scraped_ts < ? AND EXISTS (SELECT 1 FROM listings l WHERE l.scrape_id = s.id)
+        GROUP BY month ORDER BY month
+    ''', (cutoff,))
+    total = 0
+    for (month,) in cursor.fetchall():
+        moved = archive_month(conn, month, cutoff)
+        total += moved
+        print(f"   📦 {month}: {moved} Listings → {archive_path(month).name}")
+
+    cursor.execute("SELECT strftime('%Y-%m', 'now', ?)", (f'-{pack_after_months} months',))
+    pack_before = cursor.fetchone()[0]
+    for month, (db, xz) in months().items():
+        if month < pack_before and db is not None and xz is None and pack(month):
+            print(f"   🗜️  {month} gepackt → {packed_path(month).name}")
+    return total
+
+
+def cmd_list():
+    for month, (db, xz) in months().items():
+        parts = []
+        if db is not None:
+            parts.append(f"db {db.stat().st_size / (1024 * 1024):.1f} MB" + (' (ro)' if xz is not None else ''))
+        if xz is not None:
+            parts.append(f"xz {xz.stat().st_size / (1024 * 1024):.1f} MB")
+        print(f"   {month}  {', '.join(parts)}")
+    return 0
+
+
+def cmd_shell(script):
+    """SQL-Skript read-only gegen die Haupt-DB ausführen, listings_all inkl. Archive verfügbar."""
+    conn = connect_readonly(DB_PATH)
+    try:
+        ensure_listings_all(conn)
+        buf = ''
+        for line in script.splitlines():
+            buf += line + '\n'
+            if not sqlite3.complete_statement(buf):
+                continue
+            cursor = conn.execute(buf)
+            buf = ''
+            if cursor.description is None:
+                continue
+            print(' | '.join(col[0] for col in cursor.description))
+            for row in cursor:
+                print(' | '.join('' if v is None else str(v) for v in row))
+            print()
+    finally:
+        conn.close()
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Alte Listings in Monats-Archive auslagern')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p_run = sub.add_parser('run', help='auslagern + alte Monate packen')
+    p_run.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS)
+    sub.add_parser('list')
+    for name in ('pack', 'unpack'):
+        sub.add_parser(name).add_argument('month', help='YYYY-MM')
+    p_shell = sub.add_parser('shell', help='SQL-Skript mit listings_all (inkl. Archive) ausführen')
+    p_shell.add_argument('script', nargs='?', type=Path, help='SQL-Datei (sonst stdin)')
+    args = ap.parse_args()
+
+    if args.cmd == 'list':
+        return cmd_list()
+    if args.cmd == 'shell':
+        return cmd_shell(args.script.read_text() if args.script else sys.stdin.read())
+    if args.cmd == 'pack':
+        print(f"✅ {args.month} gepackt" if pack(args.month) else f"⚠️  {args.month}: nichts zu packen")
+        return 0
+    if args.cmd == 'unpack':
+        path = unpack(args.month)
+        print(f"✅ {path}" if path else f"❌ Kein Archiv für {args.month}")
+        return 0 if path else 1
+
+    from migrate import ensure_schema
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        n = run(conn, args.days)
+    finally:
+        conn.close()
+    print(f"✅ {n} Listings archiviert (älter als {args.days} Tage)")
+    if n:
+        print("   💡 Platz in der Haupt-DB gibt erst retention.py (incremental_vacuum) bzw. VACUUM frei")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
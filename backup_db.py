@@ -1,84 +1,273 @@
 #!/usr/bin/env python3
 """
 Cardmarket DB Auto-Backup
-- Täglicher Snapshot um 03:00
-- Retention: 14 Tage
-- Kein LLM, deterministisch
+- Täglicher Lauf um 03:00 (launchd), kein LLM, deterministisch
+- Konsistenter Snapshot über die SQLite-Backup-API, in Portionen von BACKUP_PAGES
+  Pages mit Pause dazwischen — Scraper können währenddessen schreiben
+- Der Snapshot wird in inhaltsdefinierte Chunks zerlegt (Grenzen nur an Page-Grenzen,
+  gesetzt per CRC32 der Page), jeder Chunk liegt genau einmal lzma-komprimiert unter
+  `backups/chunks/` (Name = SHA-256). Pro Tag ein Manifest `backups/manifests/YYYY-MM-DD.json`
+  mit der Chunk-Liste. Unveränderte Teile der DB kosten also keinen Platz und keine
+  Kompression — nur neue Chunks werden geschrieben.
+- Retention: 14 Tage Manifeste; Chunks, auf die kein Manifest mehr verweist, werden gelöscht
+
+Usage:
+    python3 backup_db.py
+    python3 backup_db.py list
+    python3 backup_db.py restore 2026-06-12 [--to pfad.db]
 """
 
-import sqlite3
+import argparse
+import hashlib
+import json
+import lzma
 import os
 import shutil
+import sqlite3
+import zlib
 from datetime import datetime, timedelta
 from pathlib import Path
 
-DB_PATH = Path(__file__).parent / 'cardmarket.db'
-BACKUP_DIR = Path(__file__).parent / 'backups'
+from db import connect_readonly
+
+DB_PATH = Path(os.getenv('CARDMARKET_DB_PATH', Path(__file__).parent / 'cardmarket.db'))
+BACKUP_DIR = Path(os.getenv('CARDMARKET_BACKUP_DIR', Path(__file__).parent / 'backups'))
+CHUNK_DIR = BACKUP_DIR / 'chunks'
+MANIFEST_DIR = BACKUP_DIR / 'manifests'
 RETENTION_DAYS = 14
+BACKUP_PAGES = 1024     # Pages pro Backup-Schritt (≈ 4 MB bei 4 KiB Pages)
+BACKUP_SLEEP = 0.05     # Sekunden Pause zwischen den Schritten
+
+# Chunk-Grenze nach einer Page, wenn crc32(page) & CHUNK_MASK == 0 → Ø 16 Pages pro Chunk
+CHUNK_MASK = 0x0F
+CHUNK_MIN_PAGES = 4
+CHUNK_MAX_PAGES = 64
+LZMA_PRESET = 6
+
+
+def snapshot(dest):
+    """Konsistente Kopie der Live-DB nach dest. Returns (page_size, page_count)."""
+    src = connect_readonly(DB_PATH)
+    dst = sqlite3.connect(dest)
+    try:
+        src.backup(dst, pages=BACKUP_PAGES, sleep=BACKUP_SLEEP)
+        page_size = dst.execute('PRAGMA page_size').fetchone()[0]
+        page_count = dst.execute('PRAGMA page_count').fetchone()[0]
+    finally:
+        dst.close()
+        src.close()
+    return page_size, page_count
+
+
+def iter_chunks(f, page_size):
+    """Zerlegt eine DB-Datei page-weise in inhaltsdefinierte Chunks (bytes)."""
+    pages = []
+    while True:
+        page = f.read(page_size)
+        if not page:
+            break
+        pages.append(page)
+        if len(pages) >= CHUNK_MAX_PAGES or (
+                len(pages) >= CHUNK_MIN_PAGES and zlib.crc32(page) & CHUNK_MASK == 0):
+            yield b''.join(pages)
+            pages = []
+    if pages:
+        yield b''.join(pages)
+
+
+def chunk_path(digest):
+    return CHUNK_DIR / digest[:2] / f'{digest}.xz'
+
+
+def store_chunk(data):
+    """Legt einen Chunk ab, falls noch nicht vorhanden. Returns (digest, neu_geschrieben)."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = chunk_path(digest)
+    if path.exists():
+        return digest, False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(lzma.compress(data, preset=LZMA_PRESET))
+    tmp.replace(path)
+    return digest, True
+
+
+def manifest_path(day):
+    return MANIFEST_DIR / f'{day}.json'
+
+
+def load_manifest(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _manifests():
+    """[(datetime, path)] nach Datum sortiert."""
+    if not MANIFEST_DIR.exists():
+        return []
+    found = []
+    for path in MANIFEST_DIR.glob('*.json'):
+        try:
+            found.append((datetime.strptime(path.stem, '%Y-%m-%d'), path))
+        except ValueError:
+            continue
+    return sorted(found)
 
 
 def backup_database():
-    """Erstellt tägliches DB-Backup"""
+    """Snapshot → Chunks → Manifest des Tages."""
     if not DB_PATH.exists():
         print(f"❌ Datenbank nicht gefunden: {DB_PATH}")
         return 1
-    
-    # Backup-Ordner erstellen
-    BACKUP_DIR.mkdir(exist_ok=True)
-    
-    # Backup-Name mit Datum
+
+    MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
     today = datetime.now().strftime('%Y-%m-%d')
-    backup_path = BACKUP_DIR / f'cardmarket-{today}.db'
-    
-    # Kopieren (SQLite backup ist atomic)
+    snap = BACKUP_DIR / f'.cardmarket-{today}.snapshot'
+
     try:
-        shutil.copy2(DB_PATH, backup_path)
-        size_mb = backup_path.stat().st_size / (1024 * 1024)
-        print(f"✅ Backup erstellt: {backup_path.name} ({size_mb:.1f} MB)")
+        page_size, page_count = snapshot(snap)
+        chunks, new, new_bytes = [], 0, 0
+        file_hash = hashlib.sha256()
+        with open(snap, 'rb') as f:
+            for data in iter_chunks(f, page_size):
+                file_hash.update(data)
+                digest, written = store_chunk(data)
+                chunks.append(digest)
+                if written:
+                    new += 1
+                    new_bytes += chunk_path(digest).stat().st_size
+        size = snap.stat().st_size
+        snap.unlink()
+
+        manifest = {
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'page_size': page_size, 'page_count': page_count,
+            'size': size, 'sha256': file_hash.hexdigest(), 'chunks': chunks,
+        }
+        tmp = manifest_path(today).with_suffix('.tmp')
+        tmp.write_text(json.dumps(manifest))
+        tmp.replace(manifest_path(today))
+        print(f"✅ Backup {today}: {size / (1024 * 1024):.1f} MB in {len(chunks)} Chunks, "
+              f"{new} neu ({new_bytes / (1024 * 1024):.2f} MB komprimiert)")
     except Exception as e:
+        snap.unlink(missing_ok=True)
         print(f"❌ Backup fehlgeschlagen: {e}")
         return 1
-    
+
     # Alte Backups löschen (Retention)
-    deleted = cleanup_old_backups()
-    
-    print(f"🧹 {deleted} alte Backups gelöscht (Retention: {RETENTION_DAYS} Tage)")
+    deleted, orphans = cleanup_old_backups()
+
+    print(f"🧹 {deleted} alte Backups gelöscht, {orphans} Chunks freigegeben (Retention: {RETENTION_DAYS} Tage)")
+    print(f"📦 Store: {store_size() / (1024 * 1024):.1f} MB für {len(_manifests())} Tage")
     return 0
 
 
 def cleanup_old_backups():
-    """Löscht Backups älter als RETENTION_DAYS"""
-    if not BACKUP_DIR.exists():
-        return 0
-    
+    """Löscht Manifeste (und Alt-Backups *.db) älter als RETENTION_DAYS, danach unreferenzierte Chunks."""
     cutoff = datetime.now() - timedelta(days=RETENTION_DAYS)
     deleted = 0
-    
-    for backup_file in BACKUP_DIR.glob('cardmarket-*.db'):
+    for day, path in _manifests():
+        if day < cutoff:
+            path.unlink()
+            deleted += 1
+            print(f"   🗑️ Gelöscht: {path.name}")
+
+    # Voll-Kopien aus der Zeit vor dem Chunk-Store
+    for path in BACKUP_DIR.glob('cardmarket-*.db'):
         try:
-            # Datum aus Filename extrahieren
-            date_str = backup_file.stem.replace('cardmarket-', '')
-            backup_date = datetime.strptime(date_str, '%Y-%m-%d')
-            
-            if backup_date < cutoff:
-                backup_file.unlink()
+            if datetime.strptime(path.stem.replace('cardmarket-', ''), '%Y-%m-%d') < cutoff:
+                path.unlink()
                 deleted += 1
-                print(f"   🗑️ Gelöscht: {backup_file.name}")
+                print(f"   🗑️ Gelöscht: {path.name}")
         except ValueError:
-            # Ungültiges Datum im Filename - überspringen
             continue
-        except Exception as e:
-            print(f"   ⚠️ Fehler beim Löschen {backup_file}: {e}")
-    
-    return deleted
+
+    referenced = set()
+    for _, path in _manifests():
+        referenced.update(load_manifest(path)['chunks'])
+    orphans = 0
+    if CHUNK_DIR.exists():
+        for path in CHUNK_DIR.glob('*/*.xz'):
+            if path.name[:-3] not in referenced:
+                path.unlink()
+                orphans += 1
+    return deleted, orphans
+
+
+def store_size():
+    return sum(p.stat().st_size for p in BACKUP_DIR.rglob('*') if p.is_file())
+
+
+def restore(day, target):
+    """Stellt den Stand von `day` (YYYY-MM-DD) nach target wieder her und prüft ihn."""
+    if target.resolve() == DB_PATH.resolve():
+        print("❌ Restore direkt auf die Live-DB ist nicht erlaubt — erst nach --to wiederherstellen, dann tauschen")
+        return 1
+
+    tmp = target.with_name(target.name + '.tmp')
+    legacy = BACKUP_DIR / f'cardmarket-{day}.db'
+    if manifest_path(day).exists():
+        manifest = load_manifest(manifest_path(day))
+        file_hash = hashlib.sha256()
+        with open(tmp, 'wb') as out:
+            for digest in manifest['chunks']:
+                data = lzma.decompress(chunk_path(digest).read_bytes())
+                file_hash.update(data)
+                out.write(data)
+        if file_hash.hexdigest() != manifest['sha256']:
+            tmp.unlink()
+            print(f"❌ Prüfsumme stimmt nicht für {day}")
+            return 1
+        print(f"📦 {len(manifest['chunks'])} Chunks aus Manifest {day}")
+    elif legacy.exists():
+        shutil.copyfile(legacy, tmp)
+        print(f"📦 Voll-Kopie {legacy.name}")
+    else:
+        print(f"❌ Kein Backup für {day}")
+        return 1
+
+    conn = sqlite3.connect(tmp)
+    try:
+        result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+    finally:
+        conn.close()
+    if result != 'ok':
+        print(f"❌ integrity_check fehlgeschlagen: {result}")
+        return 1
+    tmp.replace(target)
+    print(f"✅ Wiederhergestellt: {target} (integrity_check ok)")
+    return 0
+
+
+def list_backups():
+    for day, path in _manifests():
+        m = load_manifest(path)
+        print(f"   {day:%Y-%m-%d}  {m['size'] / (1024 * 1024):>9.1f} MB  {len(m['chunks']):>6} Chunks  {m['created_at']}")
+    for path in sorted(BACKUP_DIR.glob('cardmarket-*.db')):
+        print(f"   {path.stem.replace('cardmarket-', '')}  {path.stat().st_size / (1024 * 1024):>9.1f} MB  (Voll-Kopie, alt)")
+    print(f"   Store gesamt: {store_size() / (1024 * 1024):.1f} MB")
+    return 0
 
 
 def main():
+    ap = argparse.ArgumentParser(description='Cardmarket DB Backup')
+    sub = ap.add_subparsers(dest='cmd')
+    sub.add_parser('list', help='vorhandene Backups anzeigen')
+    p_restore = sub.add_parser('restore', help='Stand eines Tages wiederherstellen')
+    p_restore.add_argument('day', help='YYYY-MM-DD')
+    p_restore.add_argument('--to', type=Path, default=Path(__file__).parent / 'cardmarket.restored.db')
+    args = ap.parse_args()
+
+    if args.cmd == 'list':
+        return list_backups()
+    if args.cmd == 'restore':
+        return restore(args.day, args.to)
+
     print(f"💾 Cardmarket DB Backup - {datetime.now().strftime('%Y-%m-%d %H:%M')}")
     print(f"📁 Quelle: {DB_PATH}")
     print(f"📁 Ziel: {BACKUP_DIR}")
     print()
-    
+
     return backup_database()
 
 
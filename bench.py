@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+bench.py — Laufzeiten aller Report-, Alert- und Chart-Einstiegspunkte gegen eine DB.
+
+Führt jeden Einstiegspunkt (Scraper-Speichern, Daily/Weekly Report, ATL- und
+Sammlungs-Alerts, Watchdog, Scheduler, Tiefe, Lifetimes, Saisonalität,
+Verkaufs-Rollup, Charts, analysis_queries_v2.sql) mehrfach aus und misst Wall-Clock
+sowie die Zahl der SQL-Statements (per db.set_trace). Ausgaben der Scripts werden
+verschluckt, Telegram ist abgeklemmt. Gedacht für DBs aus generate_synthetic_db.py —
+die Einstiegspunkte schreiben (Scrape, Saisonalität), deshalb nie gegen die Live-DB.
+Floor-Zeitreihen (tsdata/) werden vorab in ein Temp-Verzeichnis gebaut.
+
+Usage:
+    python3 bench.py --db /tmp/synthetic.db
+    python3 bench.py --generate --days 1095 --products 50 --listings 500   # DB frisch in /tmp erzeugen
+    python3 bench.py --db /tmp/big.db --repeat 5 --only daily_report,charts
+    python3 bench.py --db /tmp/big.db --out bench.json --compare bench-vorher.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import db
+from db import connect, connect_readonly
+
+BASE_DIR = Path(__file__).resolve().parent
+LIVE_DB = Path(db.DB_PATH).resolve()
+
+BENCH_REPEAT = 3
+BENCH_SCRAPE_LISTINGS = 120   # Listings im synthetischen Scrape von ep_scraper
+BENCH_SLOWER_PCT = 20         # --compare markiert Änderungen ab so vielen %
+
+
+# --- Einstiegspunkte (jeweils fn(db_path), Module lesen CARDMARKET_DB_PATH) ---
+
+def _synthetic_scrape(path, pid, n):
+    """Listing-Dicts wie vom Parser, um den letzten Floor des Produkts herum, mit vorhandenen Sellern."""
+    conn = connect_readonly(path)
+    try:
+        floor = conn.execute('SELECT floor_price FROM scrapes WHERE product_id = ? ORDER BY scraped_ts DESC LIMIT 1',
+                             (pid,)).fetchone()
+        sellers = [r[0] for r in conn.execute('SELECT name FROM sellers ORDER BY id DESC LIMIT ?', (n * 2,))]
+    finally:
+        conn.close()
+    base = floor[0] if floor and floor[0] else 100.0
+    rnd = random.Random()
+    listings = [{'seller': sellers[i] if i < len(sellers) else f'bench{i}',
+                 'price': round(base * (1 + rnd.expovariate(8)), 2), 'quantity': rnd.randint(1, 3),
+                 'location': 'Germany' if i % 10 else 'France'} for i in range(n)]
+    de = [entry for entry in listings if entry['location'] == 'Germany']
+    return listings, min(entry['price'] for entry in de), len(de)
+
+
+def ep_scraper(path):
+    import scraper
+    scraper.send_telegram = lambda *a, **k: True
+    listings, floor, de_count = _synthetic_scrape(path, 1, BENCH_SCRAPE_LISTINGS)
+    scraper.save_to_db(1, 'Germany', listings, floor, de_count)
+    fp = scraper.fingerprint(sorted(listings, key=lambda entry: entry['price']))
+    scraper.save_quick_scrape(1, fp)
+
+
+def ep_daily_report(path):
+    import daily_report_v2
+    daily_report_v2.generate_report()
+
+
+def ep_weekly_report(path):
+    import weekly_report_v2
+    weekly_report_v2.generate_weekly_report()
+
+
+def ep_price_alerts(path):
+    import price_alerts
+    conn = price_alerts.get_conn()
+    try:
+        for pid, cfg in price_alerts.PRODUCTS.items():
+            price_alerts.check_product_atl(conn.cursor(), pid, cfg, {})
+    finally:
+        conn.close()
+
+
+def ep_collection_alerts(path):
+    import collection_alerts
+    conn = connect(path)  # collection_alerts.DB_PATH ist fest auf ./cardmarket.db
+    try:
+        for card_id, has_std, has_foil in collection_alerts.get_collected_cards(conn):
+            collection_alerts.evaluate_card(conn, card_id, has_std, has_foil)
+    finally:
+        conn.close()
+
+
+def ep_watchdog(path):
+    import watchdog
+    watchdog.send_telegram = lambda *a, **k: True
+    watchdog.check()
+
+
+def ep_scheduler(path):
+    import scheduler
+    conn = scheduler.get_db()
+    try:
+        scheduler.tick(conn, dry_run=True)
+    finally:
+        conn.close()
+
+
+def ep_depth(path):
+    import depth
+    conn = depth.get_db()
+    try:
+        cursor = conn.cursor()
+        for pid in depth.PRODUCTS:
+            depth.cost_now(cursor, pid, 3)
+            depth.cost_before(cursor, pid, 3, '-24 hours')
+            depth.daily_costs(cursor, pid, 3)
+            depth.max_available_units(cursor, pid)
+    finally:
+        conn.close()
+
+
+def ep_lifetimes(path):
+    import lifetimes
+    from products import PRODUCTS
+    conn = lifetimes.get_db()
+    try:
+        for pid in PRODUCTS:
+            lifetimes.survival_by_distance(conn.cursor(), pid)
+    finally:
+        conn.close()
+
+
+def ep_seasonality(path):
+    import seasonality
+    from products import PRODUCTS
+    conn = seasonality.get_db()
+    try:
+        seasonality.update(conn)
+        for pid in PRODUCTS:
+            seasonality.format_cheapest(conn.cursor(), pid)
+    finally:
+        conn.close()
+
+
+def ep_sales_daily(path):
+    import sales_daily
+    conn = sales_daily.get_db()
+    try:
+        sales_daily.summary(conn.cursor(), 7)
+        sales_daily.summary(conn.cursor(), 30, 1)
+    finally:
+        conn.close()
+
+
+def ep_charts(path):
+    """Daten + Rendering beider Chart-Scripts (PNGs in ein Temp-Verzeichnis)."""
+    import generate_daily_floor_charts as daily
+    import generate_weekly_charts as weekly
+    conn = connect_readonly(path)
+    try:
+        with tempfile.TemporaryDirectory() as out:
+            daily.OUTPUT_DIR = weekly.OUTPUT_DIR = Path(out)
+            for pid, name in daily.PRODUCTS.items():
+                daily.create_floor_chart(pid, name, daily.get_daily_floor_prices(conn, pid))
+            for pid, name in weekly.PRODUCTS.items():
+                weekly.create_chart(pid, name, weekly.get_weekly_averages(conn, pid))
+    finally:
+        conn.close()
+
+
+def ep_analysis_queries(path):
+    from archive import ensure_listings_all
+
+    conn = connect_readonly(path)
+    try:
+        ensure_listings_all(conn)  # Query 8 liest listings_all
+        for statement in sql_statements((BASE_DIR / 'analysis_queries_v2.sql').read_text()):
+            conn.execute(statement).fetchall()
+    finally:
+        conn.close()
+
+
+def sql_statements(script):
+    """Zerlegt ein SQL-Skript in einzelne Statements (Kommentarzeilen raus)."""
+    statements, buf = [], ''
+    for line in script.splitlines():
+        if line.strip().startswith('--'):
+            continue
+        buf += line + '\n'
+        if sqlite3.complete_statement(buf):
+            statements.append(buf.strip())
+            buf = ''
+    return statements
+
+
+ENTRY_POINTS = [
+    ('scraper', ep_scraper),
+    ('daily_report', ep_daily_report),
+    ('weekly_report', ep_weekly_report),
+    ('price_alerts', ep_price_alerts),
+    ('collection_alerts', ep_collection_alerts),
+    ('watchdog', ep_watchdog),
+    ('scheduler', ep_scheduler),
+    ('depth', ep_depth),
+    ('lifetimes', ep_lifetimes),
+    ('seasonality', ep_seasonality),
+    ('sales_daily', ep_sales_daily),
+    ('charts', ep_charts),
+    ('analysis_queries', ep_analysis_queries),
+]
+
+
+def prepare(path, ts_dir):
+    """
+    Env für die Einstiegspunkte setzen (vor deren Import!) und die Floor-Zeitreihen
+    in ts_dir aufbauen, damit Charts wie im Betrieb aus tsdata/ lesen.
+    """
+    os.environ['CARDMARKET_DB_PATH'] = str(path)
+    os.environ['CARDMARKET_TS_DIR'] = str(ts_dir)
+    import tsstore
+    from products import PRODUCTS
+    tsstore.TS_DIR = Path(ts_dir)
+    conn = connect_readonly(path)
+    try:
+        for pid in PRODUCTS:
+            tsstore.rebuild(conn, pid)
+    finally:
+        conn.close()
+
+
+def call(name, fn, path):
+    """Einstiegspunkt still ausführen. Returns None oder Fehlertext (ImportError → 'übersprungen: …')."""
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn(path)
+    except ImportError as e:
+        return f'übersprungen: {e}'
+    except Exception as e:
+        return f'{type(e).__name__}: {e}'
+    return None
+
+
+def bench(path, entry_points, repeat=BENCH_REPEAT):
+    """Returns Liste von Dicts (name, runs_ms, best_ms, median_ms, statements, error)."""
+    results = []
+    for name, fn in entry_points:
+        counter = [0]
+        db.set_trace(lambda sql: counter.__setitem__(0, counter[0] + 1))
+        runs, error = [], None
+        try:
+            for _ in range(repeat):
+                counter[0] = 0
+                t0 = time.perf_counter()
+                error = call(name, fn, path)
+                runs.append((time.perf_counter() - t0) * 1000)
+                if error:
+                    break
+        finally:
+            db.set_trace(None)
+        results.append({'name': name, 'runs_ms': [round(r, 2) for r in runs],
+                        'best_ms': round(min(runs), 2), 'median_ms': round(statistics.median(runs), 2),
+                        'statements': counter[0], 'error': error})
+    return results
+
+
+def db_summary(path):
+    conn = connect_readonly(path)
+    try:
+        counts = {t: conn.execute(f'SELECT COUNT(*) FROM {t}').fetchone()[0]
+                  for t in ('scrapes', 'listings', 'suspected_sales', 'card_prices')}
+        counts['products'] = conn.execute('SELECT COUNT(DISTINCT product_id) FROM scrapes').fetchone()[0]
+    finally:
+        conn.close()
+    counts['size_mb'] = round(os.path.getsize(path) / (1024 * 1024), 1)
+    return counts
+
+
+def print_results(results, old=None):
+    old = {r['name']: r for r in (old or [])}
+    print(f"\n   {'Einstieg':<18} {'best ms':>10} {'median ms':>10} {'SQL':>6}")
+    for r in results:
+        line = f"   {r['name']:<18} {r['best_ms']:>10.1f} {r['median_ms']:>10.1f} {r['statements']:>6}"
+        before = old.get(r['name'])
+        if before and before.get('median_ms') and not r['error']:
+            pct = (r['median_ms'] / before['median_ms'] - 1) * 100
+            mark = '🐢' if pct > BENCH_SLOWER_PCT else '🚀' if pct < -BENCH_SLOWER_PCT else '  '
+            line += f"  {mark} {before['median_ms']:.1f} → {r['median_ms']:.1f} ms ({pct:+.0f}%)"
+        if r['error']:
+            line += f"  {'⏭️ ' if r['error'].startswith('übersprungen') else '❌'} {r['error']}"
+        print(line)
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Report-/Alert-/Chart-Einstiegspunkte gegen eine (synthetische) DB timen')
+    ap.add_argument('--db', type=Path, default=Path(db.DB_PATH), help='DB (default: CARDMARKET_DB_PATH)')
+    ap.add_argument('--generate', action='store_true', help='synthetische DB frisch in /tmp erzeugen')
+    ap.add_argument('--days', type=int, help='nur mit --generate')
+    ap.add_argument('--products', type=int, help='nur mit --generate')
+    ap.add_argument('--listings', type=int, help='nur mit --generate')
+    ap.add_argument('--seed', type=int, default=1, help='nur mit --generate')
+    ap.add_argument('--repeat', type=int, default=BENCH_REPEAT)
+    ap.add_argument('--only', help='Komma-Liste von Einstiegspunkten')
+    ap.add_argument('--out', type=Path, help='Ergebnisse als JSON speichern')
+    ap.add_argument('--compare', type=Path, help='früheres --out zum Vergleich')
+    args = ap.parse_args()
+
+    entry_points = ENTRY_POINTS
+    if args.only:
+        names = set(args.only.split(','))
+        unknown = names - {name for name, _ in ENTRY_POINTS}
+        if unknown:
+            print(f"❌ Unbekannte Einstiegspunkte: {', '.join(sorted(unknown))}")
+            return 1
+        entry_points = [(name, fn) for name, fn in ENTRY_POINTS if name in names]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db
+        if args.generate:
+            from generate_synthetic_db import generate
+            path = Path(tmp) / 'synthetic.db'
+            os.environ['CARDMARKET_DB_PATH'] = str(path)  # vor dem ersten Import der Module (DB_PATH beim Import)
+            options = {k: v for k, v in (('days', args.days), ('products', args.products),
+                                         ('listings', args.listings)) if v is not None}
+            t0 = time.perf_counter()
+            generate(path, seed=args.seed, **options)
+            print(f"🧪 Synthetische DB erzeugt ({time.perf_counter() - t0:.0f}s)")
+        elif path.resolve() == LIVE_DB:
+            print("❌ Nicht gegen die Live-DB — die Einstiegspunkte schreiben. "
+                  "Erst 'python3 generate_synthetic_db.py /tmp/synthetic.db' oder --generate.")
+            return 1
+        elif not path.exists():
+            print(f"❌ DB nicht gefunden: {path}")
+            return 1
+
+        summary = db_summary(path)
+        print(f"🗄  {path}: {summary['size_mb']} MB, {summary['products']} Produkte, "
+              f"{summary['scrapes']:,} Scrapes, {summary['listings']:,} Listings, "
+              f"{summary['suspected_sales']:,} Verkäufe, {summary['card_prices']:,} Kartenpreise")
+        prepare(path, Path(tmp) / 'tsdata')
+        results = bench(path, entry_points, args.repeat)
+
+    old = json.loads(args.compare.read_text())['results'] if args.compare else None
+    print_results(results, old)
+    if args.out:
+        args.out.write_text(json.dumps({'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                                        'db': summary, 'repeat': args.repeat, 'results': results}, indent=1))
+        print(f"\n💾 {args.out}")
+    failed = [r for r in results if r['error'] and not r['error'].startswith('übersprungen')]
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+blocklist.py — Seller-Blocklist mit Gültigkeitszeitraum + rückwirkender Neuberechnung.
+
+Die Blocklist liegt in `seller_blocklist` (Seller-Name, valid_from, valid_until).
+Der Scraper liest beim Start die aktuell aktiven Einträge und verwirft deren
+Listings. Für die Historie rechnet `recompute` floor_price, total_listings,
+die Per-Scrape-Rollups und Listing-Lifetimes aller betroffenen Scrapes neu —
+ersetzt das manuelle `UPDATE scrapes SET floor_price = ...` pro Produkt/Preis.
+
+Usage:
+    python3 blocklist.py list
+    python3 blocklist.py add <seller> [--from YYYY-MM-DD] [--until YYYY-MM-DD] [--reason TEXT] [--no-recompute]
+    python3 blocklist.py remove <id> [--no-recompute]
+    python3 blocklist.py recompute [--seller NAME ...] [--all]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+from db import connect
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+
+from sellers import FLAG_BLOCKED
+
+
+def get_db():
+    return connect(DB_PATH)
+
+
+def blocked_sql(listing='l', scrape='s'):
+    """SQL-Bedingung: Listing stammt von einem zum Scrape-Zeitpunkt geblockten Seller."""
+    return f'''EXISTS (
+        SELECT 1 FROM seller_blocklist b
+        JOIN sellers bs ON bs.name = b.seller_name
+        WHERE bs.id = {listing}.seller_id
+          AND {scrape}.scraped_at >= b.valid_from
+          AND (b.valid_until IS NULL OR {scrape}.scraped_at < b.valid_until)
+    )'''
+
+
+def active_names(cursor):
+    """Namen aller Seller, die jetzt geblockt sind."""
+    cursor.execute('''
+        SELECT DISTINCT seller_name FROM seller_blocklist
+        WHERE valid_from <= datetime('now')
+          AND (valid_until IS NULL OR valid_until > datetime('now'))
+    ''')
+    return {r[0] for r in cursor.fetchall()}
+
+
+def _normalize_ts(value):
+    """'YYYY-MM-DD' oder 'YYYY-MM-DD HH:MM[:SS]' → 'YYYY-MM-DD HH:MM:SS' (Format von scraped_at)."""
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            continue
+    raise ValueError(f"Ungültiges Datum: {value}")
+
+
+def recompute(conn, seller_names=None):
+    """
+    Rechnet floor_price/total_listings + Rollups für alle Scrapes neu, die Listings
+    der gegebenen Seller enthalten (None = alle Scrapes). Returns Anzahl Scrapes.
+    """
+    from archive import listings_source
+    from scrape_stats import rebuild
+    from lifetimes import rebuild as rebuild_lifetimes
+    import tsstore
+
+    source = listings_source(conn)
+    cursor = conn.cursor()
+    cursor.execute('DROP TABLE IF EXISTS temp._affected')
+    cursor.execute('CREATE TEMP TABLE _affected (id INTEGER PRIMARY KEY)')
+    if seller_names is None:
+        cursor.execute("INSERT INTO _affected (id) SELECT id FROM scrapes WHERE mode = 'full'")
+    else:
+        marks = ', '.join('?' for _ in seller_names)
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO _affected (id)
+            SELECT DISTINCT l.scrape_id FROM {source} l
+            JOIN sellers se ON se.id = l.seller_id
+            WHERE se.name IN ({marks})
+        ''', tuple(seller_names))
+    # Ausgedünnte Scrapes (retention.py) haben nicht mehr alle Listings → Werte bleiben eingefroren
+    cursor.execute('DELETE FROM _affected WHERE id IN (SELECT scrape_id FROM listings_thinned)')
+
+    # Floor + DE-Count set-basiert in einem UPDATE (Scrapes ohne gültige Listings → NULL/0)
+    cursor.execute(f'''
+        UPDATE scrapes SET floor_price = v.floor, total_listings = v.n
+        FROM (
+            SELECT a.id,
+                   MIN(l.price) AS floor,
+                   COUNT(l.id) AS n
+            FROM _affected a
+            JOIN scrapes s ON s.id = a.id
+            LEFT JOIN {source} l ON l.scrape_id = a.id AND l.location = 'Germany'
+                 AND NOT {blocked_sql('l', 's')}
+            GROUP BY a.id
+        ) v
+        WHERE scrapes.id = v.id
+    ''')
+
+    cursor.execute('SELECT id FROM _affected ORDER BY id')
+    scrape_ids = [r[0] for r in cursor.fetchall()]
+    rebuild(conn, scrape_ids)
+
+    # Lifetimes hängen an der Listing-Folge → betroffene Produkte komplett neu
+    cursor.execute('SELECT DISTINCT s.product_id FROM scrapes s JOIN _affected a ON a.id = s.id')
+    products = [r[0] for r in cursor.fetchall()]
+    for pid in products:
+        rebuild_lifetimes(conn, pid)
+
+    # sellers.flags spiegeln (nur Info)
+    cursor.execute('UPDATE sellers SET flags = flags & ~? WHERE flags & ?', (FLAG_BLOCKED, FLAG_BLOCKED))
+    cursor.execute('''
+        UPDATE sellers SET flags = flags | ?
+        WHERE name IN (SELECT seller_name FROM seller_blocklist
+                       WHERE valid_until IS NULL OR valid_until > datetime('now'))
+    ''', (FLAG_BLOCKED,))
+    conn.commit()
+
+    # Floor-Zeitreihen (tsdata/) tragen die alten Floors → betroffene Produkte neu schreiben
+    for pid in products:
+        tsstore.rebuild(conn, pid)
+    return len(scrape_ids)
+
+
+def cmd_list(conn, args):
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT id, seller_name, valid_from, valid_until, reason FROM seller_blocklist
+        ORDER BY valid_from
+    ''')
+    rows = cursor.fetchall()
+    if not rows:
+        print("Blocklist ist leer.")
+        return 0
+    for bid, name, vfrom, vuntil, reason in rows:
+        print(f"#{bid:<3} {name:<20} {vfrom[:10]} → {(vuntil or 'offen')[:10]:<10}  {reason or ''}")
+    return 0
+
+
+def cmd_add(conn, args):
+    valid_from = _normalize_ts(args.valid_from) if args.valid_from else datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    valid_until = _normalize_ts(args.until) if args.until else None
+    conn.execute('''
+        INSERT INTO seller_blocklist (seller_name, valid_from, valid_until, reason)
+        VALUES (?, ?, ?, ?)
+    ''', (args.seller, valid_from, valid_until, args.reason))
+    conn.commit()
+    print(f"🚫 Geblockt: {args.seller} ab {valid_from[:10]}" + (f" bis {valid_until[:10]}" if valid_until else ''))
+    if not args.no_recompute:
+        n = recompute(conn, [args.seller])
+        print(f"🔁 {n} Scrapes neu berechnet")
+    return 0
+
+
+def cmd_remove(conn, args):
+    row = conn.execute('SELECT seller_name FROM seller_blocklist WHERE id = ?', (args.id,)).fetchone()
+    if not row:
+        print(f"❌ Kein Blocklist-Eintrag #{args.id}")
+        return 1
+    conn.execute('DELETE FROM seller_blocklist WHERE id = ?', (args.id,))
+    conn.commit()
+    print(f"✅ Entfernt: #{args.id} ({row[0]})")
+    if not args.no_recompute:
+        n = recompute(conn, [row[0]])
+        print(f"🔁 {n} Scrapes neu berechnet")
+    return 0
+
+
+def cmd_recompute(conn, args):
+    if args.all:
+        names = None
+    elif args.seller:
+        names = args.seller
+    else:
+        names = [r[0] for r in conn.execute('SELECT DISTINCT seller_name FROM seller_blocklist')]
+    n = recompute(conn, names)
+    print(f"🔁 {n} Scrapes neu berechnet")
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Seller-Blocklist verwalten')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+
+    sub.add_parser('list', help='Alle Einträge anzeigen')
+
+    p_add = sub.add_parser('add', help='Seller blocken (mit rückwirkender Neuberechnung)')
+    p_add.add_argument('seller')
+    p_add.add_argument('--from', dest='valid_from', help='Gültig ab (default: jetzt)')
+    p_add.add_argument('--until', help='Gültig bis (default: unbefristet)')
+    p_add.add_argument('--reason', help='Begründung')
+    p_add.add_argument('--no-recompute', action='store_true')
+
+    p_rm = sub.add_parser('remove', help='Eintrag löschen')
+    p_rm.add_argument('id', type=int)
+    p_rm.add_argument('--no-recompute', action='store_true')
+
+    p_re = sub.add_parser('recompute', help='Floors + Rollups neu berechnen')
+    p_re.add_argument('--seller', action='append', help='Nur Scrapes mit Listings dieses Sellers (mehrfach möglich)')
+    p_re.add_argument('--all', action='store_true', help='Alle Scrapes')
+
+    args = ap.parse_args()
+
+    from migrate import ensure_schema
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        return {'list': cmd_list, 'add': cmd_add, 'remove': cmd_remove, 'recompute': cmd_recompute}[args.cmd](conn, args)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
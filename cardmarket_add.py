@@ -20,7 +20,6 @@ Idempotent: if URL/slug already tracked, exits cleanly.
 import argparse
 import os
 import re
-import sqlite3
 import subprocess
 import sys
 from pathlib import Path
@@ -28,6 +27,7 @@ from pathlib import Path
 REPO = Path(__file__).resolve().parent
 sys.path.insert(0, str(REPO))
 
+from db import connect  # noqa: E402
 from products import PRODUCTS, by_slug  # noqa: E402
 
 DB_PATH = REPO / 'cardmarket.db'
@@ -143,7 +143,7 @@ def patch_scraper_py(new_id, info):
 
 
 def db_insert(new_id, info):
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     try:
         url_path = info['url'].split('cardmarket.com', 1)[-1]
         conn.execute(
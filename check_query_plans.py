@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+check_query_plans.py — Query-Plan-Regression für das Produktions-SQL.
+
+Baut eine synthetische DB (generate_synthetic_db.py, Monate stündlicher Scrapes für
+alle Produkte) und führt darauf die Einstiegspunkte aus bench.py aus: Scraper-Speichern,
+Daily/Weekly Report, ATL-Alerts, Sammlungs-Alerts, Watchdog, Scheduler, Tiefe,
+Lifetimes, Saisonalität, Charts und analysis_queries_v2.sql. Jedes dabei ausgeführte Statement
+wird per Trace (db.set_trace) eingesammelt, bekommt ein EXPLAIN QUERY PLAN und —
+bei Lese-Statements — eine Laufzeit (bestes von TIMING_RUNS).
+
+Fehlschlag (Exit 1), wenn ein Plan eine große Tabelle (≥ LARGE_TABLE_ROWS Zeilen)
+komplett durchläuft (SCAN, auch über einen Covering-Index), außer das Statement steht
+in ALLOWED_SCANS. Mit --out werden Pläne + Timings als JSON gespeichert, --compare
+zeigt Laufzeit- und Plan-Änderungen gegenüber einem früheren Lauf — so lassen sich
+Index- und Schema-Änderungen mit Zahlen beurteilen.
+
+Usage:
+    python3 check_query_plans.py                            # synthetische DB (Default-Größe)
+    python3 check_query_plans.py --days 365 --products 20 --listings 200  # größer
+    python3 check_query_plans.py --db /tmp/kopie.db         # vorhandene DB — wird beschrieben, nur Kopien!
+    python3 check_query_plans.py --out plans.json --compare plans-vorher.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import db
+from bench import ENTRY_POINTS, call, prepare
+from db import connect_readonly
+
+LIVE_DB = Path(db.DB_PATH).resolve()
+
+LARGE_TABLE_ROWS = 10_000
+TIMING_RUNS = 3
+
+# Normalisiertes SQL (Präfix) → Begründung, warum ein Full-Scan hier in Ordnung ist
+ALLOWED_SCANS = {}
+
+SYNTH_DAYS = 120           # Default-Größe der synthetischen DB (generate_synthetic_db.py)
+SYNTH_LISTINGS = 80
+
+_LITERAL = re.compile(r"(?:\b[xX])?'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_SQL_WORDS = {'WHERE', 'JOIN', 'LEFT', 'INNER', 'CROSS', 'ON', 'USING', 'GROUP', 'ORDER', 'LIMIT',
+              'UNION', 'SET', 'AS', 'WINDOW', 'NATURAL', 'OUTER'}
+
+
+def normalize(sql):
+    """Literale → ?, IN-Listen zusammengefasst, Whitespace vereinheitlicht (Schlüssel pro Query)."""
+    return _IN_LIST.sub('IN (…)', ' '.join(_LITERAL.sub('?', sql).split()))
+
+
+# --- Trace + Plan ---
+
+class Collector:
+    """Trace-Callback: sammelt DML/SELECT-Statements pro normalisierter Form."""
+
+    def __init__(self):
+        self.entry = None
+        self.queries = {}
+
+    def __call__(self, sql):
+        words = sql.split(None, 1)
+        if not words or words[0].upper() not in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE'):
+            return  # PRAGMA, BEGIN/COMMIT, Trigger-Statements ('-- …'), DDL
+        key = normalize(sql)
+        q = self.queries.setdefault(key, {'key': key, 'sql': sql, 'entry': self.entry, 'calls': 0})
+        q['calls'] += 1
+
+
+def table_sizes(conn):
+    tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    return {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tables}
+
+
+def full_scans(sql, plan, sizes):
+    """Große Tabellen, die laut Plan komplett durchlaufen werden."""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias and alias.upper() not in _SQL_WORDS:
+            aliases[alias] = table
+    scans = []
+    for detail in plan:
+        m = re.match(r'SCAN (\w+)', detail)
+        if not m:
+            continue
+        table = aliases.get(m.group(1), m.group(1))
+        if sizes.get(table, 0) >= LARGE_TABLE_ROWS:
+            scans.append(table)
+    return scans
+
+
+def analyse(conn, query, sizes):
+    sql = query['sql']
+    try:
+        query['plan'] = [r[3] for r in conn.execute('EXPLAIN QUERY PLAN ' + sql)]
+    except sqlite3.Error as e:
+        query['plan'], query['error'] = [], str(e)  # z.B. TEMP-Tabellen einer anderen Verbindung
+        return query
+    query['scans'] = full_scans(sql, query['plan'], sizes)
+    query['allowed'] = next((why for prefix, why in ALLOWED_SCANS.items() if query['key'].startswith(prefix)), None)
+    if sql.split(None, 1)[0].upper() in ('SELECT', 'WITH'):
+        best = None
+        for _ in range(TIMING_RUNS):
+            t0 = time.perf_counter()
+            conn.execute(sql).fetchall()
+            best = min(best or 1e9, (time.perf_counter() - t0) * 1000)
+        query['ms'] = round(best, 3)
+    return query
+
+
+def run(path, ts_dir):
+    """Führt alle Einstiegspunkte mit Trace aus. Returns (queries, sizes, fehlgeschlagene Einstiegspunkte)."""
+    prepare(path, ts_dir)
+    collector = Collector()
+    failed = []
+    db.set_trace(collector)
+    try:
+        for name, fn in ENTRY_POINTS:
+            collector.entry = name
+            error = call(name, fn, path)
+            if error and error.startswith('übersprungen'):
+                print(f"   ⏭️  {name}: {error}")
+            elif error:
+                failed.append(name)
+                print(f"   ❌ {name}: {error}")
+    finally:
+        db.set_trace(None)
+
+    conn = connect_readonly(path)
+    try:
+        sizes = table_sizes(conn)
+        queries = [analyse(conn, q, sizes) for q in collector.queries.values()]
+    finally:
+        conn.close()
+    return queries, sizes, failed
+
+
+def print_report(queries):
+    print(f"\n   {'ms':>9}  {'Calls':>5}  {'Einstieg':<17} Statement")
+    for q in sorted(queries, key=lambda q: -(q.get('ms') or 0)):
+        ms = f"{q['ms']:.2f}" if 'ms' in q else '—'
+        flag = '❌' if q.get('scans') and not q.get('allowed') else ('⚠️ ' if q.get('error') else '  ')
+        print(f"{flag} {ms:>9}  {q['calls']:>5}  {q['entry']:<17} {q['key'][:90]}")
+
+
+def compare(queries, old_path):
+    old = {q['key']: q for q in json.loads(Path(old_path).read_text())['queries']}
+    new = {q['key']: q for q in queries}
+    print(f"\n📊 Vergleich mit {old_path}")
+    for key, q in new.items():
+        before = old.get(key)
+        if before is None:
+            print(f"   🆕 {q['entry']:<17} {key[:90]}")
+            continue
+        if before.get('plan') != q.get('plan'):
+            print(f"   🔀 Plan geändert: {key[:90]}\n      vorher: {before.get('plan')}\n      jetzt:  {q.get('plan')}")
+        if before.get('ms') and q.get('ms') and abs(q['ms'] - before['ms']) > 0.2 * before['ms'] + 0.05:
+            print(f"   {'🐢' if q['ms'] > before['ms'] else '🚀'} {before['ms']:.2f} → {q['ms']:.2f} ms  {key[:80]}")
+    for key in old.keys() - new.keys():
+        print(f"   ➖ entfallen: {key[:90]}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description='EXPLAIN QUERY PLAN + Timings für alle Produktions-Queries')
+    ap.add_argument('--db', type=Path, help='vorhandene DB statt synthetischer (wird beschrieben)')
+    ap.add_argument('--days', type=int, default=SYNTH_DAYS)
+    ap.add_argument('--products', type=int, help='Anzahl Produkte (default: die aus products.py)')
+    ap.add_argument('--listings', type=int, default=SYNTH_LISTINGS)
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--out', type=Path, help='Pläne + Timings als JSON speichern')
+    ap.add_argument('--compare', type=Path, help='früheres --out zum Vergleich')
+    args = ap.parse_args()
+
+    if args.db and args.db.resolve() == LIVE_DB:
+        print("❌ Nicht gegen die Live-DB — die Einstiegspunkte schreiben (Scrape, Saisonalität). Erst kopieren.")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db
+        if path is None:
+            from generate_synthetic_db import generate
+            path = Path(tmp) / 'synthetic.db'
+            os.environ['CARDMARKET_DB_PATH'] = str(path)  # vor dem ersten Import der Module (DB_PATH beim Import)
+            t0 = time.perf_counter()
+            generate(path, args.days, args.products, args.listings, seed=args.seed)
+            print(f"🧪 Synthetische DB: {args.days} Tage × {args.listings} Listings "
+                  f"({path.stat().st_size / (1024 * 1024):.0f} MB, {time.perf_counter() - t0:.1f}s)")
+        queries, sizes, failed = run(path, Path(tmp) / 'tsdata')
+
+    print_report(queries)
+    violations = [q for q in queries if q.get('scans') and not q.get('allowed')]
+    for q in violations:
+        print(f"\n❌ Full-Scan auf {', '.join(sorted(set(q['scans'])))} ({q['entry']}):\n   {q['key']}")
+        for detail in q['plan']:
+            print(f"      {detail}")
+
+    if args.out:
+        args.out.write_text(json.dumps({'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                                        'sizes': sizes, 'queries': queries}, indent=1))
+        print(f"\n💾 {args.out}")
+    if args.compare:
+        compare(queries, args.compare)
+
+    print(f"\n{'❌' if violations or failed else '✅'} {len(queries)} Statements, "
+          f"{len(violations)} mit Full-Scan, {len(failed)} Einstiegspunkte fehlgeschlagen")
+    return 1 if violations or failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,13 +12,14 @@ Run via cron every 6h, direkt nach collection_sync.py.
 """
 
 import os
-import sqlite3
 import sys
 import json
 import urllib.parse
 import urllib.request
 from pathlib import Path
 
+from db import connect
+
 REPO = Path(__file__).resolve().parent
 DB_PATH = REPO / 'cardmarket.db'
 ENV_FILE = REPO / '.env'
@@ -151,7 +152,7 @@ def format_alert(a):
 
 def main():
     load_env()
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     try:
         cards = get_collected_cards(conn)
         evaluated = []  # list of (card_id, alert_dict)
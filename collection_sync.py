@@ -12,12 +12,13 @@ Run via cron every 6h.
 
 import json
 import os
-import sqlite3
 import sys
 import urllib.parse
 import urllib.request
 from pathlib import Path
 
+from db import connect
+
 REPO = Path(__file__).resolve().parent
 DB_PATH = REPO / 'cardmarket.db'
 ENV_FILE = REPO / '.env'
@@ -134,7 +135,7 @@ def main():
     cards_index = fetch_cards_index()
     print(f"   → {len(cards_index)} cards in index")
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     try:
         n_coll = upsert_collection(conn, items)
         collection_ids = [it['card'] for it in items if int(it.get('standard') or 0) + int(it.get('foil') or 0) > 0]
@@ -4,12 +4,11 @@ Cardmarket Daily Report v2 - Premium Telegram Report
 Sparklines, Trends, Insights, Market Overview
 """
 
-import sqlite3
 import os
 import json
 import urllib.request
 import urllib.parse
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 # .env laden
@@ -26,15 +25,17 @@ DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.a
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
+from db import connect_readonly
 from products import PRODUCTS, by_category, boxes as box_products
+from series import bucketed_floors, floor_sql, floor_window, valid_floors
+from seasonality import format_cheapest
 
 SPARKLINE_CHARS = '▁▂▃▄▅▆▇█'
+SPARKLINE_BUCKETS = 24  # 1 Punkt pro Stunde, unabhängig von der Scrape-Frequenz
 
 
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute('PRAGMA busy_timeout = 5000')
-    return conn
+    return connect_readonly(DB_PATH)
 
 
 def send_telegram_message(message):
@@ -69,30 +70,42 @@ def sparkline(values):
 
 
 def get_24h_floors(cursor, product_id):
-    """Holt stündliche Floor-Preise der letzten 24h."""
-    cursor.execute('''
-        SELECT floor_price, scraped_at
-        FROM scrapes
-        WHERE product_id = ? AND scraped_at > datetime('now', '-24 hours')
-        ORDER BY scraped_at ASC
+    """Stündliche Floor-Tiefs der letzten 24h (in SQL gebucketet)."""
+    return bucketed_floors(cursor, product_id, window='-24 hours',
+                           buckets=SPARKLINE_BUCKETS, agg='min')
+
+
+def get_24h_range(cursor, product_id):
+    """Min/Max Floor der letzten 24h (aus der Floor-Zeitreihe, ohne Datei per SQL)."""
+    records = floor_window(cursor, product_id, since='-24 hours')
+    if records is not None:
+        floors = valid_floors(records)
+        return (float(floors.min()), float(floors.max())) if len(floors) else (None, None)
+
+    floor, join = floor_sql()
+    cursor.execute(f'''
+        SELECT MIN({floor}), MAX({floor})
+        FROM scrapes s {join}
+        WHERE s.product_id = ? AND s.scraped_ts > CAST(strftime('%s', 'now', '-24 hours') AS INTEGER)
     ''', (product_id,))
-    return cursor.fetchall()
+    return cursor.fetchone()
 
 
 def get_current_and_previous(cursor, product_id):
     """Aktueller + 24h-vorheriger Scrape."""
-    cursor.execute('''
-        SELECT floor_price, total_listings, scraped_at
-        FROM scrapes WHERE product_id = ?
-        ORDER BY id DESC LIMIT 1
+    floor, join = floor_sql()
+    cursor.execute(f'''
+        SELECT {floor}, s.total_listings, s.scraped_ts
+        FROM scrapes s {join} WHERE s.product_id = ?
+        ORDER BY s.id DESC LIMIT 1
     ''', (product_id,))
     current = cursor.fetchone()
 
-    cursor.execute('''
-        SELECT floor_price, total_listings
-        FROM scrapes
-        WHERE product_id = ? AND scraped_at < datetime('now', '-20 hours')
-        ORDER BY id DESC LIMIT 1
+    cursor.execute(f'''
+        SELECT {floor}, s.total_listings
+        FROM scrapes s {join}
+        WHERE s.product_id = ? AND s.scraped_ts < CAST(strftime('%s', 'now', '-20 hours') AS INTEGER)
+        ORDER BY s.id DESC LIMIT 1
     ''', (product_id,))
     previous = cursor.fetchone()
 
@@ -101,10 +114,11 @@ def get_current_and_previous(cursor, product_id):
 
 def get_suspected_sales_24h(cursor):
     cursor.execute('''
-        SELECT p.name, COUNT(*) as cnt, MIN(s.price) as min_p, MAX(s.price) as max_p
+        SELECT p.name, SUM(s.quantity) as cnt, MIN(s.price) as min_p, MAX(s.price) as max_p
         FROM suspected_sales s
         JOIN products p ON s.product_id = p.id
         WHERE s.detected_at > datetime('now', '-24 hours')
+          AND s.confidence IN ('high', 'medium')
         GROUP BY s.product_id
     ''')
     return cursor.fetchall()
@@ -144,6 +158,7 @@ def generate_report():
         for pid, pcfg in cat_products.items():
             current, previous = get_current_and_previous(cursor, pid)
             floors_24h = get_24h_floors(cursor, pid)
+            range_24h = get_24h_range(cursor, pid)
 
             if not current:
                 lines.append(f'{pcfg["emoji"]} <b>{pcfg["short_name"]}</b>: Keine Daten')
@@ -158,17 +173,14 @@ def generate_report():
             prices = [r[0] for r in floors_24h]
             times = [r[1] for r in floors_24h]
 
-            low_24h = min(prices) if prices else floor
-            high_24h = max(prices) if prices else floor
+            low_24h = range_24h[0] if range_24h and range_24h[0] is not None else floor
+            high_24h = range_24h[1] if range_24h and range_24h[1] is not None else floor
             spark = sparkline(prices)
 
             best_time = '—'
             if prices and times:
                 min_idx = prices.index(min(prices))
-                try:
-                    best_time = datetime.fromisoformat(times[min_idx]).strftime('%H:%M')
-                except:
-                    best_time = times[min_idx][-5:]
+                best_time = datetime.fromtimestamp(times[min_idx], timezone.utc).strftime('%H:%M')
 
             change_str = format_change(floor, prev_floor)
 
@@ -184,6 +196,9 @@ def generate_report():
             lines.append(f'   <code>{spark}</code>')
             if low_24h < floor:
                 lines.append(f'   ⏰ Tief: {best_time} ({low_24h:.2f}€)')
+            typical = format_cheapest(cursor, pid)
+            if typical:
+                lines.append(f'   📅 typisch am günstigsten: {typical}')
             lines.append('')
 
             product_data[pid] = {
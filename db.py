@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+db.py — Gemeinsame SQLite-Verbindungen für alle Scripts.
+
+Jede Verbindung bekommt dieselben Einstellungen:
+- journal_mode = WAL        → Leser blockieren den Scraper nicht und umgekehrt
+- synchronous = NORMAL      → fsync nur am Checkpoint (in WAL trotzdem crash-sicher)
+- mmap_size / cache_size    → Lesen über gemappte Pages, größerer Page-Cache
+- temp_store = MEMORY       → Sortierungen/Temp-B-Trees nicht auf Platte
+- busy_timeout              → einheitlich statt pro Script
+- cached_statements         → mehr vorbereitete Statements pro Verbindung im Cache
+Beim Schließen läuft `PRAGMA optimize` (aktualisiert Statistiken nur wo nötig).
+
+connect() ist die Schreib-Verbindung (Scraper, Rollups, Migrationen),
+connect_readonly() öffnet mit mode=ro für Reports, Charts und Watchdog.
+
+Usage:
+    from db import connect, connect_readonly
+
+    conn = connect()                 # CARDMARKET_DB_PATH oder ./cardmarket.db
+    conn = connect_readonly(path)
+
+    python3 db.py info               # aktive PRAGMAs der DB anzeigen
+    python3 db.py bench [--seconds 5]  # Lese-Latenz während Scraper-Writes, alt vs. neu
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+
+BUSY_TIMEOUT_MS = 5000
+MMAP_SIZE = 256 * 1024 * 1024      # Bytes; größer als die DB schadet nicht
+CACHE_SIZE_KIB = 64 * 1024         # negativ an SQLite übergeben = KiB statt Pages
+STATEMENT_CACHE = 256              # sqlite3-Default ist 128
+
+_trace = None                      # set_trace(): Callback für jedes ausgeführte Statement
+
+
+class Connection(sqlite3.Connection):
+    """sqlite3.Connection mit `PRAGMA optimize` beim Schließen."""
+
+    readonly = False
+
+    def close(self):
+        if not self.readonly:
+            try:
+                self.execute('PRAGMA optimize')
+            except sqlite3.Error:
+                pass  # z.B. DB gerade gesperrt — Statistiken kommen beim nächsten Mal
+        super().close()
+
+
+def set_trace(callback):
+    """Alle ab jetzt geöffneten Verbindungen melden jedes Statement an callback(sql) (check_query_plans.py)."""
+    global _trace
+    _trace = callback
+
+
+def apply_pragmas(conn, readonly=False):
+    conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    conn.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+    conn.execute(f'PRAGMA cache_size = -{CACHE_SIZE_KIB}')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    if not readonly:
+        # journal_mode ist persistent in der DB-Datei, synchronous gilt pro Verbindung
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+    if _trace is not None:
+        conn.set_trace_callback(_trace)  # nach den PRAGMAs, die interessieren nicht
+    return conn
+
+
+def connect(path=None):
+    """Schreib-Verbindung mit den gemeinsamen PRAGMAs."""
+    conn = sqlite3.connect(path or DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000,
+                           factory=Connection, cached_statements=STATEMENT_CACHE)
+    return apply_pragmas(conn)
+
+
+def connect_readonly(path=None):
+    """Nur-Lese-Verbindung (mode=ro); Schreibversuche schlagen mit OperationalError fehl."""
+    uri = f'file:{quote(os.path.abspath(path or DB_PATH))}?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT_MS / 1000,
+                           factory=Connection, cached_statements=STATEMENT_CACHE)
+    conn.readonly = True
+    return apply_pragmas(conn, readonly=True)
+
+
+# --- Benchmark ---
+
+BENCH_PRODUCTS = 7
+BENCH_LISTINGS = 50      # Listings pro simuliertem Scrape
+BENCH_HISTORY = 20000    # Scrapes vorab
+
+
+def _bench_setup(path, wal):
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA journal_mode = {'WAL' if wal else 'DELETE'}")
+    conn.executescript('''
+        CREATE TABLE scrapes (id INTEGER PRIMARY KEY, product_id INTEGER, scraped_at TEXT, floor_price REAL);
+        CREATE TABLE listings (id INTEGER PRIMARY KEY, scrape_id INTEGER, price REAL, quantity INTEGER);
+        CREATE INDEX idx_scrapes_product_time ON scrapes (product_id, scraped_at);
+        CREATE INDEX idx_listings_scrape ON listings (scrape_id);
+    ''')
+    conn.executemany('INSERT INTO scrapes (product_id, scraped_at, floor_price) VALUES (?, datetime(?, "unixepoch"), ?)',
+                     [(i % BENCH_PRODUCTS + 1, 1700000000 + i * 600, 100 + i % 37) for i in range(BENCH_HISTORY)])
+    conn.commit()
+    conn.close()
+
+
+def _bench_writer(open_conn, stop):
+    """Simuliert save_to_db: ein Scrape + Listings pro Transaktion, fsync inklusive."""
+    conn = open_conn()
+    i = 0
+    while not stop.is_set():
+        cur = conn.cursor()
+        cur.execute("INSERT INTO scrapes (product_id, scraped_at, floor_price) VALUES (?, datetime('now'), ?)",
+                    (i % BENCH_PRODUCTS + 1, 100 + i % 13))
+        sid = cur.lastrowid
+        cur.executemany('INSERT INTO listings (scrape_id, price, quantity) VALUES (?, ?, 1)',
+                        [(sid, 100 + k) for k in range(BENCH_LISTINGS)])
+        conn.commit()
+        i += 1
+    conn.close()
+    return i
+
+
+def _bench_run(label, open_writer, open_reader, seconds):
+    stop = threading.Event()
+    writes = []
+    writer = threading.Thread(target=lambda: writes.append(_bench_writer(open_writer, stop)))
+    writer.start()
+
+    reader = open_reader()
+    latencies, i = [], 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        reader.execute('''
+            SELECT floor_price, scraped_at FROM scrapes
+            WHERE product_id = ? ORDER BY scraped_at DESC LIMIT 1
+        ''', (i % BENCH_PRODUCTS + 1,)).fetchall()
+        reader.execute('''
+            SELECT MIN(floor_price), MAX(floor_price) FROM scrapes
+            WHERE product_id = ? AND scraped_at >= datetime('now', '-1 day')
+        ''', (i % BENCH_PRODUCTS + 1,)).fetchall()
+        latencies.append((time.perf_counter() - t0) * 1000)
+        i += 1
+    stop.set()
+    writer.join()
+    reader.close()
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]  # noqa: E731
+    print(f"   {label:<8} {len(latencies):>7} {statistics.median(latencies):>8.3f} {p(0.95):>8.3f} "
+          f"{p(0.99):>8.3f} {latencies[-1]:>8.1f} {writes[0] if writes else 0:>7}")
+
+
+def bench(seconds=5):
+    """Lese-Latenz (ms) während eines dauernd schreibenden Scrapers: alte Einzel-Connects vs. db.py."""
+    print(f"⏱  Lese-Latenz unter Schreiblast ({seconds}s pro Variante, {BENCH_HISTORY} Scrapes Historie)")
+    print(f"   {'Variante':<8} {'Reads':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'Writes':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, 'legacy.db')
+        _bench_setup(legacy, wal=False)
+
+        def legacy_conn():
+            conn = sqlite3.connect(legacy)
+            conn.execute('PRAGMA busy_timeout = 5000')
+            return conn
+        _bench_run('alt', legacy_conn, legacy_conn, seconds)
+
+        tuned = os.path.join(tmp, 'tuned.db')
+        _bench_setup(tuned, wal=True)
+        _bench_run('db.py', lambda: connect(tuned), lambda: connect_readonly(tuned), seconds)
+
+
+def info(path=None):
+    conn = connect_readonly(path)
+    try:
+        for pragma in ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store',
+                       'busy_timeout', 'page_size', 'page_count', 'freelist_count'):
+            print(f"   {pragma:<15} {conn.execute(f'PRAGMA {pragma}').fetchone()[0]}")
+    finally:
+        conn.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Gemeinsame SQLite-Verbindungen')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('info', help='PRAGMAs der DB anzeigen')
+    p_bench = sub.add_parser('bench', help='Lese-Latenz unter Schreiblast messen')
+    p_bench.add_argument('--seconds', type=float, default=5)
+    args = ap.parse_args()
+
+    if args.cmd == 'bench':
+        bench(args.seconds)
+        return 0
+    if not os.path.exists(DB_PATH):
+        print(f"❌ DB nicht gefunden: {DB_PATH}")
+        return 1
+    print(f"🗄  {DB_PATH}")
+    info()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+depth.py — "Was kostet es, jetzt N Boxen zu kaufen?" aus der vorberechneten Tiefenkurve.
+
+Liest `scrape_depth` (vom Scraper pro Scrape befüllt, siehe scrape_stats.py),
+kein Sortieren der listings-Tabelle nötig.
+
+Usage: python3 depth.py <product> [--units N] [--days 7]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+
+from db import connect_readonly
+from products import PRODUCTS, by_slug
+from scrape_stats import DEPTH_MAX_UNITS
+
+
+def get_db():
+    return connect_readonly(DB_PATH)
+
+
+def cost_now(cursor, product_id, units):
+    """Letzter Scrape mit Tiefenkurve → (scraped_ts, total_cost, marginal_price) oder None."""
+    cursor.execute('''
+        SELECT s.scraped_ts, d.total_cost, d.marginal_price
+        FROM scrapes s
+        JOIN scrape_depth d ON d.scrape_id = s.id AND d.units = ?
+        WHERE s.product_id = ?
+        ORDER BY s.id DESC LIMIT 1
+    ''', (units, product_id))
+    return cursor.fetchone()
+
+
+def cost_before(cursor, product_id, units, modifier):
+    """Kosten für N Einheiten beim letzten Scrape vor now+modifier (z.B. '-24 hours')."""
+    cursor.execute('''
+        SELECT s.scraped_ts, d.total_cost
+        FROM scrapes s
+        JOIN scrape_depth d ON d.scrape_id = s.id AND d.units = ?
+        WHERE s.product_id = ? AND s.scraped_ts < CAST(strftime('%s', 'now', ?) AS INTEGER)
+        ORDER BY s.id DESC LIMIT 1
+    ''', (units, product_id, modifier))
+    return cursor.fetchone()
+
+
+def daily_costs(cursor, product_id, units, days=7):
+    """Pro Tag: (day, min_cost, max_cost, last_cost, n_scrapes) der letzten `days` Tage."""
+    cursor.execute('''
+        SELECT date(s.scraped_ts, 'unixepoch') AS day, MIN(d.total_cost), MAX(d.total_cost),
+               (SELECT d2.total_cost FROM scrapes s2
+                JOIN scrape_depth d2 ON d2.scrape_id = s2.id AND d2.units = ?
+                WHERE s2.product_id = ? AND s2.scraped_ts >= s.scraped_ts / 86400 * 86400
+                  AND s2.scraped_ts < s.scraped_ts / 86400 * 86400 + 86400
+                ORDER BY s2.id DESC LIMIT 1),
+               COUNT(*)
+        FROM scrapes s
+        JOIN scrape_depth d ON d.scrape_id = s.id AND d.units = ?
+        WHERE s.product_id = ? AND s.scraped_ts > CAST(strftime('%s', 'now', ?) AS INTEGER)
+        GROUP BY day
+        ORDER BY day ASC
+    ''', (units, product_id, units, product_id, f'-{days} days'))
+    return cursor.fetchall()
+
+
+def max_available_units(cursor, product_id):
+    """Wie viele Einheiten deckt die letzte Tiefenkurve ab (≤ DEPTH_MAX_UNITS)?"""
+    cursor.execute('''
+        SELECT MAX(d.units) FROM scrape_depth d
+        WHERE d.scrape_id = (SELECT MAX(id) FROM scrapes WHERE product_id = ? AND mode = 'full')
+    ''', (product_id,))
+    row = cursor.fetchone()
+    return row[0] if row and row[0] else 0
+
+
+def format_delta(current, previous):
+    if previous is None:
+        return '—'
+    diff = current - previous
+    pct = diff / previous * 100 if previous else 0
+    sign = '+' if diff > 0 else ''
+    return f'{sign}{diff:.2f}€ ({sign}{pct:.1f}%)'
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Kosten für N Einheiten (DE-Seller) aus der Tiefenkurve')
+    ap.add_argument('product', help=f"Produkt-Slug ({', '.join(p['slug'] for p in PRODUCTS.values())})")
+    ap.add_argument('--units', type=int, default=1, help=f'Anzahl Einheiten (1..{DEPTH_MAX_UNITS})')
+    ap.add_argument('--days', type=int, default=7, help='Verlauf über N Tage (default 7)')
+    args = ap.parse_args()
+
+    pid, pcfg = by_slug(args.product.lower())
+    if pid is None:
+        print(f"❌ Unknown product: {args.product}")
+        return 1
+    if not 1 <= args.units <= DEPTH_MAX_UNITS:
+        print(f"❌ --units muss zwischen 1 und {DEPTH_MAX_UNITS} liegen (so weit ist die Tiefe vorberechnet)")
+        return 1
+
+    conn = get_db()
+    cursor = conn.cursor()
+    try:
+        now = cost_now(cursor, pid, args.units)
+        if not now:
+            avail = max_available_units(cursor, pid)
+            print(f"⚠️  {pcfg['name']}: keine Daten für {args.units} Einheiten "
+                  f"(letzter Scrape deckt {avail} Einheiten ab)")
+            return 1
+
+        scraped_ts, total, marginal = now
+        print(f"{pcfg['emoji']} {pcfg['name']} — {args.units}x kaufen (DE-Seller)")
+        print(f"   Stand: {datetime.fromtimestamp(scraped_ts, timezone.utc):%Y-%m-%d %H:%M:%S}")
+        print(f"   💶 Gesamt: {total:.2f}€ (Ø {total / args.units:.2f}€/Stück, teuerste Einheit {marginal:.2f}€)")
+
+        day_ago = cost_before(cursor, pid, args.units, '-24 hours')
+        week_ago = cost_before(cursor, pid, args.units, f'-{args.days} days')
+        print(f"   vs. 24h: {format_delta(total, day_ago[1] if day_ago else None)}")
+        print(f"   vs. {args.days}d:  {format_delta(total, week_ago[1] if week_ago else None)}")
+
+        rows = daily_costs(cursor, pid, args.units, args.days)
+        if rows:
+            print()
+            print(f"   {'Tag':<10}  {'Min':>9}  {'Max':>9}  {'Ende':>9}  Scans")
+            for day, lo, hi, last, n in rows:
+                print(f"   {day:<10}  {lo:>8.2f}€  {hi:>8.2f}€  {last:>8.2f}€  {n:>5}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
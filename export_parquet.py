@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+export_parquet.py — Spaltenorientierter Export der Historie nach Parquet (für Ad-hoc-Analysen).
+
+Schreibt scrapes, listings (inkl. Monats-Archive), suspected_sales und card_prices
+nach `export/<tabelle>/product_id=<id>/month=<YYYY-MM>/part-<erste-id>.parquet`
+(Hive-Partitionierung; card_prices nur nach Monat). Jeder Lauf hängt nur neue Zeilen
+an: der Stand (letzte exportierte id, bei listings die scrape_id, bei card_prices die
+rowid) liegt in
+`export/_state.json`, neue Daten landen als zusätzliche Part-Dateien — bestehende
+Dateien werden nie umgeschrieben. Die DB wird nur lesend geöffnet, alle Tabellen
+aus einem Snapshot (eine Lese-Transaktion).
+
+card_prices hat nicht zwingend eine INTEGER-PRIMARY-KEY-Spalte, ein volles VACUUM
+(z.B. `retention.py enable-vacuum`) darf die rowids dann neu vergeben — danach
+card_prices einmal mit --full neu exportieren.
+
+Seller, Location, Sprache, Confidence usw. sind dictionary-encoded, Zeitstempel
+sind UTC-Timestamps, Kompression zstd. Lesen z.B. mit
+    pyarrow.dataset.dataset('export/listings', partitioning='hive')
+    duckdb: SELECT * FROM read_parquet('export/listings/*/*/*.parquet', hive_partitioning = true)
+
+Benötigt pyarrow (pip3 install pyarrow), nur für dieses Script.
+
+Usage:
+    python3 export_parquet.py                    # alle Tabellen inkrementell
+    python3 export_parquet.py listings scrapes   # nur diese
+    python3 export_parquet.py --full             # Export-Verzeichnis der Tabellen neu aufbauen
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from archive import listings_source
+from db import connect_readonly
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+EXPORT_DIR = Path(os.getenv('CARDMARKET_EXPORT_DIR', Path(__file__).parent / 'export'))
+STATE_PATH = EXPORT_DIR / '_state.json'
+
+EXPORT_BATCH = 100_000   # Zeilen pro fetchmany
+COMPRESSION = 'zstd'
+
+# Pro Tabelle: SQL (erste zwei Spalten = Partition product_id, month; danach die Daten-Spalten,
+# gefiltert auf cursor > ?), Spalten als (name, typ) und die Spalte, die den Cursor trägt.
+# Typen: int, float, str, dict (dictionary-encoded string), ts (Unix-Sekunden → Timestamp UTC)
+EXPORTS = {
+    'scrapes': {
+        'sql': '''
+            SELECT s.product_id, strftime('%Y-%m', s.scraped_ts, 'unixepoch'),
+                   s.id, s.scraped_ts, s.mode,
+                   s.floor_price, s.total_listings
+            FROM scrapes s
+            WHERE s.id > ?
+            ORDER BY s.id
+        ''',
+        'columns': [('id', 'int'), ('scraped_at', 'ts'), ('mode', 'dict'),
+                    ('floor_price', 'float'), ('total_listings', 'int')],
+        'cursor': 'id',
+    },
+    'listings': {
+        'sql': '''
+            SELECT s.product_id, strftime('%Y-%m', s.scraped_ts, 'unixepoch'),
+                   l.id, l.scrape_id, s.scraped_ts,
+                   se.name, l.seller_rating, l.seller_type, l.price, l.quantity,
+                   l.location, l.language, l.condition_notes
+            FROM scrapes s
+            JOIN {listings} l ON l.scrape_id = s.id
+            LEFT JOIN sellers se ON se.id = l.seller_id
+            WHERE s.id > ?
+            ORDER BY s.id
+        ''',
+        'columns': [('id', 'int'), ('scrape_id', 'int'), ('scraped_at', 'ts'),
+                    ('seller', 'dict'), ('seller_rating', 'int'), ('seller_type', 'dict'),
+                    ('price', 'float'), ('quantity', 'int'), ('location', 'dict'),
+                    ('language', 'dict'), ('condition_notes', 'str')],
+        'cursor': 'scrape_id',
+    },
+    'suspected_sales': {
+        'sql': '''
+            SELECT ss.product_id, strftime('%Y-%m', ss.detected_at),
+                   ss.id, CAST(strftime('%s', ss.detected_at) AS INTEGER),
+                   COALESCE(se.name, ss.seller), ss.price, ss.quantity, ss.confidence, ss.reasoning
+            FROM suspected_sales ss
+            LEFT JOIN sellers se ON se.id = ss.seller_id
+            WHERE ss.id > ?
+            ORDER BY ss.id
+        ''',
+        'columns': [('id', 'int'), ('detected_at', 'ts'), ('seller', 'dict'), ('price', 'float'),
+                    ('quantity', 'int'), ('confidence', 'dict'), ('reasoning', 'str')],
+        'cursor': 'id',
+    },
+    'card_prices': {
+        'sql': '''
+            SELECT NULL, strftime('%Y-%m', scraped_at),
+                   rowid, CAST(strftime('%s', scraped_at) AS INTEGER), card_id, card_name,
+                   set_name, rarity, cm_price, cm_foil_price, cm_delta_7d, cm_delta_7d_foil
+            FROM card_prices
+            WHERE rowid > ?
+            ORDER BY rowid
+        ''',
+        'columns': [('id', 'int'), ('scraped_at', 'ts'), ('card_id', 'dict'), ('card_name', 'dict'),
+                    ('set_name', 'dict'), ('rarity', 'dict'), ('cm_price', 'float'),
+                    ('cm_foil_price', 'float'), ('cm_delta_7d', 'float'), ('cm_delta_7d_foil', 'float')],
+        'cursor': 'id',
+    },
+}
+
+
+def _arrow_type(kind):
+    return {
+        'int': pa.int64(), 'float': pa.float64(), 'str': pa.string(),
+        'dict': pa.dictionary(pa.int32(), pa.string()), 'ts': pa.timestamp('s', tz='UTC'),
+    }[kind]
+
+
+def _arrow_array(values, kind):
+    if kind == 'dict':
+        return pa.array(values, type=pa.string()).dictionary_encode()
+    return pa.array(values, type=_arrow_type(kind))
+
+
+def load_state():
+    if STATE_PATH.exists():
+        return json.loads(STATE_PATH.read_text())
+    return {}
+
+
+def save_state(state):
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_suffix('.tmp')
+    tmp.write_text(json.dumps(state, indent=2, sort_keys=True))
+    tmp.replace(STATE_PATH)
+
+
+def _partition_dir(table, product_id, month):
+    base = EXPORT_DIR / table
+    if product_id is not None:
+        base = base / f'product_id={product_id}'
+    return base / f'month={month}'
+
+
+def _table_exists(conn, table):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+
+
+def export_table(conn, table, last_id, listings='listings'):
+    """
+    Exportiert alle Zeilen mit Cursor > last_id als neue Part-Dateien.
+    Returns (zeilen, neuer_cursor). Dateien werden erst am Ende sichtbar (Rename).
+    """
+    spec = EXPORTS[table]
+    columns = spec['columns']
+    schema = pa.schema([(name, _arrow_type(kind)) for name, kind in columns])
+    cursor_idx = [name for name, _ in columns].index(spec['cursor'])
+
+    cur = conn.cursor()
+    cur.execute(spec['sql'].format(listings=listings), (last_id,))
+    writers, pending = {}, []
+    rows_total, new_cursor = 0, last_id
+    try:
+        while True:
+            rows = cur.fetchmany(EXPORT_BATCH)
+            if not rows:
+                break
+            partitions = {}
+            for r in rows:
+                partitions.setdefault((r[0], r[1]), []).append(r[2:])
+            for (product_id, month), part in partitions.items():
+                key = (product_id, month)
+                if key not in writers:
+                    directory = _partition_dir(table, product_id, month)
+                    directory.mkdir(parents=True, exist_ok=True)
+                    final = directory / f'part-{part[0][cursor_idx]:010d}.parquet'
+                    tmp = directory / f'.{final.name}.tmp'  # Punkt-Präfix: Reader ignorieren die Datei
+                    writers[key] = pq.ParquetWriter(tmp, schema, compression=COMPRESSION)
+                    pending.append((tmp, final))
+                cols = list(zip(*part))
+                writers[key].write_table(pa.Table.from_arrays(
+                    [_arrow_array(list(cols[i]), kind) for i, (_, kind) in enumerate(columns)], schema=schema))
+            rows_total += len(rows)
+            new_cursor = max(new_cursor, rows[-1][2 + cursor_idx])
+    finally:
+        for w in writers.values():
+            w.close()
+    for tmp, final in pending:
+        tmp.replace(final)
+    return rows_total, new_cursor
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Historie als partitioniertes Parquet exportieren')
+    ap.add_argument('tables', nargs='*', help=f"Default: alle ({', '.join(EXPORTS)})")
+    ap.add_argument('--full', action='store_true', help='Export der Tabellen verwerfen und neu schreiben')
+    args = ap.parse_args()
+
+    if pa is None:
+        print("❌ pyarrow fehlt: pip3 install pyarrow")
+        return 1
+    if not os.path.exists(DB_PATH):
+        print(f"❌ DB nicht gefunden: {DB_PATH}")
+        return 1
+
+    tables = args.tables or list(EXPORTS)
+    unknown = [t for t in tables if t not in EXPORTS]
+    if unknown:
+        print(f"❌ Unbekannte Tabelle(n): {', '.join(unknown)}")
+        return 1
+    state = load_state()
+    if args.full:
+        for table in tables:
+            shutil.rmtree(EXPORT_DIR / table, ignore_errors=True)
+            state.pop(table, None)
+        save_state(state)
+
+    conn = connect_readonly(DB_PATH)
+    try:
+        listings = listings_source(conn)  # ATTACH vor der Transaktion
+        conn.execute('BEGIN')              # ein Snapshot für alle Tabellen
+        for table in tables:
+            if not _table_exists(conn, table):
+                print(f"   ⏭️  {table}: Tabelle fehlt")
+                continue
+            n, last = export_table(conn, table, state.get(table, 0), listings)
+            state[table] = last
+            save_state(state)
+            print(f"   📦 {table}: {n} Zeilen (Cursor {last})")
+        conn.execute('COMMIT')
+    finally:
+        conn.close()
+    print(f"✅ Export aktuell: {EXPORT_DIR}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
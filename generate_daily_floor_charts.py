@@ -4,14 +4,17 @@ Daily Floor Price Charts für Cardmarket Produkte
 Zeigt Floor-Preis pro Tag seit Aufzeichnungsbeginn
 """
 
-import sqlite3
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from datetime import datetime
+import numpy as np
+from datetime import datetime, timezone
 from pathlib import Path
 
+import tsstore
+from db import connect_readonly
+
 # Config
 DB_PATH = Path(__file__).parent / "cardmarket.db"
 OUTPUT_DIR = Path(__file__).parent / "charts"
@@ -26,17 +29,21 @@ PRODUCTS = {
 
 
 def get_daily_floor_prices(conn, product_id):
-    """Holt Floor-Preis pro Tag"""
+    """Holt Floor-Preis pro Tag (aus der Floor-Zeitreihe, ohne aktuelle Datei per SQL)"""
+    series = tsstore.load(product_id) if tsstore.is_current(conn, product_id) else None
+    if series is not None:
+        return daily_floor_from_series(series)
+
     query = """
     SELECT 
-        DATE(scraped_at) as day,
+        DATE(scraped_ts, 'unixepoch') as day,
         MIN(floor_price) as floor_price,
         COUNT(*) as scrape_count
     FROM scrapes
     WHERE product_id = ?
         AND floor_price IS NOT NULL
         AND floor_price > 0
-    GROUP BY DATE(scraped_at)
+    GROUP BY day
     ORDER BY day
     """
     
@@ -54,6 +61,27 @@ def get_daily_floor_prices(conn, product_id):
     return result
 
 
+def daily_floor_from_series(series):
+    """Tages-Minimum (UTC-Tage wie DATE(scraped_ts, 'unixepoch')) aus den tsstore-Records"""
+    valid = series['floor'] > 0  # NaN (kein Floor) fällt hier mit raus
+    floors = series['floor'][valid]
+    if not len(floors):
+        return []
+    days = series['ts'][valid] // 86400
+    # ts ist aufsteigend → jeder Tag ist ein zusammenhängender Block
+    day_keys, starts, counts = np.unique(days, return_index=True, return_counts=True)
+    mins = np.minimum.reduceat(floors, starts)
+
+    return [
+        {
+            'date': datetime.fromtimestamp(int(day) * 86400, timezone.utc).replace(tzinfo=None),
+            'floor_price': float(floor),
+            'scrapes': int(n)
+        }
+        for day, floor, n in zip(day_keys, mins, counts)
+    ]
+
+
 def create_floor_chart(product_id, product_name, daily_data):
     """Erstellt ein Floor-Price Chart"""
     if not daily_data:
@@ -139,7 +167,7 @@ def create_floor_chart(product_id, product_name, daily_data):
 def main():
     print("📊 Generiere Daily Floor Price Charts...\n")
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_readonly(DB_PATH)
     
     created_files = []
     
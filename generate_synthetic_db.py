@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+generate_synthetic_db.py — Realistische Test-DB nach schema.sql für Skalierungstests.
+
+Simuliert stündliche Scrapes über Jahre für beliebig viele Produkte, so wie der
+Scraper sie schreiben würde:
+
+- Marktniveau pro Produkt als Random Walk (Drift, Volatilität, seltene Sprünge,
+  leichtes Wochenprofil), Listings streuen darüber
+- Order-Book mit Gedächtnis: günstige Listings verkaufen sich eher (Menge sinkt oder
+  Listing verschwindet), Seller ändern Preise, neue Listings füllen auf
+- Seller-Churn: neue Seller tauchen laufend auf (first_seen), alte verschwinden
+- Blocklist-Rauschen: einige Seller mit Schnapszahl-Preisen und Einträgen in
+  seller_blocklist — ihre Listings stehen in der DB, zählen aber nicht für den Floor
+- Mac-Schlaf: nachts fallen manchmal ganze Stunden aus
+- Quick-Scrapes, wenn sich die günstigsten QUICK_CHECK_ROWS nicht geändert haben
+- Verkaufsverdacht per Diff zwischen Full-Scrapes (gleiche Regeln wie sales_diff.py)
+- Rollups (scrape_stats & Co. über scrape_stats.save_rollups), danach Lifetimes,
+  sales_daily und Saisonalität über deren eigene Rebuilds
+- DotGG-Sammlung: user_collection, card_prices (2× täglich) und card_alerts_sent
+  (nach den Regeln von collection_alerts.py)
+
+Gleicher Seed + gleiche Parameter → gleiche Daten (bis auf den Endzeitpunkt = jetzt).
+Produkte über die 7 aus products.py hinaus bekommen synthetische Zeilen in
+`products` — Reports/Alerts iterieren nur products.PRODUCTS, die übrigen erhöhen das
+Datenvolumen (Index-Selektivität, DB-Größe).
+
+Usage:
+    python3 generate_synthetic_db.py /tmp/synthetic.db                          # 1 Jahr, 7 Produkte, 120 Listings
+    python3 generate_synthetic_db.py /tmp/big.db --days 1095 --products 50 --listings 500 --seed 7
+    CARDMARKET_DB_PATH=/tmp/big.db python3 bench.py
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import db
+from db import connect
+
+LIVE_DB = Path(db.DB_PATH).resolve()
+
+SYNTH_DAYS = 365
+SYNTH_LISTINGS = 120     # Ziel-Anzahl Listings pro Produkt und Scrape
+SYNTH_CARDS = 300        # Karten in der Sammlung
+SYNTH_PRODUCT_BASE_ID = 1000  # synthetische Produkte über products.PRODUCTS hinaus ab dieser ID
+
+DE_SHARE = 0.9           # Anteil deutscher Seller (Rest: NON-DE, wie beim Scraper markiert)
+NEW_SELLER_SHARE = 0.05  # Anteil neuer Listings von bisher unbekannten Sellern
+SALE_RATE = 0.04         # Verkaufswahrscheinlichkeit pro Stunde für ein Listing am Floor
+SALE_DECAY = 12          # … fällt mit exp(-SALE_DECAY × Abstand zum Floor)
+WITHDRAW_RATE = 0.003    # Listing wird ohne Verkauf zurückgezogen
+REPRICE_RATE = 0.02      # Seller passt den Preis ans Marktniveau an
+SLEEP_RATE = 0.2         # Wahrscheinlichkeit, dass eine Nachtstunde (01–06 UTC) ausfällt
+NOISE_SELLERS = 3        # Seller mit Bad-Data-Preisen (landen in seller_blocklist)
+NOISE_RATE = 0.03        # … pro Stunde und Produkt ein Fake-Listing
+FLUSH_HOURS = 24         # Commit-Intervall (simulierte Stunden)
+
+QUICK_CHECK_ROWS = 10    # wie scraper.QUICK_CHECK_ROWS
+FULL_SCRAPE_EVERY = 4    # wie scraper.FULL_SCRAPE_EVERY
+CARD_SYNC_HOURS = (9, 21)  # Collection Sync (launchd)
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class Market:
+    """Order-Book eines Produkts: {seller_id: [price, quantity, location]} + Marktniveau."""
+
+    def __init__(self, rnd, product_id, level):
+        self.rnd = rnd
+        self.product_id = product_id
+        self.level = level
+        self.drift = rnd.gauss(0, 0.00004)          # pro Stunde, ±30 %/Jahr
+        self.vol = rnd.uniform(0.002, 0.008)
+        self.spread = rnd.uniform(5, 12)             # Rate der Exponentialverteilung über dem Niveau
+        self.book = {}
+        self.noise = {}                              # Fake-Listings geblockter Seller
+
+    def step(self, hour_of_week, target, sellers, noise_sellers):
+        rnd = self.rnd
+        shock = rnd.gauss(0, 0.05) if rnd.random() < 0.002 else 0.0
+        self.level *= math.exp(self.drift + rnd.gauss(0, self.vol) + shock)
+        seasonal = 1 + 0.01 * math.sin(2 * math.pi * hour_of_week / 168)
+        fair = self.level * seasonal
+        floor = min((entry[0] for entry in self.book.values()), default=fair)
+
+        for seller_id, entry in list(self.book.items()):
+            distance = max(0.0, entry[0] / floor - 1)
+            if rnd.random() < SALE_RATE * math.exp(-SALE_DECAY * distance):
+                if entry[1] > 1 and rnd.random() < 0.5:
+                    entry[1] -= rnd.randint(1, entry[1] - 1)
+                else:
+                    del self.book[seller_id]
+            elif rnd.random() < WITHDRAW_RATE:
+                del self.book[seller_id]
+            elif rnd.random() < REPRICE_RATE:
+                entry[0] = self.price(fair)
+
+        while len(self.book) < target:
+            seller_id = sellers.pick(self.book)
+            qty = rnd.choices((1, 2, 3, 4, 6, 10), (60, 18, 9, 6, 4, 3))[0]
+            location = 'Germany' if rnd.random() < DE_SHARE else rnd.choice(('France', 'Italy', 'Spain', 'Austria'))
+            self.book[seller_id] = [self.price(fair), qty, location]
+
+        for seller_id in list(self.noise):
+            if seller_id not in noise_sellers or rnd.random() < 0.3:
+                del self.noise[seller_id]
+        for seller_id in noise_sellers:
+            if rnd.random() < NOISE_RATE:
+                self.noise[seller_id] = [rnd.choice((1.0, 9.99, 11.11, round(0.5 * fair, 2))), rnd.choice((1, 50)), 'Germany']
+
+    def price(self, fair):
+        return round(fair * (1 + self.rnd.expovariate(self.spread)), 2)
+
+    def listings(self, trusted_before, first_seen):
+        """Listings ohne Fake-Seller als Dicts wie beim Scraper (für Floor, Fingerprint, Rollups)."""
+        return [{'seller': seller_id, 'price': price, 'quantity': qty, 'location': location,
+                 'trusted': first_seen[seller_id] <= trusted_before}
+                for seller_id, (price, qty, location) in self.book.items()]
+
+
+class Sellers:
+    """Seller-Pool mit Churn; id → first_seen/last_seen, Namen fortlaufend."""
+
+    def __init__(self, rnd, initial, start_ts):
+        self.rnd = rnd
+        self.first_seen = {}
+        self.last_seen = {}
+        self.active = []
+        self.rows = []
+        for _ in range(initial):
+            self.new(start_ts - rnd.randrange(365 * 86400))
+        self.noise = [self.new(start_ts) for _ in range(NOISE_SELLERS)]
+        self.active = [s for s in self.active if s not in self.noise]
+        self.now = start_ts
+
+    def new(self, ts):
+        seller_id = len(self.first_seen) + 1
+        self.first_seen[seller_id] = ts
+        self.active.append(seller_id)
+        self.rows.append((seller_id, f'seller{seller_id:06d}', _iso(ts)))
+        return seller_id
+
+    def pick(self, exclude):
+        rnd = self.rnd
+        if rnd.random() < NEW_SELLER_SHARE:
+            if len(self.active) > 200 and rnd.random() < 0.8:  # Churn: meist hört dafür ein anderer auf
+                self.active.pop(rnd.randrange(len(self.active)))
+            return self.new(self.now)
+        for _ in range(20):
+            seller_id = rnd.choice(self.active)
+            if seller_id not in exclude:
+                return seller_id
+        return self.new(self.now)
+
+
+def _fingerprint(listings):
+    return tuple(sorted((l['price'], l['seller'], l['quantity']) for l in listings)[:QUICK_CHECK_ROWS])
+
+
+def _diff_sales(prev, cur):
+    """Verkaufsverdacht zwischen zwei Full-Scrapes ({seller_id: (price, qty)}, nur DE) — Regeln wie sales_diff.py."""
+    if not prev:
+        return []
+    prices = sorted(price for price, _ in prev.values())
+    q1 = prices[len(prices) // 4]
+    sales = []
+    for seller_id, (price, qty) in prev.items():
+        now = cur.get(seller_id)
+        if now is None:
+            in_q1 = price <= q1
+            sales.append((seller_id, price, qty, 'medium' if in_q1 else 'low',
+                          'Seller nicht mehr gelistet' + (', war im Q1' if in_q1 else '')))
+        elif now[1] < qty and now[0] == price:
+            sales.append((seller_id, price, qty - now[1], 'high', f'Menge x{qty} → x{now[1]}'))
+        elif now[1] < qty:
+            sales.append((seller_id, price, qty - now[1], 'low', f'Preis geändert, {qty - now[1]} Einheit(en) weniger'))
+    return sorted(sales, key=lambda s: s[1])
+
+
+def _products(n):
+    """(id, name, category) für n Produkte: erst products.PRODUCTS, dann synthetische."""
+    from products import PRODUCTS
+    result = [(pid, p['name'], p['category']) for pid, p in PRODUCTS.items()][:n]
+    for i in range(n - len(result)):
+        result.append((SYNTH_PRODUCT_BASE_ID + i, f'Synthetic Booster Box {i + 1}', 'booster-box'))
+    return result
+
+
+def generate_scrapes(conn, rnd, products, start, end, listings):
+    """Simuliert alle Stunden in [start, end) für alle Produkte. Returns (Scrapes, Listings, Verkäufe)."""
+    from scrape_stats import FLOOR_TRUSTED_DAYS, save_rollups
+
+    cursor = conn.cursor()
+    sellers = Sellers(rnd, max(50, listings * 3), start)
+    markets = {pid: Market(rnd, pid, rnd.uniform(40, 300) if category != 'single' else rnd.uniform(5, 60))
+               for pid, _, category in products}
+    offsets = {pid: (pid * 13) % 60 for pid, _, _ in products}  # Minuten-Versatz wie die launchd-Jobs
+    last_full = {}   # pid → (scrape_id, fingerprint, quick_runs, floor, count, {seller: (price, qty)})
+
+    # Fake-Seller posten nur innerhalb ihres Blocklist-Zeitraums (stundengenau) — wie nachträglich
+    # geblockte Seller: Listings stehen in der DB, Floor und Rollups ignorieren sie (blocklist.recompute)
+    windows = {}
+    for seller_id in sellers.noise:
+        valid_from = start + rnd.randrange(max(1, (end - start) // 7200)) * 3600
+        valid_until = valid_from + rnd.randrange(30, 180) * 86400 if rnd.random() < 0.5 else None
+        windows[seller_id] = (valid_from, valid_until or end)
+        cursor.execute('''
+            INSERT INTO seller_blocklist (seller_name, valid_from, valid_until, reason)
+            VALUES (?, ?, ?, 'synthetisch: Bad-Data-Preise')
+        ''', (f'seller{seller_id:06d}', _iso(valid_from), _iso(valid_until) if valid_until else None))
+
+    n_scrapes = n_listings = n_sales = 0
+    listing_rows, sale_rows = [], []
+    trusted_age = FLOOR_TRUSTED_DAYS * 86400
+    for hour in range(start, end, 3600):
+        sellers.now = hour
+        how = datetime.fromtimestamp(hour, timezone.utc)
+        asleep = 1 <= how.hour <= 6 and rnd.random() < SLEEP_RATE
+        hour_of_week = int(how.strftime('%w')) * 24 + how.hour
+        noise_sellers = [s for s, (valid_from, valid_until) in windows.items() if valid_from <= hour < valid_until]
+        for pid, _, _ in products:
+            market = markets[pid]
+            target = round(listings * (1 + 0.1 * math.sin(2 * math.pi * hour / (86400 * 30))))
+            market.step(hour_of_week, target, sellers, noise_sellers)
+            if asleep:
+                continue
+            ts = hour + offsets[pid] * 60 + rnd.randrange(60)
+            scraped_at = _iso(ts)
+            all_listings = market.listings(ts - trusted_age, sellers.first_seen)
+            de = [l for l in all_listings if l['location'] == 'Germany']
+            fp = _fingerprint(de)
+            prev = last_full.get(pid)
+            if prev and prev[1] == fp and prev[2] < FULL_SCRAPE_EVERY - 1:
+                cursor.execute('''
+                    INSERT INTO scrapes (product_id, scraped_at, total_listings, floor_price, filters_applied, mode)
+                    VALUES (?, ?, ?, ?, 'sellerCountry=7&language=1', 'quick')
+                ''', (pid, scraped_at, prev[4], prev[3]))
+                cursor.execute('''
+                    INSERT INTO scrape_floors (scrape_id, floor_min, floor_kth, floor_qty, floor_trimmed, floor_trusted)
+                    SELECT ?, floor_min, floor_kth, floor_qty, floor_trimmed, floor_trusted
+                    FROM scrape_floors WHERE scrape_id = ?
+                ''', (cursor.lastrowid, prev[0]))
+                last_full[pid] = (prev[0], fp, prev[2] + 1, *prev[3:])
+                n_scrapes += 1
+                continue
+
+            floor = min((l['price'] for l in de), default=None)
+            cursor.execute('''
+                INSERT INTO scrapes (product_id, scraped_at, total_listings, floor_price, filters_applied)
+                VALUES (?, ?, ?, ?, 'sellerCountry=7&language=1')
+            ''', (pid, scraped_at, len(de), floor))
+            scrape_id = cursor.lastrowid
+            book = list(market.book.items()) + list(market.noise.items())
+            listing_rows.extend(
+                (scrape_id, seller_id, price, qty, location, 'NON-DE' if location != 'Germany' else None)
+                for seller_id, (price, qty, location) in book)
+            for seller_id, _ in book:
+                sellers.last_seen[seller_id] = ts
+            save_rollups(cursor, scrape_id, pid, all_listings)
+
+            state = {l['seller']: (l['price'], l['quantity']) for l in de}
+            for seller_id, price, qty, confidence, reasoning in _diff_sales(prev[5] if prev else None, state):
+                sale_rows.append((pid, scraped_at, f'seller{seller_id:06d}', seller_id, price, qty,
+                                  confidence, reasoning))
+            last_full[pid] = (scrape_id, fp, 0, floor, len(de), state)
+            n_scrapes += 1
+            n_listings += len(book)
+
+        if (hour - start) // 3600 % FLUSH_HOURS == FLUSH_HOURS - 1 or hour + 3600 >= end:
+            cursor.executemany('INSERT INTO sellers (id, name, first_seen) VALUES (?, ?, ?)', sellers.rows)
+            sellers.rows = []
+            cursor.executemany('''
+                INSERT INTO listings (scrape_id, seller_id, price, quantity, location, language, condition_notes)
+                VALUES (?, ?, ?, ?, ?, 'English', ?)
+            ''', listing_rows)
+            cursor.executemany('''
+                INSERT INTO suspected_sales (product_id, detected_at, seller, seller_id, price, quantity,
+                                             confidence, reasoning)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', sale_rows)
+            n_sales += len(sale_rows)
+            listing_rows, sale_rows = [], []
+            conn.commit()
+
+    cursor.executemany('UPDATE sellers SET last_seen = ? WHERE id = ?',
+                       [(_iso(ts), seller_id) for seller_id, ts in sellers.last_seen.items()])
+    cursor.executemany('''
+        INSERT OR REPLACE INTO scrape_fingerprints (product_id, fingerprint, full_scrape_id, quick_runs, updated_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ''', [(pid, 'synthetic', full[0], full[2]) for pid, full in last_full.items()])
+    conn.commit()
+    return n_scrapes, n_listings, n_sales
+
+
+def generate_collection(conn, rnd, start, end, cards):
+    """user_collection, card_prices (2× täglich) und card_alerts_sent. Returns Anzahl Preis-Snapshots."""
+    from collection_alerts import DEDUP_HOURS, DROP_PCT, MIN_DIFF_EUR, MIN_PRICE_EUR, SPIKE_PCT
+
+    sets = ('OGN', 'SFD', 'UNL', 'ARC')
+    rarities = ('Common', 'Uncommon', 'Rare', 'Epic', 'Showcase')
+    catalog = []
+    for i in range(cards):
+        card_id = f'{sets[i % len(sets)]}-{i // len(sets) + 1:03d}'
+        rarity = rnd.choices(rarities, (30, 25, 25, 15, 5))[0]
+        price = rnd.lognormvariate(math.log({'Common': 0.2, 'Uncommon': 0.5, 'Rare': 2, 'Epic': 8,
+                                             'Showcase': 40}[rarity]), 0.6)
+        catalog.append([card_id, f'Card {card_id}', sets[i % len(sets)], rarity, price, price * rnd.uniform(2, 5)])
+    conn.executemany('''
+        INSERT INTO user_collection (card_id, standard_count, foil_count, trade_count, wish_count)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(c[0], rnd.choice((0, 1, 1, 2, 3)), rnd.choice((0, 0, 0, 1)), rnd.choice((0, 0, 1)), rnd.choice((0, 0, 1)))
+          for c in catalog])
+    owned = {r[0]: (r[1] > 0, r[2] > 0) for r in conn.execute(
+        'SELECT card_id, standard_count, foil_count FROM user_collection')}
+
+    history = {c[0]: [] for c in catalog}
+    last_alert = {}
+    rows, alerts = [], []
+    day_start = start - start % 86400
+    for day in range(day_start, end, 86400):
+        for hour in CARD_SYNC_HOURS:
+            ts = day + hour * 3600
+            if not start <= ts < end:
+                continue
+            for card in catalog:
+                card[4] *= math.exp(rnd.gauss(0, 0.03))
+                card[5] *= math.exp(rnd.gauss(0, 0.04))
+                price, foil = round(card[4], 2), round(card[5], 2)
+                past = history[card[0]]
+                week_ago = past[-14] if len(past) >= 14 else None
+                rows.append((card[0], card[1], card[2], card[3], price, foil,
+                             round(price - week_ago[0], 2) if week_ago else None,
+                             round(foil - week_ago[1], 2) if week_ago else None, _iso(ts)))
+                if past:
+                    has_std, has_foil = owned[card[0]]
+                    for kind, cur, prev, has in (('std', price, past[-1][0], has_std),
+                                                 ('foil', foil, past[-1][1], has_foil)):
+                        if not has or cur < MIN_PRICE_EUR or abs(cur - prev) < MIN_DIFF_EUR:
+                            continue
+                        pct = (cur - prev) / prev
+                        atype = f'{kind}-drop' if pct <= DROP_PCT else f'{kind}-spike' if pct >= SPIKE_PCT else None
+                        if atype and ts - last_alert.get((card[0], atype), 0) > DEDUP_HOURS * 3600:
+                            last_alert[(card[0], atype)] = ts
+                            alerts.append((card[0], atype, cur, _iso(ts)))
+                past.append((price, foil))
+                del past[:-14]
+        if len(rows) > 100_000:
+            conn.executemany('''
+                INSERT INTO card_prices (card_id, card_name, set_name, rarity, cm_price, cm_foil_price,
+                                         cm_delta_7d, cm_delta_7d_foil, scraped_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            rows = []
+    conn.executemany('''
+        INSERT INTO card_prices (card_id, card_name, set_name, rarity, cm_price, cm_foil_price,
+                                 cm_delta_7d, cm_delta_7d_foil, scraped_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.executemany('INSERT INTO card_alerts_sent (card_id, alert_type, price_at_alert, sent_at) VALUES (?, ?, ?, ?)',
+                     alerts)
+    conn.commit()
+    return conn.execute('SELECT COUNT(*) FROM card_prices').fetchone()[0]
+
+
+def generate(path, days=SYNTH_DAYS, products=None, listings=SYNTH_LISTINGS, cards=SYNTH_CARDS, seed=1,
+             verbose=False):
+    """
+    Schreibt eine neue DB nach `path` (darf nicht existieren). products: Anzahl Produkte
+    (None = die aus products.py). Returns Dict mit Zeilenzahlen der großen Tabellen.
+    """
+    import lifetimes
+    import sales_daily
+    import seasonality
+    from migrate import ensure_schema
+    from products import PRODUCTS
+
+    log = print if verbose else (lambda *a, **k: None)
+    rnd = random.Random(seed)
+    end = int(time.time()) // 3600 * 3600
+    start = end - days * 86400
+    product_rows = _products(len(PRODUCTS) if products is None else products)
+
+    conn = connect(path)
+    try:
+        ensure_schema(conn)
+        conn.executemany('INSERT OR IGNORE INTO products (id, name, category, game) VALUES (?, ?, ?, ?)',
+                         [(pid, name, category, 'Riftbound') for pid, name, category in product_rows])
+        t0 = time.perf_counter()
+        n_scrapes, n_listings, n_sales = generate_scrapes(conn, rnd, product_rows, start, end, listings)
+        log(f"   🕐 {n_scrapes} Scrapes, {n_listings} Listings, {n_sales} Verkaufsverdachte "
+            f"({time.perf_counter() - t0:.0f}s)")
+        t0 = time.perf_counter()
+        n_cards = generate_collection(conn, rnd, start, end, cards)
+        log(f"   🃏 {cards} Karten, {n_cards} Preis-Snapshots ({time.perf_counter() - t0:.0f}s)")
+        t0 = time.perf_counter()
+        conn.execute('ANALYZE')  # ohne Statistiken wählt der Planner für die Rebuilds schlechte Pläne
+        lifetimes.update(conn)
+        sales_daily.rebuild(conn)
+        seasonality.rebuild(conn)
+        conn.execute('ANALYZE')
+        conn.commit()
+        log(f"   🔁 Lifetimes, sales_daily, Saisonalität ({time.perf_counter() - t0:.0f}s)")
+        return {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in ('scrapes', 'listings', 'sellers', 'suspected_sales', 'listing_lifetimes', 'card_prices')}
+    finally:
+        conn.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Synthetische Cardmarket-DB für Skalierungstests erzeugen')
+    ap.add_argument('path', type=Path, help='Ziel-DB (darf nicht existieren, außer mit --force)')
+    ap.add_argument('--days', type=int, default=SYNTH_DAYS)
+    ap.add_argument('--products', type=int, help='Anzahl Produkte (default: die aus products.py)')
+    ap.add_argument('--listings', type=int, default=SYNTH_LISTINGS, help='Listings pro Produkt und Scrape')
+    ap.add_argument('--cards', type=int, default=SYNTH_CARDS, help='Karten in der Sammlung')
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--force', action='store_true', help='vorhandene Datei überschreiben')
+    args = ap.parse_args()
+
+    if args.path.resolve() == LIVE_DB:
+        print("❌ Ziel ist die Live-DB — anderen Pfad wählen")
+        return 1
+    if args.path.exists():
+        if not args.force:
+            print(f"❌ {args.path} existiert schon (--force zum Überschreiben)")
+            return 1
+        for suffix in ('', '-wal', '-shm'):
+            Path(f'{args.path}{suffix}').unlink(missing_ok=True)
+
+    print(f"🧪 {args.days} Tage × {args.products or 'alle'} Produkte × {args.listings} Listings (Seed {args.seed})")
+    t0 = time.perf_counter()
+    counts = generate(args.path, args.days, args.products, args.listings, args.cards, args.seed, verbose=True)
+    size = os.path.getsize(args.path) / (1024 * 1024)
+    print(f"✅ {args.path}: {size:.0f} MB in {time.perf_counter() - t0:.0f}s")
+    for table, n in counts.items():
+        print(f"   {table:<18} {n:>12,}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
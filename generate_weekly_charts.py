@@ -4,15 +4,16 @@ Weekly Average Price Charts für Cardmarket Produkte
 Zeigt Durchschnittspreise pro Woche seit Aufzeichnungsbeginn
 """
 
-import sqlite3
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict
 from pathlib import Path
 
+from db import connect_readonly
+
 # Config
 DB_PATH = Path(__file__).parent / "cardmarket.db"
 OUTPUT_DIR = Path(__file__).parent / "charts"
@@ -27,18 +28,17 @@ PRODUCTS = {
 
 
 def get_weekly_averages(conn, product_id):
-    """Berechnet durchschnittlichen Preis pro Woche aus listings"""
+    """Berechnet durchschnittlichen Preis pro Woche aus scrape_stats (1 Zeile pro Scrape)"""
     query = """
     SELECT 
-        s.scraped_at,
-        AVG(l.price) as avg_price,
-        COUNT(l.id) as listing_count
+        s.scraped_ts,
+        st.mean_price as avg_price,
+        st.de_count as listing_count
     FROM scrapes s
-    JOIN listings l ON l.scrape_id = s.id
+    JOIN scrape_stats st ON st.scrape_id = s.id
     WHERE s.product_id = ?
-        AND l.location = 'Germany'
-    GROUP BY s.id, s.scraped_at
-    ORDER BY s.scraped_at
+        AND st.de_count > 0
+    ORDER BY s.scraped_ts
     """
     
     cursor = conn.execute(query, (product_id,))
@@ -48,7 +48,7 @@ def get_weekly_averages(conn, product_id):
     weekly_data = defaultdict(lambda: {'prices': [], 'listing_count': 0})
     
     for row in rows:
-        scraped_at = datetime.fromisoformat(row[0].replace('Z', '+00:00').replace('+00:00', ''))
+        scraped_at = datetime.fromtimestamp(row[0], timezone.utc)
         # ISO Kalenderwoche (Montag als Wochenstart)
         year, week, _ = scraped_at.isocalendar()
         week_key = (year, week)
@@ -143,7 +143,7 @@ def create_chart(product_id, product_name, weekly_data):
 def main():
     print("📊 Generiere Weekly Average Charts...\n")
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_readonly(DB_PATH)
     
     created_files = []
     
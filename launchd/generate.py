@@ -16,10 +16,15 @@ WORKDIR = "/Users/robert/Projects/cardmarket-tracker"
 PYTHON = "/usr/bin/python3"
 LABEL_PREFIX = "com.br1dge.cardmarket."
 
+# Adaptives Scheduling (scheduler.py): ersetzt die festen Scraper-Jobs durch
+# einen Scheduler-Tick alle 5 Minuten. Nach dem Umschalten generate.py + install.sh laufen lassen
+# und die alten Scraper-Plists per launchctl bootout entfernen.
+ADAPTIVE_SCHEDULING = False
+
 # Job definitions: (slug, script, args, schedule)
 # schedule = list of dicts, each like {'Minute': N, 'Hour': N, 'Weekday': N}
 #   Weekday: 0=Sun, 1=Mon ... 6=Sat (launchd convention)
-JOBS = [
+SCRAPER_JOBS = [
     # === SCRAPER (stündlich, versetzt) ===
     {
         'slug': 'unleashed',
@@ -51,7 +56,17 @@ JOBS = [
         'script': 'scraper.py', 'args': ['arcane'],
         'schedule': [{'Minute': 57}],
     },
+]
+
+SCHEDULER_JOBS = [
+    {
+        'slug': 'scheduler',
+        'script': 'scheduler.py', 'args': [],
+        'schedule': [{'Minute': m} for m in range(0, 60, 5)],
+    },
+]
 
+JOBS = (SCHEDULER_JOBS if ADAPTIVE_SCHEDULING else SCRAPER_JOBS) + [
     # === REPORTS ===
     {
         'slug': 'daily-report',
@@ -78,6 +93,20 @@ JOBS = [
         'schedule': [{'Hour': h, 'Minute': 0} for h in range(0, 24, 3)],
     },
 
+    # === RETENTION (nachts vor Archiv + Backup: ausdünnen, incremental_vacuum) ===
+    {
+        'slug': 'retention',
+        'script': 'retention.py', 'args': ['run'],
+        'schedule': [{'Hour': 2, 'Minute': 0}],
+    },
+
+    # === ARCHIV (sonntags vor dem Backup: alte Listings in Monats-Archive) ===
+    {
+        'slug': 'archive',
+        'script': 'archive.py', 'args': ['run'],
+        'schedule': [{'Weekday': 0, 'Hour': 2, 'Minute': 30}],
+    },
+
     # === BACKUP (3:00) ===
     {
         'slug': 'backup',
@@ -85,6 +114,13 @@ JOBS = [
         'schedule': [{'Hour': 3, 'Minute': 0}],
     },
 
+    # === SAISONALITÄT (nachts, nach dem Backup) ===
+    {
+        'slug': 'seasonality',
+        'script': 'seasonality.py', 'args': ['update'],
+        'schedule': [{'Hour': 3, 'Minute': 30}],
+    },
+
     # === DotGG Collection (alle 6h, versetzt) ===
     {
         'slug': 'collection-sync',
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+lifetimes.py — Lebensdauer einzelner Listings + Überlebenskurven nach Abstand zum Floor.
+
+Ein Listing ist (Produkt, Seller, Preis) über aufeinanderfolgende Scrapes hinweg
+(Mengenänderungen ändern die Identität nicht, Preisänderungen schon). Ein
+Streaming-Durchlauf über die Scrapes in zeitlicher Reihenfolge hält die offenen
+Listings in einer Hash-Map: neu → öffnen, fehlt → schließen (closed_at = erster
+Scrape ohne das Listing). Ergebnis landet in `listing_lifetimes`, offene Listings
+haben closed_at NULL. Quick-Scrapes (ohne Listings) und von retention.py
+ausgedünnte Scrapes werden übersprungen. `lifetime_cursor` merkt sich pro Produkt
+den letzten verarbeiteten Scrape, der Scraper ruft update_product() nach jedem Speichern auf.
+
+distance_pct = Abstand zum Floor beim Erscheinen in % (0 = war selbst der Floor).
+Die Auswertung ist Kaplan-Meier (offene Listings = zensiert).
+
+Usage:
+    python3 lifetimes.py update [product-slug]
+    python3 lifetimes.py rebuild [product-slug]
+    python3 lifetimes.py report <product-slug> [--days 30]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+from itertools import groupby
+
+from archive import listings_source
+from blocklist import blocked_sql
+from db import connect
+from products import PRODUCTS
+from scrape_stats import DISTRIBUTION_EDGES
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+
+# Zeitpunkte (Stunden) für die Überlebens-Tabelle im Report
+SURVIVAL_HOURS = (6, 24, 72, 168)
+
+
+def get_db():
+    return connect(DB_PATH)
+
+
+def _load_open(cursor, product_id):
+    """Offene Listings → {(seller_id, price): [row_id, opened_at, opened_scrape_id, last_seen_at, distance_pct, quantity]}."""
+    cursor.execute('''
+        SELECT id, seller_id, price, opened_at, opened_scrape_id, last_seen_at, distance_pct, quantity
+        FROM listing_lifetimes WHERE product_id = ? AND closed_at IS NULL
+    ''', (product_id,))
+    return {(r[1], r[2]): [r[0], r[3], r[4], r[5], r[6], r[7]] for r in cursor.fetchall()}
+
+
+def _write(cursor, product_id, key, entry, closed_at):
+    row_id, opened_at, opened_scrape, last_seen, distance, qty = entry
+    if row_id is None:
+        cursor.execute('''
+            INSERT INTO listing_lifetimes
+                (product_id, seller_id, price, opened_at, opened_scrape_id, last_seen_at, closed_at, distance_pct, quantity)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (product_id, key[0], key[1], opened_at, opened_scrape, last_seen, closed_at, distance, qty))
+        entry[0] = cursor.lastrowid
+    else:
+        cursor.execute('''
+            UPDATE listing_lifetimes SET last_seen_at = ?, closed_at = ?, quantity = ? WHERE id = ?
+        ''', (last_seen, closed_at, qty, row_id))
+
+
+def update_product(conn, product_id, source='listings'):
+    """
+    Verarbeitet alle neuen Scrapes eines Produkts in einem Durchlauf. Returns Anzahl Scrapes.
+    source: 'listings' oder 'listings_all' (inkl. Archive, siehe archive.listings_source).
+    """
+    cursor = conn.cursor()
+    cursor.execute('SELECT last_scrape_id FROM lifetime_cursor WHERE product_id = ?', (product_id,))
+    row = cursor.fetchone()
+    last_scrape = row[0] if row else 0
+
+    open_ = _load_open(cursor, product_id)
+    # Listings erst per Inner Join auf die neuen Scrapes eingrenzen — der LEFT JOIN
+    # materialisiert sonst bei listings_all die komplette Historie
+    cursor.execute(f'''
+        WITH new AS (
+            SELECT id, scraped_at, floor_price FROM scrapes
+            WHERE product_id = ? AND id > ? AND mode = 'full'
+              AND id NOT IN (SELECT scrape_id FROM listings_thinned)
+        ), l AS (
+            SELECT x.scrape_id, x.seller_id, x.price, x.quantity
+            FROM new CROSS JOIN {source} x  -- CROSS JOIN: new bleibt äußere Schleife
+            WHERE x.scrape_id = new.id AND x.location = 'Germany'
+        )
+        SELECT s.id, s.scraped_at, s.floor_price, l.seller_id, l.price, l.quantity
+        FROM new s
+        LEFT JOIN l ON l.scrape_id = s.id AND NOT {blocked_sql('l', 's')}
+        ORDER BY s.id
+    ''', (product_id, last_scrape))
+
+    write = conn.cursor()
+    n = 0
+    for (scrape_id, scraped_at, floor), rows in groupby(cursor, key=lambda r: r[:3]):
+        current = {}
+        for r in rows:
+            if r[3] is not None:
+                current[(r[3], r[4])] = current.get((r[3], r[4]), 0) + (r[5] or 1)
+
+        for key in [k for k in open_ if k not in current]:
+            _write(write, product_id, key, open_.pop(key), scraped_at)
+        for key, qty in current.items():
+            entry = open_.get(key)
+            if entry is None:
+                distance = (key[1] / floor - 1) * 100 if floor else None
+                open_[key] = [None, scraped_at, scrape_id, scraped_at, distance, qty]
+            else:
+                entry[3], entry[5] = scraped_at, qty
+        last_scrape = scrape_id
+        n += 1
+
+    if n:
+        for key, entry in open_.items():
+            _write(write, product_id, key, entry, None)
+        write.execute('INSERT OR REPLACE INTO lifetime_cursor (product_id, last_scrape_id) VALUES (?, ?)',
+                      (product_id, last_scrape))
+        conn.commit()
+    return n
+
+
+def update(conn, product_id=None, source='listings'):
+    """Alle (oder ein) Produkt(e) inkrementell nachziehen. Returns Anzahl verarbeiteter Scrapes."""
+    if product_id is not None:
+        return update_product(conn, product_id, source)
+    # products.PRODUCTS statt Tabelle products: die ist nur mit dem ersten Produkt geseedet
+    return sum(update_product(conn, pid, source) for pid in PRODUCTS)
+
+
+def rebuild(conn, product_id=None):
+    """Lifetimes verwerfen und komplett neu aufbauen (z.B. nach Blocklist-Änderung)."""
+    source = listings_source(conn)
+    where, params = ('WHERE product_id = ?', (product_id,)) if product_id is not None else ('', ())
+    conn.execute(f'DELETE FROM listing_lifetimes {where}', params)
+    conn.execute(f'DELETE FROM lifetime_cursor {where}', params)
+    conn.commit()
+    return update(conn, product_id, source)
+
+
+def _hours(start, end):
+    fmt = '%Y-%m-%d %H:%M:%S'
+    return (datetime.strptime(end[:19], fmt) - datetime.strptime(start[:19], fmt)).total_seconds() / 3600
+
+
+def kaplan_meier(durations):
+    """durations: [(hours, closed)] → [(t, S(t))] an jedem Ereigniszeitpunkt."""
+    at_risk = len(durations)
+    survival, curve = 1.0, []
+    for t, group in groupby(sorted(durations), key=lambda d: d[0]):
+        group = list(group)
+        events = sum(1 for _, closed in group if closed)
+        if events and at_risk:
+            survival *= 1 - events / at_risk
+            curve.append((t, survival))
+        at_risk -= len(group)
+    return curve
+
+
+def survival_at(curve, t):
+    s = 1.0
+    for ti, si in curve:
+        if ti > t:
+            break
+        s = si
+    return s
+
+
+def median_lifetime(curve):
+    return next((t for t, s in curve if s <= 0.5), None)
+
+
+def distance_bucket(distance, edges=DISTRIBUTION_EDGES):
+    for i in range(len(edges) - 1, -1, -1):
+        if distance >= edges[i]:
+            hi = edges[i + 1] if i + 1 < len(edges) else None
+            return f'+{edges[i]}–{hi}%' if hi is not None else f'+{edges[i]}%+'
+    return f'+{edges[0]}–{edges[1]}%'
+
+
+def survival_by_distance(cursor, product_id, days=30):
+    """{bucket_label: (n, kaplan-meier-curve)} für Listings, die in den letzten `days` Tagen erschienen."""
+    cursor.execute('''
+        SELECT distance_pct, opened_at, COALESCE(closed_at, last_seen_at), closed_at IS NOT NULL
+        FROM listing_lifetimes
+        WHERE product_id = ? AND opened_at > datetime('now', ?) AND distance_pct IS NOT NULL
+    ''', (product_id, f'-{days} days'))
+    buckets = {}
+    for distance, opened, end, closed in cursor.fetchall():
+        buckets.setdefault(distance_bucket(distance), []).append((_hours(opened, end), bool(closed)))
+    order = [distance_bucket(e) for e in DISTRIBUTION_EDGES]
+    return {label: (len(buckets[label]), kaplan_meier(buckets[label])) for label in order if label in buckets}
+
+
+def cmd_report(conn, product_id, pcfg, days):
+    cursor = conn.cursor()
+    result = survival_by_distance(cursor, product_id, days)
+    if not result:
+        print(f"⚠️  {pcfg['name']}: keine Lifetimes (erst 'lifetimes.py update' laufen lassen)")
+        return 1
+    print(f"{pcfg['emoji']} {pcfg['name']} — Überleben neuer Listings ({days} Tage, DE)")
+    head = ''.join(f'{f"≤{h}h":>8}' for h in SURVIVAL_HOURS)
+    print(f"   {'Abstand':<10} {'n':>5}{head}  {'Median':>8}")
+    for label, (n, curve) in result.items():
+        cells = ''.join(f'{survival_at(curve, h):>8.0%}' for h in SURVIVAL_HOURS)
+        med = median_lifetime(curve)
+        print(f"   {label:<10} {n:>5}{cells}  {f'{med:.0f}h' if med is not None else '—':>8}")
+    print("   (Anteil noch gelisteter Listings nach x Stunden, Kaplan-Meier)")
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Listing-Lebensdauern + Überlebenskurven')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    for name in ('update', 'rebuild'):
+        p = sub.add_parser(name)
+        p.add_argument('product', nargs='?')
+    p_rep = sub.add_parser('report')
+    p_rep.add_argument('product')
+    p_rep.add_argument('--days', type=int, default=30)
+    args = ap.parse_args()
+
+    product_id, pcfg = None, None
+    if args.product:
+        from products import by_slug
+        product_id, pcfg = by_slug(args.product.lower())
+        if product_id is None:
+            print(f"❌ Unknown product: {args.product}")
+            return 1
+
+    from migrate import ensure_schema
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        if args.cmd == 'report':
+            return cmd_report(conn, product_id, pcfg, args.days)
+        n = (update if args.cmd == 'update' else rebuild)(conn, product_id)
+        print(f"✅ Lifetimes: {n} Scrapes verarbeitet")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+migrate.py — Bringt eine bestehende cardmarket.db auf den Stand von schema.sql.
+
+Reihenfolge:
+1. Fehlende Spalten per ALTER TABLE ergänzen (COLUMN_MIGRATIONS)
+2. schema.sql ausführen (nur CREATE ... IF NOT EXISTS → idempotent)
+3. Einmalige Daten-Migrationen (DATA_MIGRATIONS), protokolliert in `schema_migrations`
+
+Der Scraper ruft ensure_schema() bei jedem Lauf auf, neue Tabellen entstehen
+also automatisch. Manuell (z.B. um eine große Migration gezielt anzustoßen):
+
+Usage: python3 migrate.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from db import connect
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+SCHEMA_PATH = Path(__file__).resolve().parent / 'schema.sql'
+
+# (table, column, declaration) — Spalten, die nach dem ersten Schema dazukamen
+COLUMN_MIGRATIONS = [
+    ('listings', 'seller_id', 'INTEGER REFERENCES sellers(id)'),
+    ('suspected_sales', 'quantity', 'INTEGER DEFAULT 1'),
+    ('suspected_sales', 'seller_id', 'INTEGER REFERENCES sellers(id)'),
+    ('scrapes', 'mode', "TEXT DEFAULT 'full'"),
+    ('scrapes', 'scraped_ts', 'INTEGER'),
+]
+
+
+def table_columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+# --- Daten-Migrationen (laufen genau einmal pro DB) ---
+
+def migrate_listings_seller_id(conn):
+    """listings.seller (TEXT) → sellers-Tabelle + listings.seller_id, danach Text-Spalte droppen."""
+    if 'seller' not in table_columns(conn, 'listings'):
+        return  # frische DB, schon im neuen Format
+    conn.execute('''
+        INSERT OR IGNORE INTO sellers (name, first_seen, last_seen)
+        SELECT l.seller, MIN(s.scraped_at), MAX(s.scraped_at)
+        FROM listings l
+        JOIN scrapes s ON s.id = l.scrape_id
+        GROUP BY l.seller
+    ''')
+    conn.execute('''
+        UPDATE listings SET seller_id = (SELECT id FROM sellers WHERE name = listings.seller)
+        WHERE seller_id IS NULL
+    ''')
+    conn.execute('DROP INDEX IF EXISTS idx_listings_seller')
+    conn.execute('ALTER TABLE listings DROP COLUMN seller')
+
+
+def migrate_seed_seller_blocklist(conn):
+    """Übernimmt die früher in scraper.py hartkodierte BLOCKED_SELLERS-Liste."""
+    conn.executemany('''
+        INSERT INTO seller_blocklist (seller_name, valid_from, reason) VALUES (?, ?, ?)
+    ''', [
+        ('WHITEBEARD23', '2026-02-19 00:00:00', 'Placeholder-Listings (111.11 / 333.33 / 555.55€, x341)'),
+        ('Kaiju-Cards', '2026-06-11 00:00:00', 'Fehlerhafte 1€ Listings für Origins Booster Box'),
+    ])
+
+
+def migrate_scrapes_scraped_ts(conn):
+    """scraped_ts für Alt-Scrapes nachtragen; der Index (product_id, scraped_at) wird dadurch überflüssig."""
+    conn.execute('''
+        UPDATE scrapes SET scraped_ts = CAST(strftime('%s', scraped_at) AS INTEGER)
+        WHERE scraped_ts IS NULL
+    ''')
+    conn.execute('DROP INDEX IF EXISTS idx_scrapes_product_time')
+
+
+DATA_MIGRATIONS = [
+    ('listings_seller_id', migrate_listings_seller_id),
+    ('seed_seller_blocklist', migrate_seed_seller_blocklist),
+    ('scrapes_scraped_ts', migrate_scrapes_scraped_ts),
+]
+
+
+def ensure_schema(conn):
+    """Ergänzt fehlende Spalten/Tabellen/Indizes und führt offene Daten-Migrationen aus."""
+    added = []
+    for table, column, decl in COLUMN_MIGRATIONS:
+        cols = table_columns(conn, table)
+        if cols and column not in cols:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {decl}')
+            added.append(f'{table}.{column}')
+    if not conn.execute('SELECT 1 FROM sqlite_master LIMIT 1').fetchone():
+        # Neue DB: incremental_vacuum für retention.py (später nur per vollem VACUUM umstellbar)
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+    conn.executescript(SCHEMA_PATH.read_text())
+
+    done = {row[0] for row in conn.execute('SELECT name FROM schema_migrations')}
+    for name, fn in DATA_MIGRATIONS:
+        if name in done:
+            continue
+        with conn:
+            fn(conn)
+            conn.execute('INSERT INTO schema_migrations (name) VALUES (?)', (name,))
+        added.append(name)
+    return added
+
+
+def main():
+    if not os.path.exists(DB_PATH):
+        print(f"❌ DB nicht gefunden: {DB_PATH}")
+        return 1
+
+    conn = connect(DB_PATH)
+    try:
+        added = ensure_schema(conn)
+    finally:
+        conn.close()
+
+    for name in added:
+        print(f"   ➕ Migriert: {name}")
+    if added:
+        print("   💡 Tipp: einmal VACUUM laufen lassen, um freigewordenen Platz zurückzugeben")
+    print(f"✅ Schema aktuell ({DB_PATH})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,13 +12,14 @@ import asyncio
 import json
 import os
 import re
-import sqlite3
 import sys
 from datetime import datetime
 from pathlib import Path
 
 from playwright.async_api import async_playwright
 
+from db import connect_readonly
+
 REPO = Path(__file__).resolve().parent
 DB_PATH = REPO / 'cardmarket.db'
 OUTPUT_PATH = REPO / 'missing_prices.json'
@@ -49,7 +50,7 @@ def get_missing_cards():
     origins = [c for c in cards if c.get('set_name') == 'Origins']
     print(f"   → {len(origins)} Origins cards total")
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_readonly(DB_PATH)
     cur = conn.cursor()
     cur.execute('SELECT card_id, standard_count, foil_count FROM user_collection')
     collection = {row[0]: row[1] + row[2] for row in cur.fetchall()}
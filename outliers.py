@@ -0,0 +1,117 @@
+"""
+outliers.py — Automatische Ausreißer-Erkennung für frisch geparste Listings.
+
+Läuft im Scraper über die Preise eines Scrapes, bevor der Floor berechnet wird.
+Jedes Listing sammelt Punkte aus mehreren Signalen; ab QUARANTINE_SCORE wird es
+in `listing_quarantine` abgelegt (mit Begründung) statt in `listings` und zählt
+nicht für floor_price. Kein Signal reicht allein — ein echter Marktsprung (alle
+Listings fallen unter die Referenz) wird so nicht aussortiert. Würden trotzdem alle
+DE-Listings in Quarantäne landen, bleiben sie drin (Warnung statt leerem Scrape).
+Ein Durchlauf, ein Sort — billig genug für jeden Scrape.
+
+Signale:
+- history:  Preis < HISTORY_MIN_RATIO × Referenz (Floor des letzten Scrapes) → 1 Punkt
+- mad:      robuster z-Score |Preis − Median| / (1.4826 × MAD) ≥ MAD_Z → 1 Punkt
+- qty:      Menge ≥ SUSPICIOUS_QTY → 1 Punkt
+- repdigit: Schnapszahl wie 111.11 / 333.33 / 555.55 → 1 Punkt
+
+Beispiele: WHITEBEARD23 (111.11€ x341) = repdigit + qty → Quarantäne.
+Kaiju-Cards (1€ bei ~170€ Markt) = history + mad → Quarantäne.
+"""
+
+QUARANTINE_SCORE = 2
+HISTORY_MIN_RATIO = 0.5   # < 50% vom Referenz-Floor = unplausibel
+MAD_Z = 6                 # robuster z-Score ab dem ein Preis als Ausreißer zählt
+MAD_MIN_SAMPLES = 5       # darunter ist der MAD nicht aussagekräftig
+SUSPICIOUS_QTY = 50       # so viele Boxen hat kein echter Einzelhändler auf einem Listing
+MAD_SCALE = 1.4826        # MAD → Standardabweichung bei Normalverteilung
+
+
+def _median(sorted_values):
+    n = len(sorted_values)
+    mid = n // 2
+    return sorted_values[mid] if n % 2 else (sorted_values[mid - 1] + sorted_values[mid]) / 2
+
+
+def _lower_quartile(sorted_values):
+    return sorted_values[(len(sorted_values) - 1) // 4] if sorted_values else None
+
+
+def is_repdigit(price):
+    """111.11, 3333.33 etc. — alle Ziffern gleich (1–8; 99.99 ist ein normaler Preis)."""
+    digits = f'{price:.2f}'.replace('.', '')
+    return len(digits) >= 4 and len(set(digits)) == 1 and digits[0] not in '09'
+
+
+def robust_center(prices):
+    """(median, sigma) über MAD, sigma=None wenn zu wenig Daten oder MAD = 0."""
+    if not prices:
+        return None, None
+    s = sorted(prices)
+    med = _median(s)
+    if len(s) < MAD_MIN_SAMPLES:
+        return med, None
+    mad = _median(sorted(abs(p - med) for p in s))
+    return med, (mad * MAD_SCALE if mad > 0 else None)
+
+
+def score_listing(listing, median, sigma, reference):
+    """Returns (score, [reasons]) für ein Listing."""
+    price = listing['price']
+    score, reasons = 0, []
+    if reference and price < reference * HISTORY_MIN_RATIO:
+        score += 1
+        reasons.append(f'history: {price:.2f}€ < {HISTORY_MIN_RATIO:.0%} von {reference:.2f}€')
+    if sigma and abs(price - median) / sigma >= MAD_Z:
+        score += 1
+        reasons.append(f'mad: z={(price - median) / sigma:+.1f}')
+    if (listing.get('quantity') or 1) >= SUSPICIOUS_QTY:
+        score += 1
+        reasons.append(f"qty: x{listing['quantity']}")
+    if is_repdigit(price):
+        score += 1
+        reasons.append(f'repdigit: {price:.2f}')
+    return score, reasons
+
+
+def detect(listings, required_location='Germany', reference=None):
+    """
+    Teilt Listings in (clean, quarantined) auf.
+
+    reference: Referenzpreis aus der Historie (Floor des letzten Scrapes, siehe
+               reference_price); ohne Historie das untere Quartil der aktuellen DE-Preise.
+    quarantined: Liste von (listing, reason).
+    """
+    de_prices = [l['price'] for l in listings if l['location'] == required_location]
+    median, sigma = robust_center(de_prices)
+    if reference is None:
+        reference = _lower_quartile(sorted(de_prices))
+
+    clean, quarantined = [], []
+    for listing in listings:
+        score, reasons = score_listing(listing, median, sigma, reference)
+        if score >= QUARANTINE_SCORE:
+            quarantined.append((listing, '; '.join(reasons)))
+        else:
+            clean.append(listing)
+
+    if de_prices and not any(l['location'] == required_location for l in clean):
+        print(f"⚠️  Ausreißer-Erkennung würde alle {len(de_prices)} DE-Listings aussortieren — behalte sie")
+        clean += [l for l, _ in quarantined if l['location'] == required_location]
+        quarantined = [(l, r) for l, r in quarantined if l['location'] != required_location]
+    return clean, quarantined
+
+
+def reference_price(cursor, product_id):
+    """Floor (DE, ohne Quarantäne) des letzten Scrapes, oder None.
+
+    Der Floor statt des Medians: bei breit gestreuten Produkten liegt der legitime
+    Floor oft unter der Hälfte des Medians.
+    """
+    cursor.execute('''
+        SELECT floor_price FROM scrapes
+        WHERE product_id = ? AND floor_price IS NOT NULL
+        ORDER BY scraped_ts DESC LIMIT 1
+    ''', (product_id,))
+    row = cursor.fetchone()
+    return row[0] if row else None
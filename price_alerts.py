@@ -14,7 +14,7 @@ import json
 import time
 import urllib.request
 import urllib.parse
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 
 # --- Config ---
@@ -34,7 +34,9 @@ TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')  # Riftbound Rippers group
 
 DRY_RUN = '--dry-run' in sys.argv
 
+from db import connect_readonly
 from products import PRODUCTS
+from series import floor_sql, floor_value, floor_window, valid_floors
 
 ATL_DROP_PCT = 0.05   # 5% unter bisherigem ATL = Alert
 ATL_ALERTS_LOG = Path(__file__).parent / '.atl_alerts_sent.json'  # Dedup-Tracking
@@ -82,27 +84,36 @@ def send_telegram(message, retries=RETRY_ATTEMPTS):
 # --- DB helpers ---
 
 def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute('PRAGMA busy_timeout = 5000')
+    conn = connect_readonly(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
 
 def get_latest(cursor, product_id):
-    cursor.execute('''
-        SELECT floor_price, total_listings, scraped_at
-        FROM scrapes WHERE product_id = ?
-        ORDER BY scraped_at DESC LIMIT 1
+    records = floor_window(cursor, product_id)
+    if records is not None:
+        if not len(records):
+            return None
+        last = records[-1]
+        return {'floor_price': floor_value(last['floor']), 'total_listings': int(last['listings']),
+                'scraped_ts': int(last['ts'])}
+
+    floor, join = floor_sql()
+    cursor.execute(f'''
+        SELECT {floor} AS floor_price, s.total_listings, s.scraped_ts
+        FROM scrapes s {join} WHERE s.product_id = ?
+        ORDER BY s.scraped_ts DESC LIMIT 1
     ''', (product_id,))
     return cursor.fetchone()
 
 
 def get_avg_24h(cursor, product_id):
-    cutoff = (datetime.utcnow() - timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S')
-    cursor.execute('''
-        SELECT AVG(floor_price) as avg_floor, COUNT(*) as n
-        FROM scrapes
-        WHERE product_id = ? AND scraped_at >= ?
+    cutoff = int(time.time()) - 24 * 3600
+    floor, join = floor_sql()
+    cursor.execute(f'''
+        SELECT AVG({floor}) as avg_floor, COUNT(*) as n
+        FROM scrapes s {join}
+        WHERE s.product_id = ? AND s.scraped_ts >= ?
     ''', (product_id, cutoff))
     return cursor.fetchone()
 
@@ -110,20 +121,26 @@ def get_avg_24h(cursor, product_id):
 def get_prev_listings(cursor, product_id):
     """Second most recent scrape for listing comparison."""
     cursor.execute('''
-        SELECT total_listings, scraped_at
+        SELECT total_listings, scraped_ts
         FROM scrapes WHERE product_id = ?
-        ORDER BY scraped_at DESC LIMIT 2
+        ORDER BY scraped_ts DESC LIMIT 2
     ''', (product_id,))
     rows = cursor.fetchall()
     return rows[1] if len(rows) >= 2 else None
 
 
 def get_all_time_low(cursor, product_id):
-    """Historischer Tiefstpreis (min floor_price) für Produkt."""
-    cursor.execute('''
-        SELECT MIN(floor_price) as atl
-        FROM scrapes
-        WHERE product_id = ? AND floor_price IS NOT NULL
+    """Historischer Tiefstpreis (min Floor, konfigurierter Schätzer) für Produkt."""
+    records = floor_window(cursor, product_id)
+    if records is not None:
+        floors = valid_floors(records)
+        return float(floors.min()) if len(floors) and floors.min() else None
+
+    floor, join = floor_sql()
+    cursor.execute(f'''
+        SELECT MIN({floor}) as atl
+        FROM scrapes s {join}
+        WHERE s.product_id = ? AND s.floor_price IS NOT NULL
     ''', (product_id,))
     row = cursor.fetchone()
     return row['atl'] if row and row['atl'] else None
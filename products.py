@@ -37,6 +37,7 @@ PRODUCTS = {
         'category': 'single',
         'emoji': '✨',
         'url': 'https://www.cardmarket.com/en/Riftbound/Products/Singles/Origins/Dazzling-Aurora',
+        'distribution_edges': (0, 5, 10, 25, 50, 100),  # Singles streuen stärker als Boxen
     },
     5: {
         'slug': 'unleashed',
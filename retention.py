@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+retention.py — Aufbewahrungs-Regeln: alte Rohdaten ausdünnen, DB-Größe begrenzen.
+
+Regeln pro Tabelle (POLICIES, Schwellen unten):
+- listings: Full-Scrapes älter als LISTINGS_FULL_DAYS behalten nur die
+  LISTINGS_KEEP_CHEAPEST günstigsten gültigen DE-Listings (nicht geblockt), der Rest
+  fliegt. Der Scrape landet in `listings_thinned` — Rollup-Backfill und Blocklist-Recompute
+  lassen ihn aus, Rollups (scrape_stats, price_distribution, scrape_depth, scrape_floors)
+  und Floor bleiben so, wie sie aus den vollen Listings berechnet wurden. Ein
+  Lifetimes-Rebuild beginnt nach dem letzten ausgedünnten Scrape (die Überlebenskurven
+  schauen ohnehin nur LISTINGS_FULL_DAYS zurück).
+- card_prices: älter als CARD_PRICES_DAILY_AFTER_DAYS → nur der letzte Snapshot pro Karte und Tag.
+- card_alerts_sent: Dedup-Einträge älter als ALERTS_SENT_KEEP_DAYS (gebraucht werden nur DEDUP_HOURS).
+- suspected_sales: 'low'-Verdachte älter als LOW_SALES_KEEP_DAYS (sales_daily zählt nur high/medium).
+
+Gelöscht wird in kleinen Transaktionen (BATCH_*) mit Pause dazwischen, damit Scraper
+und Alerts nie lange auf den Write-Lock warten; nach MAX_RUNTIME_S ist Schluss, der
+Rest folgt im nächsten Lauf. Danach gibt `PRAGMA incremental_vacuum` freie Seiten
+schrittweise ans Dateisystem zurück — das setzt auto_vacuum=INCREMENTAL voraus (neue
+DBs bekommen das von migrate.py, bestehende einmalig per `enable-vacuum`, ein volles
+VACUUM mit exklusivem Lock).
+
+Läuft vor archive.py (das Listings erst nach 90 Tagen auslagert), die Archive
+enthalten also bereits ausgedünnte Scrapes.
+
+Usage:
+    python3 retention.py run [--only listings,card_prices] [--max-seconds 900]
+    python3 retention.py status        # was fällig ist + DB-/Freelist-Größe
+    python3 retention.py enable-vacuum # einmalig auto_vacuum=INCREMENTAL + VACUUM
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from blocklist import blocked_sql
+from db import connect
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+
+LISTINGS_FULL_DAYS = 30
+LISTINGS_KEEP_CHEAPEST = 20
+CARD_PRICES_DAILY_AFTER_DAYS = 90
+ALERTS_SENT_KEEP_DAYS = 30
+LOW_SALES_KEEP_DAYS = 180
+
+BATCH_SCRAPES = 100        # Scrapes pro Transaktion beim Ausdünnen der Listings
+BATCH_CARDS = 50           # Karten pro Transaktion bei card_prices
+BATCH_ROWS = 5000          # Zeilen pro Transaktion bei den einfachen Löschregeln
+BATCH_PAUSE_S = 0.05       # Pause zwischen Transaktionen (Write-Lock freigeben)
+VACUUM_PAGES = 2000        # Seiten pro incremental_vacuum-Schritt
+MAX_RUNTIME_S = 900
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def get_db():
+    return connect(DB_PATH)
+
+
+def _epoch_cutoff(cursor, days):
+    cursor.execute("SELECT CAST(strftime('%s', 'now', ?) AS INTEGER)", (f'-{days} days',))
+    return cursor.fetchone()[0]
+
+
+# --- Regeln: jede liefert pro Aufruf einen Batch, (gelöscht, fertig) ---
+
+def thin_listings(conn, state):
+    """Nächste BATCH_SCRAPES alten Full-Scrapes auf die günstigsten K DE-Listings ausdünnen."""
+    cursor = conn.cursor()
+    cutoff = state.setdefault('cutoff', _epoch_cutoff(cursor, LISTINGS_FULL_DAYS))
+    cursor.execute('''
+        SELECT s.id FROM scrapes s
+        WHERE s.id > ? AND s.mode = 'full' AND s.scraped_ts < ?
+          AND NOT EXISTS (SELECT 1 FROM listings_thinned t WHERE t.scrape_id = s.id)
+          AND EXISTS (SELECT 1 FROM listings l WHERE l.scrape_id = s.id)
+        ORDER BY s.id LIMIT ?
+    ''', (state.get('after', 0), cutoff, BATCH_SCRAPES))
+    batch = [r[0] for r in cursor.fetchall()]
+    if not batch:
+        return 0, True
+    state['after'] = batch[-1]
+
+    cursor.execute('DROP TABLE IF EXISTS temp._thin')
+    cursor.execute('CREATE TEMP TABLE _thin (id INTEGER PRIMARY KEY)')
+    cursor.executemany('INSERT INTO _thin (id) VALUES (?)', [(i,) for i in batch])
+    cursor.execute(f'''
+        DELETE FROM listings
+        WHERE scrape_id IN (SELECT id FROM _thin)
+          AND id NOT IN (
+              SELECT id FROM (
+                  SELECT l.id, ROW_NUMBER() OVER (PARTITION BY l.scrape_id ORDER BY l.price, l.id) AS rn
+                  FROM _thin t  -- CROSS JOIN: _thin bleibt äußere Schleife (keine Statistik für TEMP)
+                  CROSS JOIN scrapes s ON s.id = t.id
+                  -- INDEXED BY: sonst baut SQLite pro Batch einen Auto-Index über alle Listings
+                  CROSS JOIN listings l INDEXED BY idx_listings_scrape ON l.scrape_id = t.id
+                  WHERE l.location = 'Germany' AND NOT {blocked_sql('l', 's')}
+              ) WHERE rn <= ?)
+    ''', (LISTINGS_KEEP_CHEAPEST,))
+    removed = cursor.rowcount
+    cursor.execute('''
+        INSERT INTO listings_thinned (scrape_id, kept)
+        SELECT t.id, (SELECT COUNT(*) FROM listings l WHERE l.scrape_id = t.id) FROM _thin t
+    ''')
+    conn.commit()
+    return removed, False
+
+
+def thin_card_prices(conn, state):
+    """Alte card_prices der nächsten BATCH_CARDS Karten auf den letzten Snapshot pro Tag reduzieren."""
+    cursor = conn.cursor()
+    if 'cards' not in state:
+        cursor.execute('SELECT DISTINCT card_id FROM card_prices ORDER BY card_id')
+        state['cards'] = [r[0] for r in cursor.fetchall()]
+    batch, state['cards'] = state['cards'][:BATCH_CARDS], state['cards'][BATCH_CARDS:]
+    if not batch:
+        return 0, True
+    marks = ', '.join('?' for _ in batch)
+    cursor.execute(f'''
+        DELETE FROM card_prices WHERE rowid IN (
+            SELECT rid FROM (
+                SELECT rowid AS rid, ROW_NUMBER() OVER (PARTITION BY card_id, date(scraped_at)
+                                                        ORDER BY scraped_at DESC, rowid DESC) AS rn
+                FROM card_prices
+                WHERE card_id IN ({marks}) AND scraped_at < datetime('now', ?)
+            ) WHERE rn > 1)
+    ''', (*batch, f'-{CARD_PRICES_DAILY_AFTER_DAYS} days'))
+    removed = cursor.rowcount
+    conn.commit()
+    return removed, False
+
+
+def _delete_older(table, column, days, extra=''):
+    """Einfache Regel: Zeilen mit column älter als days löschen (rowid-Reihenfolge = zeitlich).
+
+    rowid statt id: card_alerts_sent wird außerhalb des Repos angelegt, eine id-Spalte
+    ist dort nicht garantiert.
+    """
+    def policy(conn, state):
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            DELETE FROM {table} WHERE rowid IN (
+                SELECT rowid FROM {table}
+                WHERE {column} < datetime('now', ?) {extra}
+                ORDER BY rowid LIMIT ?)
+        ''', (f'-{days} days', BATCH_ROWS))
+        removed = cursor.rowcount
+        conn.commit()
+        return removed, removed < BATCH_ROWS
+    return policy
+
+
+POLICIES = {
+    'listings': (thin_listings,
+                 f'> {LISTINGS_FULL_DAYS} Tage: nur die {LISTINGS_KEEP_CHEAPEST} günstigsten DE-Listings pro Scrape'),
+    'card_prices': (thin_card_prices,
+                    f'> {CARD_PRICES_DAILY_AFTER_DAYS} Tage: letzter Snapshot pro Karte und Tag'),
+    'card_alerts_sent': (_delete_older('card_alerts_sent', 'sent_at', ALERTS_SENT_KEEP_DAYS),
+                         f'> {ALERTS_SENT_KEEP_DAYS} Tage: löschen'),
+    'suspected_sales': (_delete_older('suspected_sales', 'detected_at', LOW_SALES_KEEP_DAYS,
+                                      "AND confidence = 'low'"),
+                        f"> {LOW_SALES_KEEP_DAYS} Tage: 'low'-Verdachte löschen"),
+}
+
+
+# --- Ablauf ---
+
+def incremental_vacuum(conn, deadline):
+    """Freie Seiten schrittweise zurückgeben. Returns Anzahl Seiten (None = auto_vacuum nicht INCREMENTAL)."""
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+        return None
+    start = free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    while free and time.monotonic() < deadline:
+        # executescript statt execute: das sqlite3-Modul steppt den PRAGMA sonst nur
+        # einmal, und incremental_vacuum gibt pro Step genau eine Seite frei
+        conn.executescript(f'PRAGMA incremental_vacuum({VACUUM_PAGES})')
+        free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        time.sleep(BATCH_PAUSE_S)
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+    return start - free
+
+
+def run(conn, only=None, max_seconds=MAX_RUNTIME_S):
+    """Alle (oder die gewählten) Regeln batchweise anwenden, dann incremental_vacuum. Returns {policy: gelöscht}."""
+    deadline = time.monotonic() + max_seconds
+    result = {}
+    for name, (policy, _) in POLICIES.items():
+        if only and name not in only:
+            continue
+        state, removed, done = {}, 0, False
+        while not done and time.monotonic() < deadline:
+            n, done = policy(conn, state)
+            removed += n
+            time.sleep(BATCH_PAUSE_S)
+        result[name] = removed
+        print(f"   {'🧹' if done else '⏱️ '} {name}: {removed} Zeilen gelöscht{'' if done else ' (Zeitlimit, Rest im nächsten Lauf)'}")
+
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    freed = incremental_vacuum(conn, deadline)
+    if freed is None:
+        print("   💡 auto_vacuum ist nicht INCREMENTAL — einmalig 'retention.py enable-vacuum' laufen lassen")
+    elif freed:
+        print(f"   🗜️  incremental_vacuum: {freed * page_size / (1024 * 1024):.1f} MB freigegeben")
+    return result
+
+
+def cmd_status(conn):
+    cursor = conn.cursor()
+    cutoff = _epoch_cutoff(cursor, LISTINGS_FULL_DAYS)
+    cursor.execute('''
+        SELECT COUNT(DISTINCT s.id), COUNT(l.id) FROM scrapes s
+        JOIN listings l ON l.scrape_id = s.id
+        WHERE s.mode = 'full' AND s.scraped_ts < ?
+          AND NOT EXISTS (SELECT 1 FROM listings_thinned t WHERE t.scrape_id = s.id)
+    ''', (cutoff,))
+    scrapes, listings = cursor.fetchone()
+    due = {'listings': f'{scrapes} Scrapes mit {listings} Listings'}
+    cursor.execute('''
+        SELECT COUNT(*) - COUNT(DISTINCT card_id || date(scraped_at)) FROM card_prices
+        WHERE scraped_at < datetime('now', ?)
+    ''', (f'-{CARD_PRICES_DAILY_AFTER_DAYS} days',))
+    due['card_prices'] = f'{cursor.fetchone()[0]} Zeilen'
+    cursor.execute("SELECT COUNT(*) FROM card_alerts_sent WHERE sent_at < datetime('now', ?)",
+                   (f'-{ALERTS_SENT_KEEP_DAYS} days',))
+    due['card_alerts_sent'] = f'{cursor.fetchone()[0]} Zeilen'
+    cursor.execute("SELECT COUNT(*) FROM suspected_sales WHERE confidence = 'low' AND detected_at < datetime('now', ?)",
+                   (f'-{LOW_SALES_KEEP_DAYS} days',))
+    due['suspected_sales'] = f'{cursor.fetchone()[0]} Zeilen'
+
+    print("🧹 Retention")
+    for name, (_, desc) in POLICIES.items():
+        print(f"   {name:<17} {desc}\n   {'':<17} fällig: {due[name]}")
+    cursor.execute('SELECT COUNT(*), COALESCE(SUM(kept), 0) FROM listings_thinned')
+    n, kept = cursor.fetchone()
+    print(f"   Ausgedünnt bisher: {n} Scrapes ({kept} Listings behalten)")
+
+    page_size = cursor.execute('PRAGMA page_size').fetchone()[0]
+    pages = cursor.execute('PRAGMA page_count').fetchone()[0]
+    free = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+    mode = cursor.execute('PRAGMA auto_vacuum').fetchone()[0]
+    print(f"   DB: {pages * page_size / (1024 * 1024):.1f} MB, davon frei {free * page_size / (1024 * 1024):.1f} MB, "
+          f"auto_vacuum={('NONE', 'FULL', 'INCREMENTAL')[mode]}")
+    return 0
+
+
+def cmd_enable_vacuum(conn):
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+        print("✅ auto_vacuum ist bereits INCREMENTAL")
+        return 0
+    print("⏳ VACUUM (sperrt die DB für die Dauer, Scraper wartet bzw. scheitert) …")
+    t0 = time.monotonic()
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    print(f"✅ auto_vacuum=INCREMENTAL ({time.monotonic() - t0:.0f}s)")
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Aufbewahrungs-Regeln anwenden (ausdünnen, löschen, incremental_vacuum)')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p_run = sub.add_parser('run')
+    p_run.add_argument('--only', help=f"Komma-getrennt, aus: {', '.join(POLICIES)}")
+    p_run.add_argument('--max-seconds', type=int, default=MAX_RUNTIME_S)
+    sub.add_parser('status')
+    sub.add_parser('enable-vacuum')
+    args = ap.parse_args()
+
+    only = None
+    if args.cmd == 'run' and args.only:
+        only = {name.strip() for name in args.only.split(',')}
+        unknown = only - POLICIES.keys()
+        if unknown:
+            print(f"❌ Unbekannte Regel(n): {', '.join(sorted(unknown))}")
+            return 1
+
+    from migrate import ensure_schema
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        if args.cmd == 'status':
+            return cmd_status(conn)
+        if args.cmd == 'enable-vacuum':
+            return cmd_enable_vacuum(conn)
+        result = run(conn, only, args.max_seconds)
+    finally:
+        conn.close()
+    print(f"✅ Retention: {sum(result.values())} Zeilen gelöscht")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
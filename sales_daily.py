@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+sales_daily.py — Tages-Rollup der Verkaufsverdachte pro Produkt.
+
+`sales_daily` (eine Zeile pro Produkt und UTC-Tag) hält geschätzte verkaufte
+Einheiten, Umsatz, Median-/Min-/Max-Verkaufspreis und die Umschlagsquote
+(Einheiten / Ø total_listings des Tages). Der Scraper pflegt die Zeile
+inkrementell im selben Commit wie die suspected_sales-Einträge; Wochen- und
+Monatssummen sind dann ein Read über ≤ 31 Zeilen pro Produkt.
+
+Es zählen nur Verdachte mit Confidence in SALES_CONFIDENCE.
+
+Usage:
+    python3 sales_daily.py rebuild [product-slug]
+    python3 sales_daily.py show [product-slug] [--days 30]
+"""
+
+import argparse
+import os
+import sys
+
+from db import connect
+from scrape_stats import percentile
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+
+SALES_CONFIDENCE = ('high', 'medium')
+
+
+def get_db():
+    return connect(DB_PATH)
+
+
+def _confidence_sql():
+    return ', '.join(f"'{c}'" for c in SALES_CONFIDENCE)
+
+
+def _refresh_day(cursor, product_id, day):
+    """Median + Umschlag eines Tages aus den (wenigen) Verkäufen/Scrapes des Tages neu setzen."""
+    cursor.execute(f'''
+        SELECT price, quantity FROM suspected_sales
+        WHERE product_id = ? AND detected_at >= ? AND detected_at < date(?, '+1 day')
+          AND confidence IN ({_confidence_sql()})
+    ''', (product_id, day, day))
+    prices = sorted(p for price, qty in cursor.fetchall() for p in [price] * (qty or 1))
+
+    cursor.execute('''
+        SELECT AVG(total_listings) FROM scrapes
+        WHERE product_id = ? AND scraped_ts >= CAST(strftime('%s', ?) AS INTEGER)
+          AND scraped_ts < CAST(strftime('%s', ?, '+1 day') AS INTEGER)
+    ''', (product_id, day, day))
+    avg_listings = cursor.fetchone()[0]
+
+    cursor.execute('''
+        UPDATE sales_daily
+        SET median_price = ?, avg_listings = ?,
+            turnover = CASE WHEN ? > 0 THEN units * 1.0 / ? END
+        WHERE product_id = ? AND day = ?
+    ''', (percentile(prices, 0.5), avg_listings, avg_listings or 0, avg_listings, product_id, day))
+
+
+def record(cursor, product_id, sales, day=None):
+    """
+    Neue Verkaufsverdachte (Dicts mit price, quantity, confidence) ins Rollup des
+    Tages addieren (default: heute, UTC). Kein Commit.
+    """
+    sales = [s for s in sales if s['confidence'] in SALES_CONFIDENCE]
+    if not sales:
+        return
+    if day is None:
+        cursor.execute("SELECT date('now')")
+        day = cursor.fetchone()[0]
+    units = sum(s['quantity'] for s in sales)
+    revenue = sum(s['price'] * s['quantity'] for s in sales)
+    cursor.execute('''
+        INSERT INTO sales_daily (product_id, day, units, revenue, min_price, max_price)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (product_id, day) DO UPDATE SET
+            units = units + excluded.units,
+            revenue = revenue + excluded.revenue,
+            min_price = MIN(min_price, excluded.min_price),
+            max_price = MAX(max_price, excluded.max_price)
+    ''', (product_id, day, units, round(revenue, 2),
+          min(s['price'] for s in sales), max(s['price'] for s in sales)))
+    _refresh_day(cursor, product_id, day)
+
+
+def rebuild(conn, product_id=None):
+    """Rollup komplett aus suspected_sales neu aufbauen. Returns Anzahl Tageszeilen."""
+    cursor = conn.cursor()
+    where, params = '', ()
+    if product_id is not None:
+        where, params = 'AND product_id = ?', (product_id,)
+    cursor.execute(f'DELETE FROM sales_daily WHERE 1 {where}', params)
+    cursor.execute(f'''
+        INSERT INTO sales_daily (product_id, day, units, revenue, min_price, max_price)
+        SELECT product_id, date(detected_at), SUM(quantity), ROUND(SUM(price * quantity), 2),
+               MIN(price), MAX(price)
+        FROM suspected_sales
+        WHERE confidence IN ({_confidence_sql()}) {where}
+        GROUP BY product_id, date(detected_at)
+    ''', params)
+    cursor.execute(f'SELECT product_id, day FROM sales_daily WHERE 1 {where}', params)
+    days = cursor.fetchall()
+    for pid, day in days:
+        _refresh_day(cursor, pid, day)
+    conn.commit()
+    return len(days)
+
+
+def summary(cursor, days, product_id=None):
+    """
+    Pro Produkt über die letzten `days` Tage (inkl. heute):
+    (product_id, name, units, revenue, min_price, max_price, avg_turnover).
+    """
+    where, params = '', [f'-{days - 1} days']
+    if product_id is not None:
+        where = 'AND d.product_id = ?'
+        params.append(product_id)
+    cursor.execute(f'''
+        SELECT d.product_id, p.name, SUM(d.units), SUM(d.revenue), MIN(d.min_price), MAX(d.max_price),
+               AVG(d.turnover)
+        FROM sales_daily d
+        JOIN products p ON p.id = d.product_id
+        WHERE d.day >= date('now', ?) {where}
+        GROUP BY d.product_id
+        ORDER BY d.product_id
+    ''', params)
+    return cursor.fetchall()
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Tages-Rollup der Verkaufsverdachte')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p_rb = sub.add_parser('rebuild', help='Rollup aus suspected_sales neu aufbauen')
+    p_rb.add_argument('product', nargs='?')
+    p_show = sub.add_parser('show', help='Tageswerte anzeigen')
+    p_show.add_argument('product', nargs='?')
+    p_show.add_argument('--days', type=int, default=30)
+    args = ap.parse_args()
+
+    product_id = None
+    if args.product:
+        from products import by_slug
+        product_id, _ = by_slug(args.product.lower())
+        if product_id is None:
+            print(f"❌ Unknown product: {args.product}")
+            return 1
+
+    from migrate import ensure_schema
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        if args.cmd == 'rebuild':
+            n = rebuild(conn, product_id)
+            print(f"✅ sales_daily neu aufgebaut: {n} Tageszeilen")
+            return 0
+
+        cursor = conn.cursor()
+        where, params = '', [f'-{args.days - 1} days']
+        if product_id is not None:
+            where = 'AND d.product_id = ?'
+            params.append(product_id)
+        cursor.execute(f'''
+            SELECT p.name, d.day, d.units, d.revenue, d.median_price, d.turnover
+            FROM sales_daily d JOIN products p ON p.id = d.product_id
+            WHERE d.day >= date('now', ?) {where}
+            ORDER BY d.product_id, d.day
+        ''', params)
+        rows = cursor.fetchall()
+        if not rows:
+            print("Keine Verkaufsdaten im Zeitraum.")
+            return 0
+        print(f"{'Produkt':<26} {'Tag':<10} {'Stk':>4} {'Umsatz':>10} {'Median':>9} {'Umschlag':>8}")
+        for name, day, units, revenue, median, turnover in rows:
+            turn = f'{turnover:.1%}' if turnover is not None else '—'
+            med = f'{median:.2f}€' if median is not None else '—'
+            print(f"{name[:26]:<26} {day:<10} {units:>4} {revenue:>9.2f}€ {med:>9} {turn:>8}")
+        print()
+        for pid, name, units, revenue, lo, hi, turnover in summary(cursor, args.days, product_id):
+            print(f"Σ {name}: {units} Stk, {revenue:.2f}€ Umsatz ({lo:.2f}–{hi:.2f}€)")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
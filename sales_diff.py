@@ -0,0 +1,135 @@
+"""
+sales_diff.py — Verkaufsverdacht per Diff zweier Listing-Stände (vorheriger vs. aktueller Scrape).
+
+Der Stand eines Produkts (DE-Listings als (seller_id, price, quantity)) liegt als
+zlib-komprimiertes JSON in `listing_state`, eine Zeile pro Produkt. Beim Speichern
+eines Scrapes wird er gelesen, mit der frischen Listing-Liste verglichen und ersetzt —
+ein Dict-Lookup pro Listing, keine Window-Query über listings.
+
+Erkennung (Schlüssel: Seller + Preis, Wert: Menge):
+- Menge gesunken, Listing noch da            → verkaufte Einheiten = Differenz, 'high'
+- Seller komplett weg, Listing war im Q1      → alle Einheiten, 'medium'
+- Seller komplett weg, teurer                 → alle Einheiten, 'low'
+- Preis geändert und insgesamt weniger Menge  → Rest-Differenz, 'low'
+Reine Preisänderungen (gleiche Menge, neuer Preis) sind kein Verkauf.
+
+Usage:
+    from sales_diff import detect_sales
+
+    sales = detect_sales(cursor, product_id, scrape_id, de_entries)   # Liste von Sale-Dicts
+"""
+
+import json
+import zlib
+
+from scrape_stats import percentile
+
+
+def state_entries(listings, seller_ids, required_location='Germany'):
+    """DE-Listings → [(seller_id, price, quantity)], nach Preis sortiert (Format des Stands)."""
+    return sorted(
+        ((seller_ids[l['seller']], l['price'], l['quantity'] or 1)
+         for l in listings if l['location'] == required_location),
+        key=lambda e: e[1],
+    )
+
+
+def encode_state(entries):
+    return zlib.compress(json.dumps(entries, separators=(',', ':')).encode())
+
+
+def decode_state(blob):
+    return [tuple(e) for e in json.loads(zlib.decompress(blob))]
+
+
+def load_state(cursor, product_id):
+    """(scrape_id, entries) des zuletzt gespeicherten Stands oder (None, None)."""
+    cursor.execute('SELECT scrape_id, state FROM listing_state WHERE product_id = ?', (product_id,))
+    row = cursor.fetchone()
+    return (row[0], decode_state(row[1])) if row else (None, None)
+
+
+def save_state(cursor, product_id, scrape_id, entries):
+    """Ersetzt den Stand eines Produkts. Kein Commit."""
+    cursor.execute('''
+        INSERT OR REPLACE INTO listing_state (product_id, scrape_id, state) VALUES (?, ?, ?)
+    ''', (product_id, scrape_id, encode_state(entries)))
+
+
+def state_from_listings(cursor, scrape_id):
+    """Fallback ohne gespeicherten Stand (erster Lauf / Lücke): Stand aus listings rekonstruieren."""
+    cursor.execute('''
+        SELECT seller_id, price, COALESCE(quantity, 1) FROM listings
+        WHERE scrape_id = ? AND location = 'Germany'
+        ORDER BY price
+    ''', (scrape_id,))
+    return [tuple(r) for r in cursor.fetchall()]
+
+
+def _by_key(entries):
+    keyed, per_seller = {}, {}
+    for seller_id, price, qty in entries:
+        keyed[(seller_id, price)] = keyed.get((seller_id, price), 0) + qty
+        per_seller[seller_id] = per_seller.get(seller_id, 0) + qty
+    return keyed, per_seller
+
+
+def diff(prev_entries, curr_entries):
+    """
+    Vergleicht zwei Stände, returns Liste von Dicts
+    (seller_id, price, quantity, confidence, reasoning), günstigste zuerst.
+    """
+    if not prev_entries:
+        return []
+    q1 = percentile([e[1] for e in prev_entries], 0.25)  # prev_entries ist nach Preis sortiert
+    prev, prev_seller = _by_key(prev_entries)
+    curr, curr_seller = _by_key(curr_entries)
+
+    sales = []
+    explained = {}  # seller_id → bereits als 'high' erklärte Einheiten
+    vanished = []   # (seller_id, price, qty) — Schlüssel ganz verschwunden
+    for (seller_id, price), qty in prev.items():
+        now = curr.get((seller_id, price))
+        if now is None:
+            vanished.append((seller_id, price, qty))
+        elif now < qty:
+            sales.append({'seller_id': seller_id, 'price': price, 'quantity': qty - now,
+                          'confidence': 'high', 'reasoning': f'Menge x{qty} → x{now}'})
+            explained[seller_id] = explained.get(seller_id, 0) + qty - now
+
+    for seller_id, price, qty in vanished:
+        if seller_id not in curr_seller:
+            in_q1 = price <= q1
+            sales.append({'seller_id': seller_id, 'price': price, 'quantity': qty,
+                          'confidence': 'medium' if in_q1 else 'low',
+                          'reasoning': 'Seller nicht mehr gelistet' + (', war im Q1' if in_q1 else '')})
+            continue
+        # Seller noch da, aber nicht mehr zu diesem Preis: nur die Mengen-Differenz zählt
+        missing = prev_seller[seller_id] - curr_seller[seller_id] - explained.get(seller_id, 0)
+        if missing > 0:
+            units = min(missing, qty)
+            sales.append({'seller_id': seller_id, 'price': price, 'quantity': units,
+                          'confidence': 'low', 'reasoning': f'Preis geändert, {units} Einheit(en) weniger'})
+            explained[seller_id] = explained.get(seller_id, 0) + units
+
+    sales.sort(key=lambda s: s['price'])
+    return sales
+
+
+def detect_sales(cursor, product_id, scrape_id, entries):
+    """
+    Diff gegen den gespeicherten Stand, danach Stand auf diesen Scrape setzen. Kein Commit.
+    Passt der gespeicherte Stand nicht zum vorherigen Full-Scrape, wird er aus listings rekonstruiert
+    (Quick-Scrapes haben keine Listings und zählen nicht).
+    """
+    cursor.execute('''
+        SELECT MAX(id) FROM scrapes WHERE product_id = ? AND id < ? AND mode = 'full'
+    ''', (product_id, scrape_id))
+    prev_scrape = cursor.fetchone()[0]
+
+    state_scrape, prev_entries = load_state(cursor, product_id)
+    if prev_scrape is not None and state_scrape != prev_scrape:
+        prev_entries = state_from_listings(cursor, prev_scrape)
+
+    save_state(cursor, product_id, scrape_id, entries)
+    return diff(prev_entries, entries) if prev_scrape is not None else []
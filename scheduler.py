@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+scheduler.py — Volatilitäts-adaptives Scrape-Scheduling statt fester Stunden-Minute.
+
+Läuft als ein launchd-Job alle SCHEDULER_TICK_MIN Minuten (siehe launchd/generate.py,
+ADAPTIVE_SCHEDULING). Pro Tick:
+1. Für jedes Produkt Signale aus der DB lesen und ein Wunsch-Intervall berechnen:
+   - Volatilität: Variationskoeffizient des Floors der letzten VOLATILITY_WINDOW_H Stunden
+   - Churn: geschlossene Listings/Stunde relativ zum Bestand (listing_lifetimes)
+   - ATL-Nähe: Floor höchstens ATL_PROXIMITY_PCT über dem All-Time-Low
+   - Saisonalität: aktueller Wochen-Slot ist historisch günstig (seasonality)
+2. Globales Budget: übersteigt die Summe der Scrapes/Stunde SCHEDULER_BUDGET_PER_HOUR,
+   werden alle Intervalle proportional gestreckt.
+3. Fällige Produkte (höchster Score zuerst) per `scraper.py <slug>` scrapen, solange
+   das Budget der letzten Stunde reicht (max. SCHEDULER_MAX_PER_TICK pro Tick).
+
+Jede Entscheidung landet mit allen Signalen in `schedule_decisions` (Audit),
+der aktuelle Plan in `scrape_schedule`.
+
+Usage:
+    python3 scheduler.py            # ein Tick (launchd)
+    python3 scheduler.py --plan     # nur anzeigen, nichts scrapen
+    python3 scheduler.py --log [N]  # letzte N Entscheidungen
+"""
+
+import argparse
+import fcntl
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from db import connect
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+BASE_DIR = Path(__file__).resolve().parent
+LOCK_PATH = BASE_DIR / '.scheduler.lock'
+
+from products import PRODUCTS
+
+SCHEDULER_TICK_MIN = 5
+SCHEDULER_BUDGET_PER_HOUR = 10     # Page-Loads pro Stunde über alle Produkte
+SCHEDULER_MAX_PER_TICK = 2
+MIN_INTERVAL_MIN = 20
+MAX_INTERVAL_MIN = 110             # < watchdog.MAX_AGE_HOURS, sonst schlägt der Watchdog an
+BASE_INTERVAL_MIN = 60             # ruhiges Produkt ohne Signale ≈ heutiger Stundentakt / Score 1
+SCRAPE_TIMEOUT_S = 600
+
+VOLATILITY_WINDOW_H = 6
+VOLATILITY_REF_PCT = 1.0           # CV von 1% zählt als "normal bewegt" (Score-Beitrag 1)
+CHURN_REF = 0.10                   # 10% der Listings verschwinden pro Stunde = Beitrag 1
+ATL_PROXIMITY_PCT = 3.0
+ATL_BOOST = 1.0
+SEASONAL_BOOST = 0.5               # aktueller Slot liegt im Median unter dem Tagesmittel
+
+TS_FMT = '%Y-%m-%d %H:%M:%S'
+
+
+def get_db():
+    return connect(DB_PATH)
+
+
+def volatility_pct(cursor, product_id):
+    """Variationskoeffizient (%) des Floors im Fenster, None ohne Daten."""
+    cursor.execute('''
+        SELECT AVG(floor_price), AVG(floor_price * floor_price), COUNT(*)
+        FROM scrapes
+        WHERE product_id = ? AND floor_price IS NOT NULL AND scraped_ts > CAST(strftime('%s', 'now', ?) AS INTEGER)
+    ''', (product_id, f'-{VOLATILITY_WINDOW_H} hours'))
+    mean, mean_sq, n = cursor.fetchone()
+    if not n or n < 2 or not mean:
+        return None
+    var = max(mean_sq - mean * mean, 0.0)
+    return var ** 0.5 / mean * 100
+
+
+def churn_rate(cursor, product_id):
+    """Geschlossene Listings pro Stunde / aktueller Bestand (listing_lifetimes)."""
+    cursor.execute('''
+        SELECT COUNT(*) FROM listing_lifetimes
+        WHERE product_id = ? AND closed_at > datetime('now', ?)
+    ''', (product_id, f'-{VOLATILITY_WINDOW_H} hours'))
+    closed = cursor.fetchone()[0]
+    cursor.execute('SELECT total_listings FROM scrapes WHERE product_id = ? ORDER BY id DESC LIMIT 1',
+                   (product_id,))
+    row = cursor.fetchone()
+    if not row or not row[0]:
+        return None
+    return closed / VOLATILITY_WINDOW_H / row[0]
+
+
+def atl_gap_pct(cursor, product_id):
+    """Abstand des aktuellen Floors zum All-Time-Low in %."""
+    cursor.execute('''
+        SELECT (SELECT floor_price FROM scrapes WHERE product_id = ? ORDER BY scraped_ts DESC LIMIT 1),
+               (SELECT MIN(floor_price) FROM scrapes WHERE product_id = ? AND floor_price IS NOT NULL)
+    ''', (product_id, product_id))
+    floor, atl = cursor.fetchone()
+    if not floor or not atl:
+        return None
+    return (floor / atl - 1) * 100
+
+
+def seasonal_delta(cursor, product_id, now):
+    """Median-Abweichung des aktuellen Wochen-Slots (Ortszeit) oder None."""
+    from seasonality import SEASONALITY_MIN_SAMPLES
+    local = now.replace(tzinfo=timezone.utc).astimezone()
+    slot = int(local.strftime('%w')) * 24 + local.hour
+    cursor.execute('SELECT median_delta_pct FROM seasonality WHERE product_id = ? AND slot = ? AND n >= ?',
+                   (product_id, slot, SEASONALITY_MIN_SAMPLES))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def score_product(cursor, product_id, now):
+    """(score, signals) — je höher, desto öfter sollte gescrapet werden. Ruhig = 1."""
+    signals = {
+        'volatility_pct': volatility_pct(cursor, product_id),
+        'churn': churn_rate(cursor, product_id),
+        'atl_gap_pct': atl_gap_pct(cursor, product_id),
+        'seasonal_delta_pct': seasonal_delta(cursor, product_id, now),
+    }
+    score = 0.5
+    if signals['volatility_pct'] is not None:
+        score += min(signals['volatility_pct'] / VOLATILITY_REF_PCT, 3.0) * 0.5
+    if signals['churn'] is not None:
+        score += min(signals['churn'] / CHURN_REF, 3.0) * 0.5
+    if signals['atl_gap_pct'] is not None and signals['atl_gap_pct'] <= ATL_PROXIMITY_PCT:
+        score += ATL_BOOST
+    if signals['seasonal_delta_pct'] is not None and signals['seasonal_delta_pct'] < 0:
+        score += SEASONAL_BOOST
+    return score, signals
+
+
+def plan(cursor, now):
+    """
+    Wunsch-Intervalle aller Produkte, ans Budget angepasst.
+    Returns {product_id: (interval_min, score, signals)} und den Budget-Faktor.
+    """
+    wanted = {}
+    for pid in PRODUCTS:
+        score, signals = score_product(cursor, pid, now)
+        interval = min(max(BASE_INTERVAL_MIN / score, MIN_INTERVAL_MIN), MAX_INTERVAL_MIN)
+        wanted[pid] = (interval, score, signals)
+
+    demand = sum(60 / iv for iv, _, _ in wanted.values())
+    stretch = max(1.0, demand / SCHEDULER_BUDGET_PER_HOUR)
+    return {pid: (min(iv * stretch, MAX_INTERVAL_MIN), score, signals)
+            for pid, (iv, score, signals) in wanted.items()}, stretch
+
+
+def scrapes_last_hour(cursor):
+    cursor.execute("SELECT COUNT(*) FROM scrapes WHERE scraped_ts > CAST(strftime('%s', 'now', '-1 hour') AS INTEGER)")
+    return cursor.fetchone()[0]
+
+
+def due_products(cursor, now):
+    """Produkt-IDs, deren next_due_at erreicht ist (oder die noch nie geplant wurden)."""
+    cursor.execute('SELECT product_id, next_due_at FROM scrape_schedule')
+    due_at = dict(cursor.fetchall())
+    now_s = now.strftime(TS_FMT)
+    return [pid for pid in PRODUCTS if pid not in due_at or due_at[pid] <= now_s]
+
+
+def record(cursor, pid, now, interval, score, signals, stretch, used, action):
+    next_due = (now + timedelta(minutes=interval)).strftime(TS_FMT)
+    cursor.execute('''
+        INSERT OR REPLACE INTO scrape_schedule (product_id, next_due_at, interval_min, score, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (pid, next_due, round(interval, 1), round(score, 3), now.strftime(TS_FMT)))
+    cursor.execute('''
+        INSERT INTO schedule_decisions
+            (decided_at, product_id, action, interval_min, score, volatility_pct, churn, atl_gap_pct,
+             seasonal_delta_pct, budget_stretch, budget_used, next_due_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (now.strftime(TS_FMT), pid, action, round(interval, 1), round(score, 3),
+          signals['volatility_pct'], signals['churn'], signals['atl_gap_pct'],
+          signals['seasonal_delta_pct'], round(stretch, 3), used, next_due))
+
+
+def run_scraper(slug):
+    """scraper.py als eigener Prozess (Playwright-Lebenszyklus wie beim festen Takt)."""
+    try:
+        result = subprocess.run([sys.executable, str(BASE_DIR / 'scraper.py'), slug],
+                                cwd=BASE_DIR, timeout=SCRAPE_TIMEOUT_S)
+        return result.returncode == 0
+    except subprocess.TimeoutExpired:
+        print(f"⏱️  {slug}: Timeout nach {SCRAPE_TIMEOUT_S}s")
+        return False
+
+
+def tick(conn, dry_run=False):
+    cursor = conn.cursor()
+    now = datetime.utcnow()
+    intervals, stretch = plan(cursor, now)
+    used = scrapes_last_hour(cursor)
+    due = sorted(due_products(cursor, now), key=lambda pid: -intervals[pid][1])
+
+    if dry_run:
+        print(f"Budget: {used}/{SCHEDULER_BUDGET_PER_HOUR} Scrapes in der letzten Stunde, Streckung ×{stretch:.2f}")
+        for pid, (iv, score, sig) in sorted(intervals.items(), key=lambda x: x[1][0]):
+            mark = '⏰' if pid in due else '  '
+            vol = f"{sig['volatility_pct']:.2f}%" if sig['volatility_pct'] is not None else '—'
+            atl = f"{sig['atl_gap_pct']:.1f}%" if sig['atl_gap_pct'] is not None else '—'
+            print(f"{mark} {PRODUCTS[pid]['slug']:<16} alle {iv:>5.0f} min  Score {score:.2f}  Vol {vol:>6}  ATL +{atl}")
+        return 0
+
+    ran = 0
+    for pid in due:
+        iv, score, signals = intervals[pid]
+        if ran >= SCHEDULER_MAX_PER_TICK:
+            break
+        if used >= SCHEDULER_BUDGET_PER_HOUR:
+            # Nicht scrapen, nur einen Tick später erneut prüfen
+            record(cursor, pid, now, SCHEDULER_TICK_MIN, score, signals, stretch, used, 'budget')
+            conn.commit()
+            print(f"💸 {PRODUCTS[pid]['slug']}: Budget erschöpft ({used}/{SCHEDULER_BUDGET_PER_HOUR}), verschoben")
+            continue
+        slug = PRODUCTS[pid]['slug']
+        print(f"▶️  {slug}: Score {score:.2f}, nächstes Intervall {iv:.0f} min")
+        ok = run_scraper(slug)
+        record(cursor, pid, now, iv if ok else MIN_INTERVAL_MIN, score, signals, stretch, used,
+               'scraped' if ok else 'failed')
+        conn.commit()
+        used += 1
+        ran += 1
+    return 0
+
+
+def show_log(conn, limit):
+    rows = conn.execute('''
+        SELECT decided_at, product_id, action, interval_min, score, volatility_pct, atl_gap_pct, budget_used
+        FROM schedule_decisions ORDER BY id DESC LIMIT ?
+    ''', (limit,)).fetchall()
+    for at, pid, action, iv, score, vol, atl, used in rows:
+        slug = PRODUCTS.get(pid, {}).get('slug', pid)
+        vol_s = f'{vol:.2f}%' if vol is not None else '—'
+        atl_s = f'+{atl:.1f}%' if atl is not None else '—'
+        print(f"{at}  {slug:<16} {action:<8} {iv:>5.0f} min  Score {score:.2f}  Vol {vol_s:>6}  ATL {atl_s:>6}  Budget {used}")
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Adaptives Scrape-Scheduling')
+    ap.add_argument('--plan', action='store_true', help='Nur Plan anzeigen, nichts scrapen')
+    ap.add_argument('--log', type=int, nargs='?', const=30, help='Letzte N Entscheidungen anzeigen')
+    args = ap.parse_args()
+
+    from migrate import ensure_schema
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        if args.log:
+            return show_log(conn, args.log)
+        if args.plan:
+            return tick(conn, dry_run=True)
+
+        with open(LOCK_PATH, 'w') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                print("⏳ Vorheriger Tick läuft noch — übersprungen")
+                return 0
+            return tick(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
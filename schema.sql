@@ -22,14 +22,32 @@ CREATE TABLE IF NOT EXISTS scrapes (
     avg_30d REAL,
     avg_7d REAL,
     avg_1d REAL,
-    filters_applied TEXT
+    filters_applied TEXT,
+    mode TEXT DEFAULT 'full',      -- 'quick' = Quick-Check ohne Listings, Floor vom letzten Full-Scrape
+    scraped_ts INTEGER             -- scraped_at als Unix-Sekunden (UTC), per Trigger gesetzt; für Zeitbereiche
+);
+
+-- scraped_ts beim Insert aus scraped_at ableiten (Scraper setzt nur scraped_at per Default)
+CREATE TRIGGER IF NOT EXISTS trg_scrapes_ts AFTER INSERT ON scrapes
+WHEN NEW.scraped_ts IS NULL
+BEGIN
+    UPDATE scrapes SET scraped_ts = CAST(strftime('%s', NEW.scraped_at) AS INTEGER) WHERE id = NEW.id;
+END;
+
+-- Seller-Dimension (Name einmalig, listings referenziert per seller_id)
+CREATE TABLE IF NOT EXISTS sellers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    flags INTEGER NOT NULL DEFAULT 0
 );
 
 -- Einzelne Listings
 CREATE TABLE IF NOT EXISTS listings (
     id INTEGER PRIMARY KEY,
     scrape_id INTEGER,
-    seller TEXT NOT NULL,
+    seller_id INTEGER REFERENCES sellers(id),
     seller_rating INTEGER,
     seller_type TEXT,
     price REAL NOT NULL,
@@ -40,6 +58,26 @@ CREATE TABLE IF NOT EXISTS listings (
     FOREIGN KEY (scrape_id) REFERENCES scrapes(id)
 );
 
+-- Quarantäne: vom Ausreißer-Detektor (outliers.py) aussortierte Listings, zählen nicht für den Floor
+CREATE TABLE IF NOT EXISTS listing_quarantine (
+    id INTEGER PRIMARY KEY,
+    scrape_id INTEGER,
+    seller_id INTEGER REFERENCES sellers(id),
+    price REAL NOT NULL,
+    quantity INTEGER,
+    location TEXT,
+    reason TEXT NOT NULL,
+    FOREIGN KEY (scrape_id) REFERENCES scrapes(id)
+);
+
+-- Von retention.py ausgedünnte Scrapes (nur noch die günstigsten DE-Listings) — Rollups,
+-- Floor und Lifetimes dieser Scrapes werden nicht mehr aus den Listings neu berechnet
+CREATE TABLE IF NOT EXISTS listings_thinned (
+    scrape_id INTEGER PRIMARY KEY,
+    kept INTEGER,                 -- verbliebene Listings
+    thinned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Verkaufsverdacht
 CREATE TABLE IF NOT EXISTS suspected_sales (
     id INTEGER PRIMARY KEY,
@@ -48,10 +86,103 @@ CREATE TABLE IF NOT EXISTS suspected_sales (
     seller TEXT,
     price REAL,
     confidence TEXT,
-    reasoning TEXT
+    reasoning TEXT,
+    quantity INTEGER DEFAULT 1,   -- geschätzt verkaufte Einheiten (sales_diff.py)
+    seller_id INTEGER REFERENCES sellers(id)
 );
 
--- Preisverteilung (für Analysen)
+-- Verkaufs-Rollup pro Produkt + UTC-Tag (sales_daily.py, inkrementell vom Scraper gepflegt; nur high/medium)
+CREATE TABLE IF NOT EXISTS sales_daily (
+    product_id INTEGER NOT NULL,
+    day TEXT NOT NULL,            -- 'YYYY-MM-DD'
+    units INTEGER NOT NULL,
+    revenue REAL NOT NULL,        -- Σ price × quantity
+    min_price REAL,
+    max_price REAL,
+    median_price REAL,
+    avg_listings REAL,            -- Ø scrapes.total_listings des Tages
+    turnover REAL,                -- units / avg_listings
+    PRIMARY KEY (product_id, day)
+) WITHOUT ROWID;
+
+-- Lebensdauer einzelner Listings (Produkt, Seller, Preis) über Scrapes hinweg (lifetimes.py)
+-- closed_at = erster Scrape ohne das Listing, NULL = noch offen
+CREATE TABLE IF NOT EXISTS listing_lifetimes (
+    id INTEGER PRIMARY KEY,
+    product_id INTEGER NOT NULL,
+    seller_id INTEGER NOT NULL,
+    price REAL NOT NULL,
+    opened_at TIMESTAMP NOT NULL,
+    opened_scrape_id INTEGER NOT NULL,
+    last_seen_at TIMESTAMP NOT NULL,
+    closed_at TIMESTAMP,
+    distance_pct REAL,            -- % über Floor beim Erscheinen
+    quantity INTEGER              -- zuletzt gesehene Menge
+);
+
+-- Fortschritt von lifetimes.py pro Produkt
+CREATE TABLE IF NOT EXISTS lifetime_cursor (
+    product_id INTEGER PRIMARY KEY,
+    last_scrape_id INTEGER NOT NULL
+);
+
+-- Wochenprofil: Floor-Abweichung vom Tagesmittel pro Stunden-Slot (seasonality.py, Ortszeit, So 00:00 = 0)
+CREATE TABLE IF NOT EXISTS seasonality (
+    product_id INTEGER NOT NULL,
+    slot INTEGER NOT NULL,        -- 0..167 = Wochentag × 24 + Stunde
+    samples TEXT NOT NULL,        -- JSON-Liste der Tages-Deltas in %
+    median_delta_pct REAL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (product_id, slot)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS seasonality_cursor (
+    product_id INTEGER PRIMARY KEY,
+    last_day TEXT NOT NULL        -- letzter übernommener Tag (Ortszeit)
+);
+
+-- Adaptives Scheduling (scheduler.py): aktueller Plan + Audit-Log jeder Entscheidung
+CREATE TABLE IF NOT EXISTS scrape_schedule (
+    product_id INTEGER PRIMARY KEY,
+    next_due_at TIMESTAMP NOT NULL,
+    interval_min REAL NOT NULL,
+    score REAL,
+    updated_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS schedule_decisions (
+    id INTEGER PRIMARY KEY,
+    decided_at TIMESTAMP NOT NULL,
+    product_id INTEGER NOT NULL,
+    action TEXT NOT NULL,         -- scraped | failed | budget
+    interval_min REAL,
+    score REAL,
+    volatility_pct REAL,
+    churn REAL,
+    atl_gap_pct REAL,
+    seasonal_delta_pct REAL,
+    budget_stretch REAL,          -- Faktor, um den alle Intervalle wegen Budget gestreckt wurden
+    budget_used INTEGER,          -- Scrapes in der letzten Stunde vor der Entscheidung
+    next_due_at TIMESTAMP
+);
+
+-- Quick-Check (scraper.py): Fingerprint der günstigsten Listings der ersten Seite beim letzten Full-Scrape
+CREATE TABLE IF NOT EXISTS scrape_fingerprints (
+    product_id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    full_scrape_id INTEGER NOT NULL,
+    quick_runs INTEGER NOT NULL DEFAULT 0,   -- Quick-Scrapes seit dem letzten Full-Scrape
+    updated_at TIMESTAMP
+);
+
+-- Letzter Listing-Stand pro Produkt für den Verkaufs-Diff (zlib-JSON [[seller_id, price, qty], ...], nur DE)
+CREATE TABLE IF NOT EXISTS listing_state (
+    product_id INTEGER PRIMARY KEY,
+    scrape_id INTEGER NOT NULL,
+    state BLOB NOT NULL
+);
+
+-- Preisverteilung (für Analysen) — Histogramm pro Scrape, Buckets in % über Floor
 CREATE TABLE IF NOT EXISTS price_distribution (
     id INTEGER PRIMARY KEY,
     scrape_id INTEGER,
@@ -62,12 +193,107 @@ CREATE TABLE IF NOT EXISTS price_distribution (
     avg_price REAL
 );
 
+-- Per-Scrape-Statistiken (beim Scrape aus den geparsten Listings berechnet, nur DE)
+CREATE TABLE IF NOT EXISTS scrape_stats (
+    scrape_id INTEGER PRIMARY KEY,
+    de_count INTEGER,
+    mean_price REAL,
+    median_price REAL,
+    p10_price REAL,
+    p25_price REAL,
+    p75_price REAL,
+    max_price REAL,
+    total_quantity INTEGER,
+    distinct_sellers INTEGER,
+    non_de_count INTEGER,
+    FOREIGN KEY (scrape_id) REFERENCES scrapes(id)
+);
+
+-- Alternative Floor-Schätzer pro Scrape (nur DE, aus den geparsten Listings, siehe scrape_stats.compute_floors)
+-- Reports/Alerts wählen per CARDMARKET_FLOOR_ESTIMATOR (series.py), scrapes.floor_price bleibt das rohe Minimum
+CREATE TABLE IF NOT EXISTS scrape_floors (
+    scrape_id INTEGER PRIMARY KEY,
+    floor_min REAL,       -- günstigstes Listing (= scrapes.floor_price)
+    floor_kth REAL,       -- k-t günstigstes Listing (FLOOR_KTH)
+    floor_qty REAL,       -- Ø Stückpreis für FLOOR_QTY_UNITS Einheiten (mengengewichtet)
+    floor_trimmed REAL,   -- günstigstes Listing ohne jedes Ausreißer-Signal
+    floor_trusted REAL,   -- günstigstes Listing von Sellern mit ≥ FLOOR_TRUSTED_DAYS Historie
+    FOREIGN KEY (scrape_id) REFERENCES scrapes(id)
+);
+
+-- Order-Book-Tiefe: günstigste Gesamtkosten für N Einheiten (nur DE, pro Scrape)
+CREATE TABLE IF NOT EXISTS scrape_depth (
+    scrape_id INTEGER NOT NULL,
+    units INTEGER NOT NULL,
+    total_cost REAL NOT NULL,
+    marginal_price REAL NOT NULL,
+    PRIMARY KEY (scrape_id, units),
+    FOREIGN KEY (scrape_id) REFERENCES scrapes(id)
+) WITHOUT ROWID;
+
+-- Seller-Blocklist mit Gültigkeitszeitraum (blocklist.py); valid_until NULL = unbefristet
+CREATE TABLE IF NOT EXISTS seller_blocklist (
+    id INTEGER PRIMARY KEY,
+    seller_name TEXT NOT NULL,
+    valid_from TIMESTAMP NOT NULL,
+    valid_until TIMESTAMP,
+    reason TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- DotGG-Sammlung (collection_sync.py schreibt, collection_alerts.py liest) — nur Singles, nicht die Produkt-Floors
+CREATE TABLE IF NOT EXISTS user_collection (
+    card_id TEXT PRIMARY KEY,
+    standard_count INTEGER DEFAULT 0,
+    foil_count INTEGER DEFAULT 0,
+    trade_count INTEGER DEFAULT 0,
+    wish_count INTEGER DEFAULT 0
+);
+
+-- card_prices und card_alerts_sent werden in der Live-DB außerhalb dieses Repos angelegt; die
+-- Definitionen hier decken nur die Spalten ab, die collection_sync.py/collection_alerts.py
+-- schreiben und lesen (für frische und synthetische DBs). Keine id-Spalte annehmen — Queries nehmen rowid.
+
+-- Preis-Snapshot pro Sync-Lauf (append-only)
+CREATE TABLE IF NOT EXISTS card_prices (
+    card_id TEXT NOT NULL,
+    card_name TEXT,
+    set_name TEXT,
+    rarity TEXT,
+    cm_price REAL,
+    cm_foil_price REAL,
+    cm_delta_7d REAL,
+    cm_delta_7d_foil REAL,
+    scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Dedup der Sammlungs-Alerts (24h Cooldown pro card_id + alert_type)
+CREATE TABLE IF NOT EXISTS card_alerts_sent (
+    card_id TEXT NOT NULL,
+    alert_type TEXT NOT NULL,
+    price_at_alert REAL,
+    sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Einmalige Daten-Migrationen (von migrate.py gepflegt)
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name TEXT PRIMARY KEY,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_listings_scrape ON listings(scrape_id);
-CREATE INDEX IF NOT EXISTS idx_listings_seller ON listings(seller);
+CREATE INDEX IF NOT EXISTS idx_listings_seller_id ON listings(seller_id);
 CREATE INDEX IF NOT EXISTS idx_listings_price ON listings(price);
-CREATE INDEX IF NOT EXISTS idx_scrapes_product_time ON scrapes(product_id, scraped_at);
+-- Covering: Floor/Listings über Zeitbereiche pro Produkt ohne Zugriff auf die Tabelle
+CREATE INDEX IF NOT EXISTS idx_scrapes_product_ts ON scrapes(product_id, scraped_ts, floor_price, total_listings);
 CREATE INDEX IF NOT EXISTS idx_sales_product ON suspected_sales(product_id, detected_at);
+CREATE INDEX IF NOT EXISTS idx_price_distribution_scrape ON price_distribution(scrape_id);
+CREATE INDEX IF NOT EXISTS idx_listing_quarantine_scrape ON listing_quarantine(scrape_id);
+CREATE INDEX IF NOT EXISTS idx_listing_lifetimes_open ON listing_lifetimes(product_id, closed_at);
+CREATE INDEX IF NOT EXISTS idx_listing_lifetimes_opened ON listing_lifetimes(product_id, opened_at);
+CREATE INDEX IF NOT EXISTS idx_card_prices_card ON card_prices(card_id, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_card_alerts_sent ON card_alerts_sent(card_id, alert_type, sent_at);
 
 -- Standard-Produkt einfügen
 INSERT OR IGNORE INTO products (id, name, category, game, url_path) 
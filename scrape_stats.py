@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+scrape_stats.py — Per-Scrape-Rollups aus den geparsten Listings.
+
+Der Scraper berechnet direkt aus der In-Memory-Listing-Liste und schreibt im
+selben Commit wie die Listings:
+- `scrape_stats`: Count, Ø, Median, Perzentile, Max, Menge, Seller (nur DE)
+- `price_distribution`: Preis-Histogramm relativ zum Floor (Buckets in % über Floor)
+- `scrape_depth`: günstigste Gesamtkosten für 1..DEPTH_MAX_UNITS Einheiten (Order-Book-Tiefe)
+- `scrape_floors`: robuste Floor-Schätzer (k-t günstigstes, mengengewichtet, getrimmt, etablierte Seller)
+
+Charts und Analysen lesen dann wenige Zeilen pro Scrape statt alle Listings.
+
+Für Scrapes von vor der Einführung gibt es den Backfill:
+
+Usage: python3 scrape_stats.py backfill [product-slug]
+"""
+
+import os
+import sys
+from itertools import groupby
+
+from archive import listings_source
+from blocklist import blocked_sql
+from db import connect
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+
+DEFAULT_LOCATION = 'Germany'
+
+# Histogramm-Kanten in % über Floor; letzter Bucket ist nach oben offen.
+# Pro Produkt überschreibbar via products.py → 'distribution_edges'.
+DISTRIBUTION_EDGES = (0, 2, 5, 10, 20, 50)
+
+# Tiefenkurve wird für 1..DEPTH_MAX_UNITS Einheiten vorberechnet (depth.py fragt darauf ab)
+DEPTH_MAX_UNITS = 10
+
+# Floor-Schätzer (scrape_floors); Auswahl in Reports/Alerts über series.FLOOR_ESTIMATOR
+FLOOR_KTH = 3             # k-t günstigstes DE-Listing
+FLOOR_QTY_UNITS = 3       # Ø Stückpreis, um so viele Einheiten zu kaufen
+FLOOR_TRUSTED_DAYS = 7    # Seller zählt als etabliert, wenn seit ≥ so vielen Tagen bekannt
+
+FLOOR_COLUMNS = ('floor_min', 'floor_kth', 'floor_qty', 'floor_trimmed', 'floor_trusted')
+
+STATS_COLUMNS = (
+    'de_count', 'mean_price', 'median_price', 'p10_price', 'p25_price',
+    'p75_price', 'max_price', 'total_quantity', 'distinct_sellers', 'non_de_count',
+)
+
+
+def get_db():
+    return connect(DB_PATH)
+
+
+def percentile(sorted_values, q):
+    """Perzentil (0..1) mit linearer Interpolation; sorted_values muss sortiert sein."""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def compute_stats(listings, required_location=DEFAULT_LOCATION):
+    """Stats-Dict aus einer Liste von Listing-Dicts (seller, price, quantity, location)."""
+    de = [l for l in listings if l['location'] == required_location]
+    prices = sorted(l['price'] for l in de)
+    return {
+        'de_count': len(de),
+        'mean_price': sum(prices) / len(prices) if prices else None,
+        'median_price': percentile(prices, 0.5),
+        'p10_price': percentile(prices, 0.10),
+        'p25_price': percentile(prices, 0.25),
+        'p75_price': percentile(prices, 0.75),
+        'max_price': prices[-1] if prices else None,
+        'total_quantity': sum(l['quantity'] or 0 for l in de),
+        'distinct_sellers': len({l['seller'] for l in de}),
+        'non_de_count': len(listings) - len(de),
+    }
+
+
+def save_stats(cursor, scrape_id, stats):
+    """Schreibt (oder ersetzt) die Stats-Zeile eines Scrapes. Kein Commit."""
+    cols = ', '.join(STATS_COLUMNS)
+    marks = ', '.join('?' for _ in STATS_COLUMNS)
+    cursor.execute(
+        f'INSERT OR REPLACE INTO scrape_stats (scrape_id, {cols}) VALUES (?, {marks})',
+        (scrape_id, *(stats[c] for c in STATS_COLUMNS)),
+    )
+
+
+def distribution_edges(product_id):
+    """Histogramm-Kanten für ein Produkt (Override aus products.py oder Default)."""
+    from products import get
+    cfg = get(product_id) or {}
+    return tuple(cfg.get('distribution_edges', DISTRIBUTION_EDGES))
+
+
+def compute_distribution(listings, required_location=DEFAULT_LOCATION, edges=DISTRIBUTION_EDGES):
+    """
+    Preis-Histogramm der DE-Listings relativ zum Floor.
+
+    Returns Liste von Dicts (range_label, min_price, max_price, listing_count, avg_price),
+    ein Eintrag pro Bucket — auch leere, damit jede Verteilung gleich aussieht.
+    min_price/max_price sind die Bucket-Grenzen in €, max_price=None beim offenen Bucket.
+    """
+    prices = sorted(l['price'] for l in listings if l['location'] == required_location)
+    if not prices:
+        return []
+    floor = prices[0]
+
+    buckets = []
+    for i, lo_pct in enumerate(edges):
+        hi_pct = edges[i + 1] if i + 1 < len(edges) else None
+        lo = floor * (1 + lo_pct / 100)
+        hi = floor * (1 + hi_pct / 100) if hi_pct is not None else None
+        # Erster Bucket beginnt immer beim Floor selbst
+        in_bucket = [p for p in prices if (i == 0 or p >= lo) and (hi is None or p < hi)]
+        label = f'+{lo_pct}–{hi_pct}%' if hi_pct is not None else f'+{lo_pct}%+'
+        buckets.append({
+            'range_label': label,
+            'min_price': round(lo, 2),
+            'max_price': round(hi, 2) if hi is not None else None,
+            'listing_count': len(in_bucket),
+            'avg_price': sum(in_bucket) / len(in_bucket) if in_bucket else None,
+        })
+    return buckets
+
+
+def save_distribution(cursor, scrape_id, buckets):
+    """Ersetzt das Histogramm eines Scrapes. Kein Commit."""
+    cursor.execute('DELETE FROM price_distribution WHERE scrape_id = ?', (scrape_id,))
+    cursor.executemany('''
+        INSERT INTO price_distribution (scrape_id, range_label, min_price, max_price, listing_count, avg_price)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(scrape_id, b['range_label'], b['min_price'], b['max_price'], b['listing_count'], b['avg_price'])
+          for b in buckets])
+
+
+def compute_depth(listings, required_location=DEFAULT_LOCATION, max_units=DEPTH_MAX_UNITS):
+    """
+    Kumulierte Tiefenkurve: für n = 1..max_units die günstigsten Gesamtkosten,
+    um n Einheiten bei DE-Sellern zu kaufen (Listings nach Preis, Menge beachtet).
+
+    Returns Liste von (units, total_cost, marginal_price). Reicht das Angebot
+    nicht für max_units, endet die Liste beim verfügbaren Maximum.
+    """
+    de = sorted((l['price'], l['quantity'] or 1) for l in listings if l['location'] == required_location)
+    curve = []
+    total = 0.0
+    for price, qty in de:
+        for _ in range(qty):
+            if len(curve) >= max_units:
+                return curve
+            total += price
+            curve.append((len(curve) + 1, round(total, 2), price))
+    return curve
+
+
+def save_depth(cursor, scrape_id, curve):
+    """Ersetzt die Tiefenkurve eines Scrapes. Kein Commit."""
+    cursor.execute('DELETE FROM scrape_depth WHERE scrape_id = ?', (scrape_id,))
+    cursor.executemany(
+        'INSERT INTO scrape_depth (scrape_id, units, total_cost, marginal_price) VALUES (?, ?, ?, ?)',
+        [(scrape_id, units, cost, marginal) for units, cost, marginal in curve],
+    )
+
+
+def compute_floors(listings, required_location=DEFAULT_LOCATION):
+    """
+    Alle Floor-Schätzer aus einem Sort der DE-Listings.
+
+    'trusted' im Listing-Dict markiert Seller mit genug Historie (Scraper: sellers.established,
+    Backfill: SQL in iter_scrape_listings). Schätzer ohne ausreichende Daten → None.
+    """
+    from outliers import robust_center, score_listing
+
+    de = sorted((l for l in listings if l['location'] == required_location), key=lambda l: l['price'])
+    if not de:
+        return dict.fromkeys(FLOOR_COLUMNS)
+    prices = [l['price'] for l in de]
+    median, sigma = robust_center(prices)
+
+    units, cost = 0, 0.0
+    for l in de:
+        take = min(l['quantity'] or 1, FLOOR_QTY_UNITS - units)
+        units += take
+        cost += take * l['price']
+        if units >= FLOOR_QTY_UNITS:
+            break
+
+    return {
+        'floor_min': prices[0],
+        'floor_kth': prices[FLOOR_KTH - 1] if len(prices) >= FLOOR_KTH else None,
+        'floor_qty': round(cost / units, 2) if units >= FLOOR_QTY_UNITS else None,
+        'floor_trimmed': next((l['price'] for l in de
+                               if score_listing(l, median, sigma, median)[0] == 0), None),
+        'floor_trusted': next((l['price'] for l in de if l.get('trusted')), None),
+    }
+
+
+def save_floors(cursor, scrape_id, floors):
+    """Schreibt (oder ersetzt) die Floor-Schätzer eines Scrapes. Kein Commit."""
+    cols = ', '.join(FLOOR_COLUMNS)
+    marks = ', '.join('?' for _ in FLOOR_COLUMNS)
+    cursor.execute(
+        f'INSERT OR REPLACE INTO scrape_floors (scrape_id, {cols}) VALUES (?, {marks})',
+        (scrape_id, *(floors[c] for c in FLOOR_COLUMNS)),
+    )
+
+
+def save_rollups(cursor, scrape_id, product_id, listings, required_location=DEFAULT_LOCATION):
+    """Alle Per-Scrape-Rollups eines Scrapes schreiben. Kein Commit."""
+    save_stats(cursor, scrape_id, compute_stats(listings, required_location))
+    save_distribution(cursor, scrape_id,
+                      compute_distribution(listings, required_location, distribution_edges(product_id)))
+    save_depth(cursor, scrape_id, compute_depth(listings, required_location))
+    save_floors(cursor, scrape_id, compute_floors(listings, required_location))
+
+
+def iter_scrape_listings(cursor, scrape_ids, source='listings'):
+    """
+    Yieldet (scrape_id, product_id, [listing-dicts]) für die gegebenen Scrapes, ein Scan über listings.
+    'seller' ist hier die seller_id — für Stats/Histogramm/Tiefe reicht die Identität.
+    'trusted' kommt aus sellers.first_seen relativ zum Scrape-Zeitpunkt.
+    Listings von zum Scrape-Zeitpunkt geblockten Sellern fallen raus (wie beim Scrape selbst).
+    source: 'listings' oder 'listings_all' (inkl. Archive, siehe archive.listings_source).
+    """
+    if not scrape_ids:
+        return
+    cursor.execute('CREATE TEMP TABLE IF NOT EXISTS _stats_ids (id INTEGER PRIMARY KEY)')
+    cursor.execute('DELETE FROM _stats_ids')
+    cursor.executemany('INSERT INTO _stats_ids (id) VALUES (?)', ((sid,) for sid in scrape_ids))
+    cursor.execute(f'''
+        SELECT l.scrape_id, s.product_id, l.seller_id, l.price, l.quantity, l.location,
+               se.first_seen <= datetime(s.scraped_at, ?) AS trusted
+        FROM {source} l
+        JOIN _stats_ids t ON t.id = l.scrape_id
+        JOIN scrapes s ON s.id = l.scrape_id
+        LEFT JOIN sellers se ON se.id = l.seller_id
+        WHERE NOT {blocked_sql('l', 's')}
+        ORDER BY l.scrape_id
+    ''', (f'-{FLOOR_TRUSTED_DAYS} days',))
+    rows = cursor.fetchall()
+    for (scrape_id, product_id), group in groupby(rows, key=lambda r: (r[0], r[1])):
+        yield scrape_id, product_id, [
+            {'seller': r[2], 'price': r[3], 'quantity': r[4], 'location': r[5], 'trusted': bool(r[6])}
+            for r in group
+        ]
+
+
+def rebuild(conn, scrape_ids, batch_size=500):
+    """Rollups der gegebenen Scrapes komplett neu berechnen (z.B. nach Blocklist-Änderung)."""
+    source = listings_source(conn)
+    cursor = conn.cursor()
+    for i in range(0, len(scrape_ids), batch_size):
+        batch = scrape_ids[i:i + batch_size]
+        marks = ', '.join('?' for _ in batch)
+        for table in ('scrape_stats', 'price_distribution', 'scrape_depth', 'scrape_floors'):
+            cursor.execute(f'DELETE FROM {table} WHERE scrape_id IN ({marks})', batch)
+        for scrape_id, pid, listings in iter_scrape_listings(cursor, batch, source):
+            save_rollups(cursor, scrape_id, pid, listings)
+        conn.commit()
+
+
+def backfill(conn, product_id=None, batch_size=500):
+    """Berechnet Rollups für alle Full-Scrapes, denen Stats, Histogramm, Tiefe oder Floors fehlen. Returns Anzahl."""
+    source = listings_source(conn)
+    cursor = conn.cursor()
+    sql = '''
+        SELECT s.id FROM scrapes s
+        WHERE s.mode = 'full'
+          AND NOT EXISTS (SELECT 1 FROM listings_thinned t WHERE t.scrape_id = s.id)
+          AND (NOT EXISTS (SELECT 1 FROM scrape_stats st WHERE st.scrape_id = s.id)
+               OR NOT EXISTS (SELECT 1 FROM price_distribution pd WHERE pd.scrape_id = s.id)
+               OR NOT EXISTS (SELECT 1 FROM scrape_depth d WHERE d.scrape_id = s.id)
+               OR NOT EXISTS (SELECT 1 FROM scrape_floors f WHERE f.scrape_id = s.id))
+    '''
+    params = ()
+    if product_id is not None:
+        sql += ' AND s.product_id = ?'
+        params = (product_id,)
+    cursor.execute(sql + ' ORDER BY s.id', params)
+    missing = [r[0] for r in cursor.fetchall()]
+
+    done = 0
+    for i in range(0, len(missing), batch_size):
+        batch = missing[i:i + batch_size]
+        for scrape_id, pid, listings in iter_scrape_listings(cursor, batch, source):
+            save_rollups(cursor, scrape_id, pid, listings)
+            done += 1
+        conn.commit()
+    return done
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] != 'backfill':
+        print("Usage: python3 scrape_stats.py backfill [product-slug]")
+        return 1
+
+    product_id = None
+    if len(sys.argv) > 2:
+        from products import by_slug
+        product_id, _ = by_slug(sys.argv[2])
+        if product_id is None:
+            print(f"❌ Unknown product: {sys.argv[2]}")
+            return 1
+
+    from migrate import ensure_schema
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        n = backfill(conn, product_id)
+    finally:
+        conn.close()
+
+    print(f"✅ Rollups für {n} Scrapes nachberechnet")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
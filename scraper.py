@@ -1,33 +1,66 @@
 #!/usr/bin/env python3
 """
 Cardmarket Unified Scraper - All Riftbound products in one file.
-Usage: python3 scraper.py <product>
+Usage: python3 scraper.py <product> [--full]
        product: origins | spiritforged | arcane
+       --full: Quick-Check überspringen, immer alle Listings laden
 """
 
-import sqlite3
 import os
 import re
+import sqlite3
 import sys
 import asyncio
 import json
+import time
+import hashlib
 import urllib.request
 import urllib.parse
 from datetime import datetime
 from pathlib import Path
 from playwright.async_api import async_playwright
 
+from db import connect
+from migrate import ensure_schema
+from scrape_stats import save_rollups, FLOOR_TRUSTED_DAYS
+from sellers import resolve_ids, touch as touch_sellers, established, name_of as seller_name
+from blocklist import active_names as active_blocklist
+from outliers import detect as detect_outliers, reference_price
+from sales_diff import detect_sales, state_entries
+from sales_daily import record as record_sales_daily
+from lifetimes import update_product as update_lifetimes
+import tsstore
+
 # === PRICE ALERT CONFIG ===
 # Alert threshold: listings this % below floor trigger an alert
 PRICE_ALERT_THRESHOLD_PCT = 5  # Alert if listing is >=5% below current floor
 # ===========================
 
+# === QUICK-CHECK ===
+# Stufe 1 lädt nur die erste Seite und vergleicht einen Fingerprint der günstigsten
+# QUICK_CHECK_ROWS Listings mit dem letzten Full-Scrape. Unverändert → Scrape-Zeile
+# mit mode='quick' (Floor übernommen, keine Listings). Spätestens jeder
+# FULL_SCRAPE_EVERY-te Lauf ist voll. Abschalten: CARDMARKET_QUICK_CHECK=0 oder --full.
+QUICK_CHECK = os.getenv('CARDMARKET_QUICK_CHECK', '1') != '0'
+QUICK_CHECK_ROWS = 10
+FULL_SCRAPE_EVERY = 4
+# ===========================
+
+# === BROWSER-STATE ===
+# Cookies/Consent/Cloudflare-Clearance überleben zwischen Läufen in .browser/storage_state.json
+# (älter als BROWSER_STATE_MAX_AGE_H → verworfen). Mit CARDMARKET_BROWSER_PROFILE=<dir> läuft
+# Chromium stattdessen mit persistentem Profil — dann bleibt auch der HTTP-Cache erhalten.
+# Bei Fehlern wird der State gelöscht und der Retry startet mit frischem Context.
+BROWSER_STATE_DIR = Path(__file__).resolve().parent / '.browser'
+BROWSER_STATE_PATH = BROWSER_STATE_DIR / 'storage_state.json'
+BROWSER_STATE_MAX_AGE_H = 24
+BROWSER_PROFILE_DIR = os.getenv('CARDMARKET_BROWSER_PROFILE')
+# ===========================
+
 # === SELLER BLOCKLIST ===
-# Seller mit bekannt merkwürdigen/irreführenden Listings
-BLOCKED_SELLERS = {
-    'WHITEBEARD23',  # Placeholder-Listings (111.11 / 333.33 / 555.55€, x341) — seit 19.02.2026 aktiv
-    'Kaiju-Cards',   # Fehlerhafte 1€ Listings für Origins Booster Box — seit 11.06.2026 aktiv
-}
+# Seller mit bekannt merkwürdigen/irreführenden Listings.
+# Quelle: Tabelle seller_blocklist (pflegen via blocklist.py), wird in main() geladen.
+BLOCKED_SELLERS = set()
 # ========================
 
 
@@ -133,19 +166,184 @@ async def extract_location(row):
     return 'Unknown'
 
 
-async def scrape_product_with_retry(product_key: str, max_retries: int = 1):
+BROWSER_ARGS = ['--disable-blink-features=AutomationControlled']
+CONTEXT_OPTIONS = {
+    'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'viewport': {'width': 1920, 'height': 2000},
+    'locale': 'de-DE',
+    'timezone_id': 'Europe/Berlin',
+}
+
+
+def reset_browser_state():
+    """Gespeicherten Storage-State verwerfen (Profil-Verzeichnis bleibt, das ist Opt-in)."""
+    if BROWSER_STATE_PATH.exists():
+        BROWSER_STATE_PATH.unlink()
+        print("🧹 Browser-State verworfen")
+
+
+def usable_browser_state():
+    """Pfad zum Storage-State, wenn vorhanden und jünger als BROWSER_STATE_MAX_AGE_H, sonst None."""
+    if not BROWSER_STATE_PATH.exists():
+        return None
+    age_h = (time.time() - BROWSER_STATE_PATH.stat().st_mtime) / 3600
+    if age_h > BROWSER_STATE_MAX_AGE_H:
+        print(f"⌛ Browser-State {age_h:.0f}h alt → frischer Context")
+        reset_browser_state()
+        return None
+    return str(BROWSER_STATE_PATH)
+
+
+async def open_context(p, clean=False):
+    """
+    (context, close) — persistentes Profil, gespeicherter State oder frischer Context.
+    clean=True erzwingt einen frischen Context ohne State/Profil (Retry nach Fehler).
+    """
+    if BROWSER_PROFILE_DIR and not clean:
+        context = await p.chromium.launch_persistent_context(
+            BROWSER_PROFILE_DIR, headless=True, args=BROWSER_ARGS, **CONTEXT_OPTIONS)
+        print(f"🗂️  Persistentes Profil: {BROWSER_PROFILE_DIR}")
+        return context, context.close
+
+    browser = await p.chromium.launch(headless=True, args=BROWSER_ARGS)
+    state = None if clean else usable_browser_state()
+    context = await browser.new_context(storage_state=state, **CONTEXT_OPTIONS)
+    if state:
+        print("🍪 Browser-State wiederverwendet")
+    return context, browser.close
+
+
+async def save_browser_state(context):
+    """Storage-State nach erfolgreichem Lauf sichern (nicht nötig mit persistentem Profil)."""
+    if BROWSER_PROFILE_DIR:
+        return
+    BROWSER_STATE_DIR.mkdir(exist_ok=True)
+    await context.storage_state(path=str(BROWSER_STATE_PATH))
+
+
+async def parse_rows(rows, verbose=True):
+    """Article-Rows → Listing-Dicts (seller, price, quantity, location); geblockte Seller fallen raus."""
+    listings = []
+    for row in rows:
+        try:
+            seller_elem = await row.query_selector('a[href*="/Users/"]')
+            seller = await seller_elem.text_content() if seller_elem else 'Unknown'
+            seller = seller.strip() if seller else 'Unknown'
+
+            price_elem = await row.query_selector('.price, .fw-bold')
+            price_text = await price_elem.text_content() if price_elem else '0 €'
+            match = re.search(r'([\d,]+)\s*€', price_text or '')
+            price = float(match.group(1).replace(',', '.')) if match else 0
+
+            qty_elem = await row.query_selector('.badge, .amount, .item-count')
+            qty_text = await qty_elem.text_content() if qty_elem else '1'
+            try:
+                qty = int(re.search(r'\d+', qty_text or '1').group())
+            except:
+                qty = 1
+
+            location = await extract_location(row)
+
+            if seller and seller != 'Unknown' and price > 0:
+                if seller in BLOCKED_SELLERS:
+                    if verbose:
+                        print(f"   🚫 Blocked: {seller} ({price:.2f}€ x{qty})")
+                    continue
+                listings.append({'seller': seller, 'price': price, 'quantity': qty, 'location': location})
+
+        except Exception:
+            continue
+    return listings
+
+
+def fingerprint(listings, n=QUICK_CHECK_ROWS):
+    """Hash über die günstigsten n (price, seller, quantity) — ändert sich, sobald sich unten im Markt was tut."""
+    cheapest = sorted((l['price'], l['seller'], l['quantity']) for l in listings)[:n]
+    return hashlib.sha1(json.dumps(cheapest).encode()).hexdigest()
+
+
+def load_fingerprint(product_id):
+    """(fingerprint, quick_runs) des letzten Full-Scrapes oder (None, 0)."""
+    conn = get_db()
+    try:
+        row = conn.execute('SELECT fingerprint, quick_runs FROM scrape_fingerprints WHERE product_id = ?',
+                           (product_id,)).fetchone()
+    finally:
+        conn.close()
+    return row if row else (None, 0)
+
+
+def save_quick_scrape(product_id, fp):
+    """
+    Quick-Check ohne Änderung: Scrape-Zeile (mode='quick') mit Floor/Count des letzten
+    Full-Scrapes, Floor-Schätzer übernommen, keine Listings. Returns Floor oder None.
+    """
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT id, floor_price, total_listings FROM scrapes
+        WHERE product_id = ? AND mode = 'full' ORDER BY id DESC LIMIT 1
+    ''', (product_id,))
+    prev = cursor.fetchone()
+    if not prev:
+        conn.close()
+        return None
+    prev_id, floor_price, total_listings = prev
+
+    cursor.execute('''
+        INSERT INTO scrapes (product_id, total_listings, floor_price, filters_applied, mode)
+        VALUES (?, ?, ?, 'sellerCountry=7&language=1', 'quick')
+    ''', (product_id, total_listings, floor_price))
+    scrape_id = cursor.lastrowid
+    cursor.execute('''
+        INSERT INTO scrape_floors (scrape_id, floor_min, floor_kth, floor_qty, floor_trimmed, floor_trusted)
+        SELECT ?, floor_min, floor_kth, floor_qty, floor_trimmed, floor_trusted
+        FROM scrape_floors WHERE scrape_id = ?
+    ''', (scrape_id, prev_id))
+    cursor.execute('''
+        UPDATE scrape_fingerprints SET quick_runs = quick_runs + 1, updated_at = CURRENT_TIMESTAMP
+        WHERE product_id = ? AND fingerprint = ?
+    ''', (product_id, fp))
+    conn.commit()
+    sync_floor_series(conn, product_id)
+    conn.close()
+    print(f"⚡ Quick-Check: unverändert → Scrape #{scrape_id} übernimmt Floor {floor_price:.2f}€ von #{prev_id}")
+    return floor_price
+
+
+def sync_floor_series(conn, product_id):
+    """Neue Scrapes an die Floor-Zeitreihe (tsdata/) anhängen — nach dem Commit, Fehler kosten nur einen Rebuild."""
+    try:
+        tsstore.sync(conn, product_id)
+    except (OSError, sqlite3.Error) as e:  # sync liest scrapes — z.B. 'database is locked'
+        print(f"⚠️  Floor-Zeitreihe nicht aktualisiert ({e}) — 'python3 tsstore.py rebuild'")
+
+
+def save_fingerprint(product_id, fp, scrape_id):
+    conn = get_db()
+    conn.execute('''
+        INSERT OR REPLACE INTO scrape_fingerprints (product_id, fingerprint, full_scrape_id, quick_runs, updated_at)
+        VALUES (?, ?, ?, 0, CURRENT_TIMESTAMP)
+    ''', (product_id, fp, scrape_id))
+    conn.commit()
+    conn.close()
+
+
+async def scrape_product_with_retry(product_key: str, max_retries: int = 1, force_full: bool = False):
     """Scraper mit Retry-Logik und detailliertem Error-Logging"""
     cfg = PRODUCTS[product_key]
     last_error = None
     
     for attempt in range(max_retries + 1):
         try:
-            result = await scrape_product(product_key, attempt_number=attempt)
+            result = await scrape_product(product_key, attempt_number=attempt, force_full=force_full,
+                                          clean_context=attempt > 0)
             if attempt > 0:
                 print(f"✅ Retry erfolgreich nach {attempt} Versuch(en)")
             return result
         except Exception as e:
             last_error = e
+            reset_browser_state()  # evtl. vergiftete Cookies/Challenge nicht wiederverwenden
             error_type = type(e).__name__
             error_msg = str(e)
             
@@ -176,8 +374,9 @@ async def scrape_product_with_retry(product_key: str, max_retries: int = 1):
     raise last_error
 
 
-async def scrape_product(product_key: str, attempt_number: int = 0):
-    """Scraper für ein Produkt"""
+async def scrape_product(product_key: str, attempt_number: int = 0, force_full: bool = False,
+                         clean_context: bool = False):
+    """Scraper für ein Produkt (zweistufig: Quick-Check der ersten Seite, bei Änderung voller Load)"""
     cfg = PRODUCTS[product_key]
     product_id = cfg['id']
     product_url = cfg['url']
@@ -189,18 +388,17 @@ async def scrape_product(product_key: str, attempt_number: int = 0):
     print(f"Required Location: {required_location}")
     print()
 
+    conn = get_db()
+    try:
+        reference = reference_price(conn.cursor(), product_id)
+    finally:
+        conn.close()
+
+    last_fp, quick_runs = load_fingerprint(product_id)
+    quick_allowed = QUICK_CHECK and not force_full and last_fp and quick_runs < FULL_SCRAPE_EVERY - 1
+
     async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=True,
-            args=['--disable-blink-features=AutomationControlled']
-        )
-
-        context = await browser.new_context(
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 2000},
-            locale='de-DE',
-            timezone_id='Europe/Berlin'
-        )
+        context, close_browser = await open_context(p, clean=clean_context)
 
         await context.add_init_script("""
             Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
@@ -217,9 +415,23 @@ async def scrape_product(product_key: str, attempt_number: int = 0):
             await page.wait_for_selector('.article-row', timeout=60000)
             await page.wait_for_timeout(3000)
 
-            initial_count = len(await page.query_selector_all('.article-row'))
+            initial_rows = await page.query_selector_all('.article-row')
+            initial_count = len(initial_rows)
             print(f"📦 Initiale Listings: {initial_count}")
 
+            # Stufe 1: Fingerprint der günstigsten Listings auf der ersten Seite
+            fp = fingerprint(await parse_rows(initial_rows, verbose=False))
+            if quick_allowed and fp == last_fp:
+                floor_price = save_quick_scrape(product_id, fp)
+                if floor_price is not None:
+                    await save_browser_state(context)
+                    await close_browser()
+                    return 0, floor_price
+            if last_fp and fp != last_fp:
+                print("🔄 Fingerprint geändert → voller Load")
+            elif last_fp:
+                print(f"🔁 Voller Load (alle {FULL_SCRAPE_EVERY} Läufe)")
+
             # Load-More Button
             load_more_selectors = [
                 'button:has-text("ZEIGE MEHR")',
@@ -279,46 +491,15 @@ async def scrape_product(product_key: str, attempt_number: int = 0):
             print(f"\n📊 GESAMT: {final_count} Listings geladen")
 
             # Extrahiere Listings MIT Location
-            all_listings = []
-            de_listings = []
-            non_de_listings = []
-
             rows = await page.query_selector_all('.article-row')
+            all_listings = await parse_rows(rows)
 
-            for row in rows:
-                try:
-                    seller_elem = await row.query_selector('a[href*="/Users/"]')
-                    seller = await seller_elem.text_content() if seller_elem else 'Unknown'
-                    seller = seller.strip() if seller else 'Unknown'
-
-                    price_elem = await row.query_selector('.price, .fw-bold')
-                    price_text = await price_elem.text_content() if price_elem else '0 €'
-                    match = re.search(r'([\d,]+)\s*€', price_text or '')
-                    price = float(match.group(1).replace(',', '.')) if match else 0
-
-                    qty_elem = await row.query_selector('.badge, .amount, .item-count')
-                    qty_text = await qty_elem.text_content() if qty_elem else '1'
-                    try:
-                        qty = int(re.search(r'\d+', qty_text or '1').group())
-                    except:
-                        qty = 1
-
-                    location = await extract_location(row)
-
-                    if seller and seller != 'Unknown' and price > 0:
-                        if seller in BLOCKED_SELLERS:
-                            print(f"   🚫 Blocked: {seller} ({price:.2f}€ x{qty})")
-                            continue
-                        listing = {'seller': seller, 'price': price, 'quantity': qty, 'location': location}
-                        all_listings.append(listing)
-
-                        if location == required_location:
-                            de_listings.append(listing)
-                        else:
-                            non_de_listings.append(listing)
-
-                except Exception:
-                    continue
+            # Ausreißer (Placeholder, Fehl-Listings) vor der Floor-Berechnung aussortieren
+            all_listings, quarantined = detect_outliers(all_listings, required_location, reference)
+            for l, reason in quarantined:
+                print(f"   🧪 Quarantäne: {l['seller']} ({l['price']:.2f}€ x{l['quantity']}) — {reason}")
+            de_listings = [l for l in all_listings if l['location'] == required_location]
+            non_de_listings = [l for l in all_listings if l['location'] != required_location]
 
             print(f"✅ Erfolgreich geparst: {len(all_listings)} Listings")
             print(f"   🇩🇪 Germany: {len(de_listings)}")
@@ -331,31 +512,33 @@ async def scrape_product(product_key: str, attempt_number: int = 0):
 
             if not de_listings:
                 print("❌ KEINE DEUTSCHEN LISTINGS GEFUNDEN!")
-                await browser.close()
+                await close_browser()
                 return 0, None
 
             floor_price = min(l['price'] for l in de_listings)
             print(f"\n💶 Floor-Price (nur DE): {floor_price:.2f}€")
 
-            await browser.close()
+            await save_browser_state(context)
+            await close_browser()
 
-            save_to_db(product_id, required_location, all_listings, floor_price, len(de_listings))
+            scrape_id = save_to_db(product_id, required_location, all_listings, floor_price, len(de_listings), quarantined)
+            save_fingerprint(product_id, fp, scrape_id)
             return len(all_listings), floor_price
 
         except Exception as e:
-            await browser.close()
+            await close_browser()
             print(f"❌ Fehler: {e}")
             raise
 
 
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute('PRAGMA busy_timeout = 5000')
+    conn = connect(DB_PATH)
+    ensure_schema(conn)
     return conn
 
 
-def save_to_db(product_id, required_location, listings, floor_price, de_count):
-    """Speichert in SQLite"""
+def save_to_db(product_id, required_location, listings, floor_price, de_count, quarantined=()):
+    """Speichert in SQLite (quarantined: [(listing, reason)] aus outliers.detect)"""
     conn = get_db()
     cursor = conn.cursor()
 
@@ -368,64 +551,68 @@ def save_to_db(product_id, required_location, listings, floor_price, de_count):
 
     scrape_id = cursor.lastrowid
 
+    seller_ids = resolve_ids(cursor, {l['seller'] for l in listings} | {l['seller'] for l, _ in quarantined})
+    touch_sellers(cursor, seller_ids.values())
     for listing in listings:
-        cursor.execute('''
-            INSERT INTO listings (scrape_id, seller, price, quantity, location, language, condition_notes)
-            VALUES (?, ?, ?, ?, ?, 'English', ?)
-        ''', (scrape_id, listing['seller'], listing['price'], listing['quantity'],
-              listing['location'], 'NON-DE' if listing['location'] != required_location else None))
+        listing['trusted'] = established(seller_ids[listing['seller']], FLOOR_TRUSTED_DAYS)
 
-    conn.commit()
+    cursor.executemany('''
+        INSERT INTO listings (scrape_id, seller_id, price, quantity, location, language, condition_notes)
+        VALUES (?, ?, ?, ?, ?, 'English', ?)
+    ''', [(scrape_id, seller_ids[listing['seller']], listing['price'], listing['quantity'],
+           listing['location'], 'NON-DE' if listing['location'] != required_location else None)
+          for listing in listings])
 
-    # Verkaufsverdacht prüfen (nur DE-Listings)
-    check_suspected_sales(cursor, product_id)
+    cursor.executemany('''
+        INSERT INTO listing_quarantine (scrape_id, seller_id, price, quantity, location, reason)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(scrape_id, seller_ids[l['seller']], l['price'], l['quantity'], l['location'], reason)
+          for l, reason in quarantined])
+
+    # Per-Scrape-Rollups (Stats, Histogramm, Tiefe, Floor-Schätzer) aus der In-Memory-Liste (gleicher Commit wie die Listings)
+    save_rollups(cursor, scrape_id, product_id, listings, required_location)
+
+    # Verkaufsverdacht: Diff gegen den Listing-Stand des vorherigen Scrapes (nur DE-Listings)
+    check_suspected_sales(cursor, product_id, scrape_id, state_entries(listings, seller_ids, required_location))
+
+    conn.commit()
 
     # Schnäppchen-Alert: neue Listings deutlich unter Floor
     check_price_alerts(cursor, product_id, scrape_id, floor_price)
 
     conn.commit()
+
+    # Listing-Lebensdauern inkrementell nachziehen (nur der neue Scrape) — der Scrape ist
+    # schon committed, ein Fehler hier darf keinen Retry auslösen; lifetime_cursor holt nach
+    try:
+        update_lifetimes(conn, product_id)
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"⚠️  Lifetimes nicht aktualisiert ({e}) — holt der nächste Lauf nach")
+    sync_floor_series(conn, product_id)
     conn.close()
 
     if non_de:
         print(f"⚠️  {len(non_de)} non-DE Listings gespeichert (markiert)")
+    if quarantined:
+        print(f"🧪 {len(quarantined)} Listings in Quarantäne (nicht im Floor)")
     print(f"✅ Gespeichert: Scrape #{scrape_id} ({de_count} DE Listings)")
+    return scrape_id
 
 
-def check_suspected_sales(cursor, product_id):
-    """Prüft auf fehlende Seller (Verkaufsverdacht) - nur DE Listings!"""
-    cursor.execute('SELECT id FROM scrapes WHERE product_id = ? ORDER BY id DESC LIMIT 2', (product_id,))
-    scrapes = cursor.fetchall()
-
-    if len(scrapes) < 2:
-        print("ℹ️ Nicht genug Historie für Verkaufsanalyse")
-        return
-
-    current_scrape = scrapes[0][0]
-    previous_scrape = scrapes[1][0]
+def check_suspected_sales(cursor, product_id, scrape_id, entries):
+    """Verkaufsverdacht aus dem Seller-Diff (verschwundene Seller + gesunkene Mengen). Kein Commit."""
+    sales = detect_sales(cursor, product_id, scrape_id, entries)
+    cursor.executemany('''
+        INSERT INTO suspected_sales (product_id, detected_at, seller, seller_id, price, quantity, confidence, reasoning)
+        VALUES (?, datetime('now'), ?, ?, ?, ?, ?, ?)
+    ''', [(product_id, seller_name(s['seller_id']), s['seller_id'], s['price'], s['quantity'],
+           s['confidence'], s['reasoning']) for s in sales])
+    record_sales_daily(cursor, product_id, sales)
 
-    cursor.execute('''
-        WITH prev_prices AS (
-            SELECT seller, price,
-                   NTILE(4) OVER (ORDER BY price) as quartile
-            FROM listings WHERE scrape_id = ? AND location = 'Germany'
-        ),
-        current_sellers AS (
-            SELECT DISTINCT seller FROM listings WHERE scrape_id = ? AND location = 'Germany'
-        )
-        SELECT p.seller, p.price
-        FROM prev_prices p
-        LEFT JOIN current_sellers c ON p.seller = c.seller
-        WHERE c.seller IS NULL AND p.quartile = 1
-    ''', (previous_scrape, current_scrape))
-
-    missing_sellers = cursor.fetchall()
-
-    for seller, price in missing_sellers:
-        cursor.execute('''
-            INSERT INTO suspected_sales (product_id, detected_at, seller, price, confidence, reasoning)
-            VALUES (?, datetime('now'), ?, ?, 'medium', 'Seller not in current scrape, was in Q1 price range')
-        ''', (product_id, seller, price))
-        print(f"🚨 Verkaufsverdacht: {seller} @ {price:.2f}€")
+    for s in sales:
+        if s['confidence'] != 'low':
+            print(f"🚨 Verkaufsverdacht: {seller_name(s['seller_id'])} @ {s['price']:.2f}€ x{s['quantity']} ({s['confidence']})")
 
 
 def check_price_alerts(cursor, product_id, current_scrape_id, current_floor):
@@ -454,9 +641,10 @@ def check_price_alerts(cursor, product_id, current_scrape_id, current_floor):
 
     # Find bargain listings in current scrape (DE only)
     cursor.execute('''
-        SELECT seller, price, quantity FROM listings
-        WHERE scrape_id = ? AND location = 'Germany' AND price <= ?
-        ORDER BY price ASC
+        SELECT se.name, l.price, l.quantity FROM listings l
+        JOIN sellers se ON se.id = l.seller_id
+        WHERE l.scrape_id = ? AND l.location = 'Germany' AND l.price <= ?
+        ORDER BY l.price ASC
     ''', (current_scrape_id, threshold))
 
     bargains = cursor.fetchall()
@@ -495,7 +683,7 @@ def check_price_alerts(cursor, product_id, current_scrape_id, current_floor):
 
 def main():
     if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help'):
-        print("Usage: python3 scraper.py <product>")
+        print("Usage: python3 scraper.py <product> [--full]")
         print("  Products: origins, spiritforged, arcane")
         sys.exit(0 if '--help' in sys.argv else 1)
 
@@ -505,8 +693,16 @@ def main():
         print(f"   Valid: {', '.join(PRODUCTS.keys())}")
         sys.exit(1)
 
-    count, floor = asyncio.run(scrape_product_with_retry(product_key))
-    if floor:
+    conn = get_db()
+    try:
+        BLOCKED_SELLERS.update(active_blocklist(conn.cursor()))
+    finally:
+        conn.close()
+
+    count, floor = asyncio.run(scrape_product_with_retry(product_key, force_full='--full' in sys.argv))
+    if floor and not count:
+        print(f"\n🏁 FERTIG: Quick-Check, Floor: {floor:.2f}€")
+    elif floor:
         print(f"\n🏁 FERTIG: {count} Listings, Floor: {floor:.2f}€")
     else:
         print(f"\n🏁 FERTIG: Fehler!")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+seasonality.py — Wochenprofil des Floors: wann ist ein Produkt typischerweise am günstigsten?
+
+Für jeden der 168 Stunden-Slots einer Woche (Ortszeit, So 00:00 = Slot 0) hält
+`seasonality` die Abweichungen des Floors vom jeweiligen Tagesmittel in %
+(ein Wert pro Tag, JSON-Liste, max. SEASONALITY_MAX_SAMPLES) und deren Median.
+Die Tages-Deltas rechnet SQLite in einer Query mit Window-Funktionen über alle
+Scrapes; nachgezogen werden nur abgeschlossene Tage seit dem letzten Lauf
+(`seasonality_cursor`). Läuft nachts per launchd, Reports lesen nur das Ergebnis.
+
+Usage:
+    python3 seasonality.py update [product-slug]
+    python3 seasonality.py rebuild [product-slug]
+    python3 seasonality.py show <product-slug>
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from db import connect
+from products import PRODUCTS
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+
+SLOTS = 168
+SEASONALITY_MAX_SAMPLES = 52   # ≈ 1 Jahr pro Slot
+SEASONALITY_MIN_SAMPLES = 3    # darunter wird ein Slot nicht als "typisch" gemeldet
+WEEKDAYS = ('So', 'Mo', 'Di', 'Mi', 'Do', 'Fr', 'Sa')  # strftime('%w'): 0 = Sonntag
+
+
+def get_db():
+    return connect(DB_PATH)
+
+
+def _median(values):
+    s = sorted(values)
+    n = len(s)
+    if not n:
+        return None
+    return s[n // 2] if n % 2 else (s[n // 2 - 1] + s[n // 2]) / 2
+
+
+def slot_label(slot):
+    """Slot 50 → 'Di 02:00'."""
+    return f'{WEEKDAYS[slot // 24]} {slot % 24:02d}:00'
+
+
+def slot_deltas(cursor, product_id, after_day=None):
+    """
+    (day, slot, delta_pct) für alle abgeschlossenen Tage (Ortszeit) nach after_day.
+    delta_pct = Ø Floor im Slot / Ø Floor des Tages − 1, in %.
+    """
+    cursor.execute('''
+        WITH x AS (
+            SELECT date(scraped_ts, 'unixepoch', 'localtime') AS day,
+                   CAST(strftime('%w', scraped_ts, 'unixepoch', 'localtime') AS INTEGER) * 24
+                     + CAST(strftime('%H', scraped_ts, 'unixepoch', 'localtime') AS INTEGER) AS slot,
+                   floor_price
+            FROM scrapes
+            WHERE product_id = ? AND floor_price IS NOT NULL
+              AND scraped_ts >= CAST(strftime('%s', COALESCE(date(?, '+1 day'), '0000-01-01'), 'utc') AS INTEGER)
+              AND scraped_ts < CAST(strftime('%s', date('now', 'localtime'), 'utc') AS INTEGER)
+        )
+        SELECT day, slot,
+               (AVG(floor_price)
+                / (SUM(SUM(floor_price)) OVER (PARTITION BY day) / SUM(COUNT(*)) OVER (PARTITION BY day))
+                - 1) * 100
+        FROM x
+        GROUP BY day, slot
+        ORDER BY day, slot
+    ''', (product_id, after_day))
+    return cursor.fetchall()
+
+
+def update_product(conn, product_id):
+    """Abgeschlossene Tage seit dem letzten Lauf ins Profil übernehmen. Returns Anzahl neuer Tage."""
+    cursor = conn.cursor()
+    cursor.execute('SELECT last_day FROM seasonality_cursor WHERE product_id = ?', (product_id,))
+    row = cursor.fetchone()
+    rows = slot_deltas(cursor, product_id, row[0] if row else None)
+    if not rows:
+        return 0
+
+    cursor.execute('SELECT slot, samples FROM seasonality WHERE product_id = ?', (product_id,))
+    samples = {slot: json.loads(s) for slot, s in cursor.fetchall()}
+    for _, slot, delta in rows:
+        samples.setdefault(slot, []).append(round(delta, 3))
+
+    cursor.executemany('''
+        INSERT OR REPLACE INTO seasonality (product_id, slot, samples, median_delta_pct, n)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(product_id, slot, json.dumps(vals[-SEASONALITY_MAX_SAMPLES:]),
+           _median(vals[-SEASONALITY_MAX_SAMPLES:]), len(vals[-SEASONALITY_MAX_SAMPLES:]))
+          for slot, vals in samples.items()])
+    cursor.execute('INSERT OR REPLACE INTO seasonality_cursor (product_id, last_day) VALUES (?, ?)',
+                   (product_id, rows[-1][0]))
+    conn.commit()
+    return len({r[0] for r in rows})
+
+
+def update(conn, product_id=None):
+    if product_id is not None:
+        return update_product(conn, product_id)
+    return sum(update_product(conn, pid) for pid in PRODUCTS)
+
+
+def rebuild(conn, product_id=None):
+    where, params = ('WHERE product_id = ?', (product_id,)) if product_id is not None else ('', ())
+    conn.execute(f'DELETE FROM seasonality {where}', params)
+    conn.execute(f'DELETE FROM seasonality_cursor {where}', params)
+    conn.commit()
+    return update(conn, product_id)
+
+
+def profile(cursor, product_id):
+    """{slot: (median_delta_pct, n)} für ein Produkt."""
+    cursor.execute('SELECT slot, median_delta_pct, n FROM seasonality WHERE product_id = ?', (product_id,))
+    return {slot: (med, n) for slot, med, n in cursor.fetchall()}
+
+
+def cheapest_slot(cursor, product_id, min_samples=SEASONALITY_MIN_SAMPLES):
+    """(slot, median_delta_pct) des typischerweise günstigsten Slots oder None."""
+    cursor.execute('''
+        SELECT slot, median_delta_pct FROM seasonality
+        WHERE product_id = ? AND n >= ?
+        ORDER BY median_delta_pct ASC LIMIT 1
+    ''', (product_id, min_samples))
+    return cursor.fetchone()
+
+
+def format_cheapest(cursor, product_id):
+    """'Di 02:00 (−1.2%)' oder None wenn zu wenig Historie."""
+    row = cheapest_slot(cursor, product_id)
+    if not row:
+        return None
+    slot, delta = row
+    return f'{slot_label(slot)} ({delta:+.1f}%)'
+
+
+def cmd_show(conn, product_id, pcfg):
+    prof = profile(conn.cursor(), product_id)
+    if not prof:
+        print(f"⚠️  {pcfg['name']}: kein Profil (erst 'seasonality.py update' laufen lassen)")
+        return 1
+    print(f"{pcfg['emoji']} {pcfg['name']} — Median-Abweichung vom Tagesmittel (%)")
+    print('     ' + ''.join(f'{h:>6}' for h in range(0, 24, 2)))
+    for wd in range(7):
+        cells = []
+        for h in range(0, 24, 2):
+            med, n = prof.get(wd * 24 + h, (None, 0))
+            cells.append(f'{med:>+6.1f}' if med is not None else f'{"·":>6}')
+        print(f'  {WEEKDAYS[wd]} ' + ''.join(cells))
+    best = format_cheapest(conn.cursor(), product_id)
+    if best:
+        print(f"\n   📅 typisch am günstigsten: {best}")
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Wochenprofil (Stunde × Wochentag) des Floors')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    for name in ('update', 'rebuild'):
+        p = sub.add_parser(name)
+        p.add_argument('product', nargs='?')
+    sub.add_parser('show').add_argument('product')
+    args = ap.parse_args()
+
+    product_id, pcfg = None, None
+    if args.product:
+        from products import by_slug
+        product_id, pcfg = by_slug(args.product.lower())
+        if product_id is None:
+            print(f"❌ Unknown product: {args.product}")
+            return 1
+
+    from migrate import ensure_schema
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        if args.cmd == 'show':
+            return cmd_show(conn, product_id, pcfg)
+        n = (update if args.cmd == 'update' else rebuild)(conn, product_id)
+        print(f"✅ Saisonalität: {n} Tage übernommen")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+sellers.py — Seller-Dimension (Name → Integer-ID).
+
+listings speichert nur noch `seller_id`; Namen stehen einmalig in `sellers`.
+Der Scraper löst Namen über einen In-Process-Cache auf — ein SELECT beim
+ersten Aufruf, danach nur noch INSERTs für neue Seller.
+
+Usage:
+    from sellers import resolve_ids, touch
+
+    ids = resolve_ids(cursor, ['Seller-A', 'Seller-B'])   # {name: id}
+    touch(cursor, ids.values())                           # last_seen = jetzt
+"""
+
+from datetime import datetime, timedelta
+
+# sellers.flags (Bitmaske)
+FLAG_BLOCKED = 1  # steht auf der Blocklist (Info, Quelle der Wahrheit ist seller_blocklist)
+
+_cache = {}       # name → id, pro Prozess
+_first_seen = {}  # id → first_seen ('YYYY-MM-DD HH:MM:SS', UTC)
+_names = {}       # id → name
+
+
+def _load(cursor):
+    cursor.execute('SELECT name, id, first_seen FROM sellers')
+    for name, sid, first_seen in cursor.fetchall():
+        _cache[name] = sid
+        _first_seen[sid] = first_seen
+        _names[sid] = name
+
+
+def resolve_ids(cursor, names):
+    """Gibt {name: id} zurück, legt unbekannte Seller an. Kein Commit."""
+    if not _cache:
+        _load(cursor)
+    result = {}
+    for name in names:
+        sid = _cache.get(name)
+        if sid is None:
+            cursor.execute('INSERT OR IGNORE INTO sellers (name) VALUES (?)', (name,))
+            cursor.execute('SELECT id FROM sellers WHERE name = ?', (name,))
+            sid = cursor.fetchone()[0]
+            _cache[name] = sid
+            _first_seen[sid] = None  # neu → noch keine Historie
+            _names[sid] = name
+        result[name] = sid
+    return result
+
+
+def touch(cursor, seller_ids):
+    """Setzt last_seen für die gegebenen Seller auf jetzt. Kein Commit."""
+    cursor.executemany(
+        'UPDATE sellers SET last_seen = CURRENT_TIMESTAMP WHERE id = ?',
+        [(sid,) for sid in set(seller_ids)],
+    )
+
+
+def established(seller_id, min_days):
+    """True wenn der Seller seit mindestens min_days Tagen bekannt ist (nach resolve_ids)."""
+    first_seen = _first_seen.get(seller_id)
+    if not first_seen:
+        return False
+    cutoff = (datetime.utcnow() - timedelta(days=min_days)).strftime('%Y-%m-%d %H:%M:%S')
+    return first_seen <= cutoff
+
+
+def name_of(seller_id):
+    """Seller-Name aus dem Cache (nach resolve_ids), None wenn unbekannt."""
+    return _names.get(seller_id)
+
+
+def clear_cache():
+    _cache.clear()
+    _first_seen.clear()
+    _names.clear()
@@ -0,0 +1,160 @@
+"""
+series.py — Floor-Zeitreihen für Reports (Sparklines etc.).
+
+Bucketing passiert in SQL (GROUP BY über den Zeit-Bucket), damit pro Produkt
+immer nur eine feste Anzahl Punkte nach Python kommt — egal ob stündlich
+oder alle 15 Minuten gescrapet wird.
+
+Usage:
+    from series import bucketed_floors
+
+    rows = bucketed_floors(cursor, product_id, window='-7 days', buckets=28, agg='min')
+    prices = [r[0] for r in rows]
+
+Welcher Floor-Schätzer verwendet wird, steuert CARDMARKET_FLOOR_ESTIMATOR
+(min | kth | qty | trimmed | trusted, default min = scrapes.floor_price).
+Andere Queries holen sich Ausdruck + JOIN über floor_sql().
+
+Beim Schätzer 'min' lesen bucketed_floors() und floor_window() die Floor-Zeitreihe
+aus tsstore (mmap, ohne SQLite). Die Dateien tragen nur den rohen Floor — andere
+Schätzer, fehlende oder veraltete Dateien (letzte scrape_id ≠ DB, siehe
+tsstore.is_current) und fehlendes numpy fallen auf SQL zurück.
+"""
+
+import math
+import os
+
+import tsstore
+
+# Schätzer → SQL-Ausdruck (scrapes als `s`, scrape_floors als `f`).
+# Fehlt die scrape_floors-Zeile oder hat der Schätzer zu wenig Daten → rohes Minimum.
+FLOOR_ESTIMATORS = {
+    'min': 's.floor_price',
+    'kth': 'COALESCE(f.floor_kth, s.floor_price)',
+    'qty': 'COALESCE(f.floor_qty, s.floor_price)',
+    'trimmed': 'COALESCE(f.floor_trimmed, s.floor_price)',
+    'trusted': 'COALESCE(f.floor_trusted, s.floor_price)',
+}
+FLOOR_ESTIMATOR = os.getenv('CARDMARKET_FLOOR_ESTIMATOR', 'min')
+
+
+def floor_sql(estimator=None):
+    """
+    (Ausdruck, JOIN-Klausel) für den Floor-Schätzer; die Query muss scrapes als `s` aliasen:
+
+        expr, join = floor_sql()
+        f"SELECT {expr} AS floor_price FROM scrapes s {join} WHERE s.product_id = ?"
+    """
+    estimator = estimator or FLOOR_ESTIMATOR
+    if estimator not in FLOOR_ESTIMATORS:
+        raise ValueError(f"Unbekannter Floor-Schätzer: {estimator} (erlaubt: {', '.join(FLOOR_ESTIMATORS)})")
+    join = '' if estimator == 'min' else 'LEFT JOIN scrape_floors f ON f.scrape_id = s.id'
+    return FLOOR_ESTIMATORS[estimator], join
+
+
+def _epoch(cursor, modifier):
+    cursor.execute("SELECT CAST(strftime('%s', 'now', ?) AS INTEGER)", (modifier,))
+    return cursor.fetchone()[0]
+
+
+def _records(cursor, product_id, start, end, estimator):
+    """tsstore.window() für den Schätzer 'min' bei aktueller Datei, sonst/bei Problemen None."""
+    if (estimator or FLOOR_ESTIMATOR) != 'min':
+        return None
+    try:
+        if not tsstore.is_current(cursor.connection, product_id):
+            return None
+        return tsstore.window(product_id, start, end)
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def floor_window(cursor, product_id, since=None, until=None, estimator=None):
+    """
+    tsstore-Records (Felder ts, floor, listings, scrape_id) mit now+since < ts < now+until
+    (SQLite-Modifier wie '-24 hours', None = offen) als numpy-Slice, chronologisch.
+    None → Aufrufer nimmt SQL (Schätzer nicht 'min', keine gültige oder veraltete Datei, kein numpy).
+    """
+    if (estimator or FLOOR_ESTIMATOR) != 'min':
+        return None
+    start = _epoch(cursor, since) + 1 if since else None
+    end = _epoch(cursor, until) if until else None
+    return _records(cursor, product_id, start, end, estimator)
+
+
+def valid_floors(records):
+    """Floors eines floor_window()-Slices ohne Scrapes ohne Floor (NaN)."""
+    floors = records['floor']
+    return floors[floors == floors]
+
+
+def floor_value(value):
+    """tsstore-Floor → float bzw. None (wie NULL in scrapes.floor_price)."""
+    return None if math.isnan(value) else float(value)
+
+
+def _bucket_records(records, t0, t1, buckets, agg):
+    """bucketed_floors() auf einem tsstore-Slice, gleiche Bucket-Grenzen wie die SQL-Variante."""
+    import numpy as np
+
+    records = records[~np.isnan(records['floor'])]
+    ts, floors = records['ts'], records['floor']
+    idx = np.minimum((ts - t0) * buckets // (t1 - t0), buckets - 1)
+    _, starts, counts = np.unique(idx, return_index=True, return_counts=True)
+    result = []
+    for start, n in zip(starts, counts):  # ts aufsteigend → Buckets sind zusammenhängend
+        f, t = floors[start:start + n], ts[start:start + n]
+        if agg == 'min':
+            i = int(f.argmin())
+            result.append((float(f[i]), int(t[i]), int(n)))
+        elif agg == 'last':
+            result.append((float(f[-1]), int(t[-1]), int(n)))
+        else:
+            result.append((float(f.mean()), int(t[0]), int(n)))
+    return result
+
+
+# agg → (Wert-Ausdruck, Zeitstempel-Ausdruck)
+# SQLite liefert bei MIN()/MAX() die "bare columns" aus genau der Zeile mit dem
+# Extremwert — scraped_ts ist bei 'min' also der Zeitpunkt des Bucket-Tiefs.
+BUCKET_AGGREGATES = {
+    'min': ('MIN({floor})', 's.scraped_ts'),
+    'last': ('{floor}', 'MAX(s.scraped_ts)'),
+    'avg': ('AVG({floor})', 'MIN(s.scraped_ts)'),
+}
+
+
+def bucketed_floors(cursor, product_id, window='-24 hours', buckets=24, agg='min', estimator=None):
+    """
+    Floor-Preise eines Produkts im Zeitfenster [now+window, now], in `buckets`
+    gleich lange Zeit-Buckets aggregiert.
+
+    Returns Liste von (value, scraped_ts, n_scrapes), chronologisch (scraped_ts in Unix-Sekunden UTC).
+    Leere Buckets (keine Scrapes) fehlen einfach.
+    """
+    if agg not in BUCKET_AGGREGATES:
+        raise ValueError(f"Unbekannte Aggregation: {agg} (erlaubt: {', '.join(BUCKET_AGGREGATES)})")
+    floor, join = floor_sql(estimator)
+    if (estimator or FLOOR_ESTIMATOR) == 'min':
+        cursor.execute("SELECT CAST(strftime('%s', 'now', ?) AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER)",
+                       (window,))
+        t0, t1 = cursor.fetchone()
+        records = _records(cursor, product_id, t0 + 1, None, estimator)
+        if records is not None:
+            return _bucket_records(records, t0, t1, buckets, agg)
+    value_expr, time_expr = BUCKET_AGGREGATES[agg]
+    value_expr = value_expr.format(floor=floor)
+
+    cursor.execute(f'''
+        WITH w AS (
+            SELECT CAST(strftime('%s', 'now', ?) AS INTEGER) AS t0, CAST(strftime('%s', 'now') AS INTEGER) AS t1
+        )
+        SELECT {value_expr}, {time_expr}, COUNT(*),
+               MIN((s.scraped_ts - w.t0) * ? / (w.t1 - w.t0), ? - 1) AS bucket
+        FROM scrapes s {join}, w
+        WHERE s.product_id = ? AND s.scraped_ts > w.t0
+          AND s.floor_price IS NOT NULL
+        GROUP BY bucket
+        ORDER BY bucket ASC
+    ''', (window, buckets, buckets, product_id))
+    return [(r[0], r[1], r[2]) for r in cursor.fetchall()]
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+test_series.py — Floor-Leser (series/price_alerts) gegen eine veraltete tsstore-Datei.
+
+Szenario: der Scraper committet einen Scrape, tsstore.sync scheitert (z.B. 'database
+is locked') — die Datei hinkt der DB hinterher. Leser dürfen dann keine alten Floors
+liefern: read-only → SQL, Schreib-Verbindung → sync, Datei weiter als die DB → SQL.
+
+Usage:
+    python3 -m unittest test_series      # oder: python3 -m pytest test_series.py
+"""
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401 — tsstore.window/load brauchen numpy
+except ImportError:
+    numpy = None
+
+import series
+import tsstore
+from db import connect, connect_readonly
+
+SCHEMA = Path(__file__).parent / 'schema.sql'
+PRODUCT_ID = 1
+
+
+@unittest.skipIf(numpy is None, 'numpy fehlt')
+class StaleSeriesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Path(self.tmp.name) / 'test.db'
+        self.ts_dir, tsstore.TS_DIR = tsstore.TS_DIR, Path(self.tmp.name) / 'tsdata'
+        self.estimator, series.FLOOR_ESTIMATOR = series.FLOOR_ESTIMATOR, 'min'
+        conn = connect(self.db)
+        conn.executescript(SCHEMA.read_text())
+        conn.executemany('INSERT INTO scrapes (product_id, total_listings, floor_price, scraped_at) VALUES (?, ?, ?, ?)',
+                         [(PRODUCT_ID, 40, 92.89 + i, f'2026-01-01 {i:02d}:00:00') for i in range(5)])
+        conn.commit()
+        tsstore.rebuild(conn, PRODUCT_ID)
+        conn.close()
+
+    def tearDown(self):
+        tsstore.TS_DIR, series.FLOOR_ESTIMATOR = self.ts_dir, self.estimator
+        self.tmp.cleanup()
+
+    def _insert_scrape(self, floor):
+        """Neuer Scrape ohne tsstore.sync (wie nach einem fehlgeschlagenen Sync im Scraper)."""
+        conn = connect(self.db)
+        scrape_id = conn.execute('INSERT INTO scrapes (product_id, total_listings, floor_price, scraped_at) '
+                                 "VALUES (?, 40, ?, '2026-01-02 00:00:00')", (PRODUCT_ID, floor)).lastrowid
+        conn.commit()
+        conn.close()
+        return scrape_id
+
+    def test_current_file_is_used(self):
+        conn = connect_readonly(self.db)
+        records = series.floor_window(conn.cursor(), PRODUCT_ID)
+        conn.close()
+        self.assertIsNotNone(records)
+        self.assertEqual(len(records), 5)
+
+    def test_stale_file_readonly_falls_back_to_sql(self):
+        import price_alerts
+
+        self._insert_scrape(1.23)
+        conn = connect_readonly(self.db)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        self.assertIsNone(series.floor_window(cursor, PRODUCT_ID))
+        self.assertEqual(price_alerts.get_latest(cursor, PRODUCT_ID)['floor_price'], 1.23)
+        self.assertEqual(price_alerts.get_all_time_low(cursor, PRODUCT_ID), 1.23)
+        conn.close()
+
+    def test_stale_file_writer_syncs(self):
+        scrape_id = self._insert_scrape(1.23)
+        conn = connect(self.db)
+        records = series.floor_window(conn.cursor(), PRODUCT_ID)
+        conn.close()
+        self.assertIsNotNone(records)
+        self.assertEqual(float(records[-1]['floor']), 1.23)
+        self.assertEqual(tsstore.last_scrape_id(PRODUCT_ID), scrape_id)
+
+    def test_file_ahead_of_db_falls_back_to_sql(self):
+        conn = connect(self.db)
+        conn.execute('DELETE FROM scrapes WHERE id = (SELECT MAX(id) FROM scrapes)')
+        conn.commit()
+        self.assertIsNone(series.floor_window(conn.cursor(), PRODUCT_ID))
+        self.assertEqual(series.bucketed_floors(conn.cursor(), PRODUCT_ID, window='-3650 days')[0][2], 4)
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+tsstore.py — Floor-Zeitreihen als Binärdateien pro Produkt (append-only, mmap).
+
+Charts und Reports brauchen pro Produkt nur (Zeitpunkt, Floor, Listings). Statt
+dafür jedes Mal `scrapes` abzufragen, schreibt der Scraper nach jedem Commit die
+neuen Scrapes in `tsdata/floor-<product_id>.bin`:
+
+    Header  16 Bytes  <4sIII   magic b'CMTS', Version, Record-Größe, product_id
+    Record  24 Bytes  <qdII    ts (Unix-Sekunden UTC), floor (NaN = kein Floor),
+                               listings (DE), scrape_id
+
+Records sind nach scrape_id sortiert (auch Quick-Scrapes), der Floor ist der rohe
+`scrapes.floor_price`. Gelesen wird per np.memmap — Zeitbereiche sind Slices über
+searchsorted, ohne Kopie und ohne SQLite. Die DB bleibt die Quelle: fehlt eine
+Datei oder ist sie kaputt, baut `rebuild` sie neu. Der Blocklist-Recompute
+(ändert alte Floors) baut die betroffenen Produkte automatisch neu.
+
+Schreiben braucht nur die Stdlib (der Scraper importiert kein numpy), Lesen numpy.
+
+Usage:
+    import tsstore
+
+    tsstore.sync(conn, product_id)           # neue Scrapes anhängen (Scraper, nach Commit)
+    arr = tsstore.load(product_id)           # np.memmap mit Feldern ts, floor, listings, scrape_id
+    week = tsstore.window(product_id, time.time() - 7 * 86400)
+    tsstore.is_current(conn, product_id)     # False → Datei hinkt der DB hinterher, SQL nehmen
+
+    python3 tsstore.py rebuild [slug]        # aus der DB neu schreiben (alle oder ein Produkt)
+    python3 tsstore.py sync [slug]           # fehlende Scrapes anhängen
+    python3 tsstore.py check [slug]          # Header, Größe, Sortierung, Abgleich mit der DB
+    python3 tsstore.py show <slug> [--days 7]
+"""
+
+import argparse
+import math
+import os
+import struct
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from db import connect_readonly
+
+DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cardmarket.db'))
+TS_DIR = Path(os.getenv('CARDMARKET_TS_DIR', Path(__file__).parent / 'tsdata'))
+
+MAGIC = b'CMTS'
+VERSION = 1
+HEADER = struct.Struct('<4sIII')
+RECORD = struct.Struct('<qdII')
+# numpy-Gegenstück zu RECORD (gleiches Layout, ohne Padding)
+DTYPE = [('ts', '<i8'), ('floor', '<f8'), ('listings', '<u4'), ('scrape_id', '<u4')]
+
+CHECK_TAIL = 50  # so viele letzte Records prüft `check` Feld für Feld gegen die DB
+
+
+def path(product_id):
+    return TS_DIR / f'floor-{product_id}.bin'
+
+
+def _rows(conn, product_id, after_id=0):
+    """Scrapes eines Produkts nach after_id als Records (ts, floor, listings, scrape_id)."""
+    cursor = conn.execute('''
+        SELECT scraped_ts, floor_price, total_listings, id
+        FROM scrapes
+        WHERE product_id = ? AND id > ?
+        ORDER BY id
+    ''', (product_id, after_id))
+    for ts, floor, listings, scrape_id in cursor:
+        yield ts, math.nan if floor is None else floor, listings or 0, scrape_id
+
+
+def _count(f):
+    """Anzahl vollständiger Records (ein halb geschriebener am Ende zählt nicht)."""
+    size = os.fstat(f.fileno()).st_size
+    return max(0, (size - HEADER.size) // RECORD.size)
+
+
+def _last_scrape_id(f):
+    n = _count(f)
+    if n == 0:
+        return 0
+    f.seek(HEADER.size + (n - 1) * RECORD.size)
+    return RECORD.unpack(f.read(RECORD.size))[3]
+
+
+def _read_header(f, product_id):
+    f.seek(0)
+    raw = f.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        raise ValueError('Header unvollständig')
+    magic, version, record_size, pid = HEADER.unpack(raw)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size or pid != product_id:
+        raise ValueError(f'Header passt nicht ({magic!r}, v{version}, {record_size} B, Produkt {pid})')
+
+
+def sync(conn, product_id):
+    """
+    Hängt alle Scrapes an, die neuer sind als der letzte Record. Legt die Datei bei
+    Bedarf an (bzw. neu bei kaputtem Header), schneidet einen halb geschriebenen
+    Record am Ende ab. Returns Anzahl neuer Records.
+    """
+    p = path(product_id)
+    try:
+        with open(p, 'rb') as f:
+            _read_header(f, product_id)
+    except (FileNotFoundError, ValueError):
+        return rebuild(conn, product_id)
+    with open(p, 'r+b') as f:
+        n = _count(f)
+        f.truncate(HEADER.size + n * RECORD.size)
+        after = _last_scrape_id(f)
+        f.seek(0, os.SEEK_END)
+        written = 0
+        for rec in _rows(conn, product_id, after):
+            f.write(RECORD.pack(*rec))
+            written += 1
+    return written
+
+
+def rebuild(conn, product_id):
+    """Schreibt die Datei eines Produkts komplett aus der DB neu (tmp + Rename). Returns Anzahl Records."""
+    TS_DIR.mkdir(parents=True, exist_ok=True)
+    p = path(product_id)
+    tmp = p.with_name(p.name + '.tmp')
+    n = 0
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, product_id))
+        for rec in _rows(conn, product_id):
+            f.write(RECORD.pack(*rec))
+            n += 1
+    tmp.replace(p)
+    return n
+
+
+def last_scrape_id(product_id):
+    """scrape_id des letzten Records (0 = leer), None ohne gültige Datei."""
+    try:
+        with open(path(product_id), 'rb') as f:
+            _read_header(f, product_id)
+            return _last_scrape_id(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def is_current(conn, product_id):
+    """
+    True, wenn die Datei bis zum letzten Scrape des Produkts in der DB reicht. Ist ein
+    sync im Scraper fehlgeschlagen, zieht eine Schreib-Verbindung hier nach; read-only
+    (Reports, Alerts, Charts) → False, der Aufrufer nimmt SQL bis zum nächsten Scrape.
+    """
+    last = last_scrape_id(product_id)
+    if last is None:
+        return False
+    newest = conn.execute('SELECT MAX(id) FROM scrapes WHERE product_id = ?', (product_id,)).fetchone()[0] or 0
+    if last == newest:
+        return True
+    if last > newest or getattr(conn, 'readonly', False):
+        return False  # Datei weiter als die DB (z.B. nach Restore) → nur 'rebuild' hilft
+    sync(conn, product_id)
+    return last_scrape_id(product_id) == newest
+
+
+def load(product_id):
+    """
+    Alle Records eines Produkts als read-only np.memmap (Felder ts, floor, listings, scrape_id).
+    Returns None, wenn es (noch) keine Datei gibt — Aufrufer fallen dann auf SQL zurück.
+    """
+    import numpy as np
+
+    p = path(product_id)
+    if not p.exists():
+        return None
+    with open(p, 'rb') as f:
+        _read_header(f, product_id)
+        n = _count(f)
+    if n == 0:
+        return np.empty(0, dtype=DTYPE)
+    return np.memmap(p, dtype=DTYPE, mode='r', offset=HEADER.size, shape=(n,))
+
+
+def window(product_id, start=None, end=None):
+    """Records mit start <= ts < end (Unix-Sekunden, None = offen) als Slice ohne Kopie, oder None."""
+    import numpy as np
+
+    arr = load(product_id)
+    if arr is None:
+        return None
+    ts = arr['ts']
+    lo = 0 if start is None else int(np.searchsorted(ts, start, side='left'))
+    hi = len(arr) if end is None else int(np.searchsorted(ts, end, side='left'))
+    return arr[lo:hi]
+
+
+def check(conn, product_id):
+    """Konsistenzprüfung einer Datei gegen die DB (ohne numpy). Returns Liste von Problemen."""
+    p = path(product_id)
+    if not p.exists():
+        return ['Datei fehlt']
+    problems = []
+    with open(p, 'rb') as f:
+        try:
+            _read_header(f, product_id)
+        except ValueError as e:
+            return [str(e)]
+        size = os.fstat(f.fileno()).st_size
+        if (size - HEADER.size) % RECORD.size:
+            problems.append(f'{(size - HEADER.size) % RECORD.size} Bytes Rest am Ende (halber Record)')
+        f.seek(HEADER.size)
+        records = list(RECORD.iter_unpack(f.read(_count(f) * RECORD.size)))
+
+    prev_ts = prev_id = None
+    for i, (ts, _, _, scrape_id) in enumerate(records):
+        if prev_id is not None and scrape_id <= prev_id:
+            problems.append(f'Record {i}: scrape_id {scrape_id} nicht aufsteigend (davor {prev_id})')
+            break
+        if prev_ts is not None and ts < prev_ts:
+            problems.append(f'Record {i}: ts {ts} rückwärts (davor {prev_ts})')
+            break
+        prev_ts, prev_id = ts, scrape_id
+
+    db_count, db_last = conn.execute(
+        'SELECT COUNT(*), MAX(id) FROM scrapes WHERE product_id = ?', (product_id,)).fetchone()
+    if len(records) != db_count:
+        problems.append(f'{len(records)} Records, DB hat {db_count} Scrapes')
+    if records and records[-1][3] != db_last:
+        problems.append(f'letzter Record #{records[-1][3]}, DB #{db_last}')
+
+    tail = records[-CHECK_TAIL:]
+    if tail:
+        expected = {rec[3]: rec for rec in _rows(conn, product_id, tail[0][3] - 1)}
+        for rec in tail:
+            want = expected.get(rec[3])
+            if want is None:
+                problems.append(f'Scrape #{rec[3]} nicht (mehr) in der DB')
+            elif want[0] != rec[0] or want[2] != rec[2] or not (
+                    want[1] == rec[1] or (math.isnan(want[1]) and math.isnan(rec[1]))):
+                problems.append(f'Scrape #{rec[3]} weicht ab: Datei {rec[:3]}, DB {want[:3]}')
+    return problems
+
+
+def _products(slug):
+    from products import PRODUCTS, by_slug
+    if slug is None:
+        return list(PRODUCTS)
+    pid, _ = by_slug(slug.lower())
+    if pid is None:
+        raise SystemExit(f"❌ Unbekanntes Produkt: {slug}")
+    return [pid]
+
+
+def cmd_show(product_id, days):
+    import numpy as np
+
+    arr = window(product_id, datetime.now(timezone.utc).timestamp() - days * 86400)
+    if arr is None:
+        print("❌ Keine Datei — erst 'python3 tsstore.py rebuild'")
+        return 1
+    floors = arr['floor'][~np.isnan(arr['floor'])]
+    print(f"📈 Produkt {product_id}: {len(arr)} Scrapes in {days} Tagen ({path(product_id).name})")
+    if len(floors):
+        print(f"   Floor min {floors.min():.2f}€  max {floors.max():.2f}€  zuletzt {floors[-1]:.2f}€")
+    for rec in arr[-10:]:
+        when = datetime.fromtimestamp(int(rec['ts']), timezone.utc).strftime('%Y-%m-%d %H:%M')
+        floor = '   —   ' if np.isnan(rec['floor']) else f"{rec['floor']:7.2f}€"
+        print(f"   {when}  {floor}  {int(rec['listings']):>4} Listings  #{int(rec['scrape_id'])}")
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Floor-Zeitreihen pro Produkt (mmap)')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    for name in ('rebuild', 'sync', 'check'):
+        sub.add_parser(name).add_argument('product', nargs='?', help='Slug (default: alle)')
+    p_show = sub.add_parser('show')
+    p_show.add_argument('product')
+    p_show.add_argument('--days', type=int, default=7)
+    args = ap.parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print(f"❌ DB nicht gefunden: {DB_PATH}")
+        return 1
+    if args.cmd == 'show':
+        return cmd_show(_products(args.product)[0], args.days)
+
+    conn = connect_readonly(DB_PATH)
+    try:
+        failed = 0
+        for pid in _products(args.product):
+            if args.cmd == 'rebuild':
+                print(f"   🔁 Produkt {pid}: {rebuild(conn, pid)} Records")
+            elif args.cmd == 'sync':
+                print(f"   ➕ Produkt {pid}: {sync(conn, pid)} neue Records")
+            else:
+                problems = check(conn, pid)
+                failed += bool(problems)
+                print(f"   {'❌' if problems else '✅'} Produkt {pid}" + ''.join(f"\n      {p}" for p in problems))
+    finally:
+        conn.close()
+    if args.cmd == 'check' and failed:
+        print(f"⚠️  {failed} Datei(en) inkonsistent — 'python3 tsstore.py rebuild' schreibt sie neu")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
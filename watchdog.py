@@ -5,14 +5,13 @@ Checks if scrapes have run recently. Alerts via Telegram if not.
 Usage: python3 watchdog.py [--max-age-hours 2]
 """
 
-import sqlite3
 import os
 import sys
 import json
 import time
 import urllib.request
 import urllib.parse
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from pathlib import Path
 
 # .env laden
@@ -32,6 +31,7 @@ TELEGRAM_ALERT_CHAT_ID = os.getenv('TELEGRAM_ALERT_CHAT_ID')
 
 MAX_AGE_HOURS = 2
 
+from db import connect_readonly
 from products import PRODUCTS as _P
 PRODUCTS = {pid: p['short_name'] for pid, p in _P.items()}
 
@@ -67,23 +67,22 @@ def check():
         send_telegram("🚨 <b>Watchdog:</b> cardmarket.db nicht gefunden!")
         return 1
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute('PRAGMA busy_timeout = 5000')
+    conn = connect_readonly(DB_PATH)
     cursor = conn.cursor()
 
-    cutoff = datetime.utcnow() - timedelta(hours=MAX_AGE_HOURS)
-    cutoff_str = cutoff.strftime('%Y-%m-%d %H:%M:%S')
+    cutoff = int(time.time()) - MAX_AGE_HOURS * 3600
 
     missing = []
     for pid, pname in PRODUCTS.items():
         cursor.execute('''
-            SELECT MAX(scraped_at) FROM scrapes WHERE product_id = ?
+            SELECT MAX(scraped_ts) FROM scrapes WHERE product_id = ?
         ''', (pid,))
         row = cursor.fetchone()
         last_scrape = row[0] if row and row[0] else None
 
-        if not last_scrape or last_scrape < cutoff_str:
-            age = "nie" if not last_scrape else last_scrape
+        if not last_scrape or last_scrape < cutoff:
+            age = "nie" if not last_scrape else \
+                datetime.fromtimestamp(last_scrape, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
             missing.append(f"• {pname}: letzter Scrape {age}")
 
     conn.close()
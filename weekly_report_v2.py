@@ -4,12 +4,11 @@ Cardmarket Weekly Report v2 - Premium Telegram Report
 Sparklines, Trends, Insights (wie Daily v2, aber für 7 Tage)
 """
 
-import sqlite3
 import os
 import json
 import urllib.request
 import urllib.parse
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 # .env laden
@@ -26,16 +25,20 @@ DB_PATH = os.getenv('CARDMARKET_DB_PATH', os.path.join(os.path.dirname(os.path.a
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
+from db import connect_readonly
 from products import PRODUCTS as _PRODUCTS
 PRODUCTS = {pid: {'name': p['short_name'], 'emoji': p['emoji']} for pid, p in _PRODUCTS.items()}
 
+from series import bucketed_floors, floor_sql, floor_value, floor_window, valid_floors
+from sales_daily import summary as sales_summary
+from seasonality import format_cheapest
+
 SPARKLINE_CHARS = '▁▂▃▄▅▆▇█'
+SPARKLINE_BUCKETS = 28  # 4 Punkte pro Tag (6h-Buckets)
 
 
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute('PRAGMA busy_timeout = 5000')
-    return conn
+    return connect_readonly(DB_PATH)
 
 
 def send_telegram_message(message):
@@ -69,48 +72,61 @@ def sparkline(values):
 
 
 def get_weekly_data(cursor, product_id):
-    """Holt tägliche Floor-Preise der letzten 7 Tage (1x pro Tag)."""
-    cursor.execute('''
-        SELECT floor_price, scraped_at
-        FROM scrapes
-        WHERE product_id = ? AND scraped_at > datetime('now', '-7 days')
-        ORDER BY scraped_at ASC
-    ''', (product_id,))
-    return cursor.fetchall()
+    """Floor-Tiefs der letzten 7 Tage, in SQL auf 6h-Buckets aggregiert."""
+    return bucketed_floors(cursor, product_id, window='-7 days',
+                           buckets=SPARKLINE_BUCKETS, agg='min')
 
 
 def get_weekly_stats(cursor, product_id):
     """Holt Wochen-Stats (Min/Max/Avg)."""
-    cursor.execute('''
+    records = floor_window(cursor, product_id, since='-7 days')
+    if records is not None:
+        if not len(records):
+            return (None, None, None, None, None, 0)
+        floors, listings = valid_floors(records), records['listings']
+        if not len(floors):
+            return (None, None, None, int(listings.min()), int(listings.max()), len(records))
+        return (float(floors.min()), float(floors.max()), float(floors.mean()),
+                int(listings.min()), int(listings.max()), len(records))
+
+    floor, join = floor_sql()
+    cursor.execute(f'''
         SELECT 
-            MIN(floor_price) as min_price,
-            MAX(floor_price) as max_price,
-            AVG(floor_price) as avg_price,
-            MIN(total_listings) as min_listings,
-            MAX(total_listings) as max_listings,
+            MIN({floor}) as min_price,
+            MAX({floor}) as max_price,
+            AVG({floor}) as avg_price,
+            MIN(s.total_listings) as min_listings,
+            MAX(s.total_listings) as max_listings,
             COUNT(*) as scrape_count
-        FROM scrapes
-        WHERE product_id = ? 
-        AND scraped_at > datetime('now', '-7 days')
+        FROM scrapes s {join}
+        WHERE s.product_id = ? 
+        AND s.scraped_ts > CAST(strftime('%s', 'now', '-7 days') AS INTEGER)
     ''', (product_id,))
     return cursor.fetchone()
 
 
 def get_current_and_week_ago(cursor, product_id):
     """Aktueller + Vorwoche Preis für Trend."""
-    cursor.execute('''
-        SELECT floor_price
-        FROM scrapes
-        WHERE product_id = ?
-        ORDER BY scraped_at DESC LIMIT 1
+    records = floor_window(cursor, product_id)
+    if records is not None:
+        before = floor_window(cursor, product_id, until='-6 days')
+        return (floor_value(records[-1]['floor']) if len(records) else None,
+                floor_value(before[-1]['floor']) if before is not None and len(before) else None)
+
+    floor, join = floor_sql()
+    cursor.execute(f'''
+        SELECT {floor}
+        FROM scrapes s {join}
+        WHERE s.product_id = ?
+        ORDER BY s.scraped_ts DESC LIMIT 1
     ''', (product_id,))
     current = cursor.fetchone()
     
-    cursor.execute('''
-        SELECT floor_price
-        FROM scrapes
-        WHERE product_id = ? AND scraped_at < datetime('now', '-6 days')
-        ORDER BY scraped_at DESC LIMIT 1
+    cursor.execute(f'''
+        SELECT {floor}
+        FROM scrapes s {join}
+        WHERE s.product_id = ? AND s.scraped_ts < CAST(strftime('%s', 'now', '-6 days') AS INTEGER)
+        ORDER BY s.scraped_ts DESC LIMIT 1
     ''', (product_id,))
     week_ago = cursor.fetchone()
     
@@ -118,15 +134,9 @@ def get_current_and_week_ago(cursor, product_id):
 
 
 def get_weekly_sales(cursor):
-    """Holt Verkaufsverdachte der Woche."""
-    cursor.execute('''
-        SELECT p.name, COUNT(*) as cnt, MIN(s.price) as min_p, MAX(s.price) as max_p
-        FROM suspected_sales s
-        JOIN products p ON s.product_id = p.id
-        WHERE s.detected_at > datetime('now', '-7 days')
-        GROUP BY s.product_id
-    ''')
-    return cursor.fetchall()
+    """Verkaufsverdachte der Woche aus dem Tages-Rollup: (name, units, min, max, revenue)."""
+    return [(name, units, lo, hi, revenue)
+            for _, name, units, revenue, lo, hi, _ in sales_summary(cursor, days=7)]
 
 
 def format_change(current, previous):
@@ -170,7 +180,7 @@ def generate_weekly_report():
 
         min_price, max_price, avg_price, min_listings, max_listings, count = stats
         
-        # Sparkline aus täglichen Daten
+        # Sparkline aus den Bucket-Tiefs
         daily_prices = [r[0] for r in weekly_data] if weekly_data else [current]
         spark = sparkline(daily_prices)
         
@@ -178,11 +188,7 @@ def generate_weekly_report():
         best_day = '—'
         if weekly_data:
             min_idx = daily_prices.index(min(daily_prices))
-            try:
-                best_time = datetime.fromisoformat(weekly_data[min_idx][1])
-                best_day = best_time.strftime('%a %H:%M')
-            except:
-                best_day = weekly_data[min_idx][1][:10]
+            best_day = datetime.fromtimestamp(weekly_data[min_idx][1], timezone.utc).strftime('%a %H:%M')
 
         # Trend Vergleich Woche
         change_str = format_change(current, week_ago)
@@ -203,6 +209,9 @@ def generate_weekly_report():
         lines.append(f'   📈 7-Tage: <code>{spark}</code>')
         if min_price < current:
             lines.append(f'   ⏰ Bestpreis: {best_day} ({min_price:.2f}€)')
+        typical = format_cheapest(cursor, pid)
+        if typical:
+            lines.append(f'   📅 typisch am günstigsten: {typical}')
         lines.append(f'   🔄 Scans: {count}')
         lines.append('')
 
@@ -217,11 +226,11 @@ def generate_weekly_report():
     sales = get_weekly_sales(cursor)
     if sales:
         lines.append('🚨 <b>Verkaufsverdacht (7 Tage)</b>')
-        for name, cnt, min_p, max_p in sales:
+        for name, cnt, min_p, max_p, revenue in sales:
             if min_p == max_p:
                 lines.append(f'   • {name}: {cnt}x @ {min_p:.2f}€')
             else:
-                lines.append(f'   • {name}: {cnt}x ({min_p:.2f}–{max_p:.2f}€)')
+                lines.append(f'   • {name}: {cnt}x ({min_p:.2f}–{max_p:.2f}€) · ~{revenue:.0f}€')
         lines.append('')
 
     # Market overview